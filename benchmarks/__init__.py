@@ -0,0 +1,7 @@
+"""
+Excel MCP Server 벤치마크
+고정된 시드로 만든 합성 워크북에서 서버 도구를 실행해 시간, CPU, 최대 메모리, 응답 크기를 기록합니다.
+
+    python -m benchmarks --rows 10000,100000 --output bench.json
+    python -m benchmarks --rows 10000 --baseline bench.json
+"""
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+벤치마크 결과 비교
+같은 (워크로드, 행 수, 모드, 시나리오)의 측정값이 기준보다 threshold 이상 늘었으면 회귀로 표시합니다.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+# 지표별 최소 차이 (작은 값의 측정 잡음은 회귀로 보지 않음)
+METRICS: Dict[str, float] = {
+    "cold_ms": 5.0,
+    "warm_ms": 5.0,
+    "cpu_ms": 10.0,
+    "peak_rss_mb": 5.0,
+    "response_bytes": 1024,
+}
+
+
+def _key(entry: Dict[str, Any]) -> Tuple[Any, ...]:
+    return entry["workload"], entry["rows"], entry["mode"], entry["scenario"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """회귀 목록 (기준에 없는 항목은 비교하지 않음)
+
+    실패하던 시나리오가 성공하면 회귀가 아니고, 성공하던 시나리오가 실패하면 회귀입니다.
+    """
+    previous = {_key(entry): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in current.get("results", []):
+        before = previous.get(_key(entry))
+        if before is None:
+            continue
+        if before.get("success") and not entry.get("success"):
+            regressions.append({"key": _key(entry), "metric": "success", "baseline": True, "current": False})
+            continue
+        for metric, floor in METRICS.items():
+            old, new = before.get(metric), entry.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > floor and new > old * (1 + threshold):
+                regressions.append({"key": _key(entry), "metric": metric, "baseline": old, "current": new,
+                                    "change": round(new / old - 1, 3) if old else None})
+    return regressions
+
+
+def format_report(regressions: List[Dict[str, Any]]) -> str:
+    """회귀 목록을 사람이 읽을 수 있는 표로"""
+    if not regressions:
+        return "회귀 없음"
+    lines = [f"회귀 {len(regressions)}건:"]
+    for item in regressions:
+        workload, rows, mode, scenario = item["key"]
+        change = f" (+{item['change'] * 100:.0f}%)" if item.get("change") is not None else ""
+        lines.append(f"  {workload} {rows} {mode} {scenario}: {item['metric']} "
+                     f"{item['baseline']} → {item['current']}{change}")
+    return "\n".join(lines)
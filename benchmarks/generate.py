@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 합성 워크북 생성
+같은 워크로드와 행 수면 항상 같은 내용의 파일을 만듭니다 (시드 고정)
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Union
+
+import xlsxwriter
+
+GROUPS = [f"g{i}" for i in range(10)]
+WORDS = ["서울", "부산", "대구", "인천", "광주", "대전", "alpha", "beta", "gamma", "delta", "omega", "sigma"]
+EPOCH = datetime(2020, 1, 1)
+
+# 워크로드: 컬럼 종류별 개수와 시트 수 (모든 시트에 id, group 컬럼 포함)
+WORKLOADS: Dict[str, Dict[str, int]] = {
+    "numeric-narrow": {"numeric": 4, "string": 0, "date": 0, "sheets": 1},
+    "string-narrow": {"numeric": 0, "string": 4, "date": 0, "sheets": 1},
+    "date-narrow": {"numeric": 0, "string": 0, "date": 4, "sheets": 1},
+    "mixed-wide": {"numeric": 20, "string": 20, "date": 8, "sheets": 1},
+    "multi-sheet": {"numeric": 2, "string": 2, "date": 1, "sheets": 4},
+}
+
+
+def workload_columns(workload: str) -> List[str]:
+    """워크로드의 컬럼 이름 목록"""
+    spec = WORKLOADS[workload]
+    columns = ["id", "group"]
+    columns += [f"n{i}" for i in range(spec["numeric"])]
+    columns += [f"s{i}" for i in range(spec["string"])]
+    columns += [f"d{i}" for i in range(spec["date"])]
+    return columns
+
+
+def sheet_names(workload: str) -> List[str]:
+    return [f"Sheet{i + 1}" for i in range(WORKLOADS[workload]["sheets"])]
+
+
+def _value_makers(columns: List[str], rng: random.Random) -> List[Callable[[int], Any]]:
+    makers = []
+    for name in columns:
+        if name == "id":
+            makers.append(lambda row: row)
+        elif name == "group":
+            makers.append(lambda row: GROUPS[rng.randrange(len(GROUPS))])
+        elif name.startswith("n"):
+            # 정수/실수를 섞고 가끔 빈 칸
+            makers.append(lambda row: None if rng.random() < 0.02 else round(rng.gauss(1000, 250), 2)
+                          if rng.random() < 0.5 else rng.randrange(1_000_000))
+        elif name.startswith("s"):
+            makers.append(lambda row: None if rng.random() < 0.02 else
+                          f"{WORDS[rng.randrange(len(WORDS))]}-{rng.randrange(5000)}")
+        else:
+            makers.append(lambda row: EPOCH + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60)))
+    return makers
+
+
+def generate_records(workload: str, rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """워크로드의 행을 딕셔너리 목록으로 (날짜는 ISO 문자열, write_excel 입력용)"""
+    rng = random.Random(seed)
+    columns = workload_columns(workload)
+    makers = _value_makers(columns, rng)
+    records = []
+    for row in range(rows):
+        values = [make(row) for make in makers]
+        records.append({name: value.isoformat() if isinstance(value, datetime) else value
+                        for name, value in zip(columns, values)})
+    return records
+
+
+def generate_workbook(path: Union[str, Path], workload: str, rows: int, seed: int = 0) -> Path:
+    """워크로드 파일 생성 (시트마다 rows행, 헤더 1행)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = workload_columns(workload)
+    workbook = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+    try:
+        for index, name in enumerate(sheet_names(workload)):
+            rng = random.Random(seed * 1000 + index)
+            makers = _value_makers(columns, rng)
+            sheet = workbook.add_worksheet(name)
+            sheet.write_row(0, 0, columns)
+            for row in range(1, rows + 1):
+                for col, make in enumerate(makers):
+                    value = make(row)
+                    if value is None:
+                        continue
+                    if isinstance(value, datetime):
+                        sheet.write_datetime(row, col, value, date_format)
+                    else:
+                        sheet.write(row, col, value)
+    finally:
+        workbook.close()
+    return path
+
+
+def ensure_workbook(folder: Union[str, Path], workload: str, rows: int, seed: int = 0) -> Path:
+    """캐시 폴더에 워크로드 파일이 없으면 생성하고 경로 반환"""
+    path = Path(folder) / f"{workload}-{rows}-s{seed}.xlsx"
+    if not path.exists():
+        tmp = path.with_name(path.name + ".part")
+        generate_workbook(tmp, workload, rows, seed)
+        tmp.replace(path)
+    return path
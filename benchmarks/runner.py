@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+벤치마크 실행
+시나리오마다 새 프로세스를 띄워 실행하므로 최대 메모리(RSS)와 CPU 시간이 시나리오별로 측정됩니다.
+
+- inprocess: 자식 프로세스에서 MCPServer 도구 메서드를 직접 호출 (응답 인코딩 포함)
+- stdio: excel_mcp_server.py를 실행하고 JSON-RPC 요청/응답을 주고받음
+- startup (--startup): 프로세스 시작부터 initialize, tools/list, 첫 도구 호출 응답까지의 시간
+
+같은 호출을 repeat번 반복해 첫 호출(cold)과 나머지 호출의 중앙값(warm)을 따로 기록합니다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.compare import compare, format_report
+from benchmarks.generate import WORKLOADS, ensure_workbook, generate_records, sheet_names
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER = ROOT / "excel_mcp_server.py"
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "excel-mcp-bench"
+MODES = ("inprocess", "stdio")
+WRITE_ROWS = 10000  # 쓰기 시나리오에서 보내는 최대 행 수
+SESSION_CHUNK = 2000
+SESSION_ID = "$session"  # 직전 begin_write의 session_id로 바뀌는 자리표시
+STARTUP_STEPS = ("initialize", "tools_list", "first_call")
+
+Call = Tuple[str, Dict[str, Any]]
+
+
+def scenarios(workload: str, rows: int, file_path: Path, out_dir: Path) -> Dict[str, List[Call]]:
+    """시나리오 이름별 도구 호출 목록"""
+    file_path, out_path = str(file_path), str(out_dir / "written.xlsx")
+    calls: Dict[str, List[Call]] = {
+        "get_excel_info": [("get_excel_info", {"file_path": file_path})],
+        "read_head": [("read_excel", {"file_path": file_path, "rows": 100})],
+        "read_full": [("read_excel", {"file_path": file_path, "format": "columns"})],
+        "read_page": [("read_excel", {"file_path": file_path, "offset": rows // 2, "limit": 1000})],
+        "analyze": [("analyze_excel", {"file_path": file_path})],
+        "analyze_stream": [("analyze_excel", {"file_path": file_path, "stream": True})],
+        "filter": [("filter_excel_data", {"file_path": file_path, "filters": {"group": "g3"}, "limit": 1000})],
+        "filter_stream": [("filter_excel_data", {"file_path": file_path, "filters": {"group": "g3"},
+                                                 "limit": 1000, "stream": True})],
+        "batch": [("batch", {"file_path": file_path, "calls": [
+            {"tool": "analyze_excel"},
+            {"tool": "filter_excel_data", "arguments": {"filters": {"group": "g3"}, "limit": 100}},
+            {"tool": "read_excel", "arguments": {"rows": 100}},
+        ]})],
+    }
+    if len(sheet_names(workload)) > 1:
+        calls["analyze_workbook"] = [("analyze_excel", {"file_path": file_path, "sheet_name": "*"})]
+        calls["read_workbook"] = [("read_excel", {"file_path": file_path, "sheet_name": "*", "rows": 100})]
+
+    records = generate_records(workload, min(rows, WRITE_ROWS))
+    calls["write_excel"] = [("write_excel", {"file_path": out_path, "data": records})]
+    session = [("begin_write", {"file_path": out_path})]
+    for start in range(0, len(records), SESSION_CHUNK):
+        session.append(("append_rows", {"session_id": SESSION_ID, "rows": records[start:start + SESSION_CHUNK]}))
+    session.append(("commit_write", {"session_id": SESSION_ID}))
+    calls["write_session"] = session
+    calls["write_append"] = [("write_excel", {"file_path": out_path, "mode": "append", "data": records[:100]})]
+    return calls
+
+
+def _bind_session(arguments: Dict[str, Any], session_id: Optional[str]) -> Dict[str, Any]:
+    if arguments.get("session_id") == SESSION_ID:
+        return {**arguments, "session_id": session_id}
+    return arguments
+
+
+def _summary(walls: List[float]) -> Dict[str, Any]:
+    return {
+        "cold_ms": round(walls[0] * 1000, 3),
+        "warm_ms": round(statistics.median(walls[1:]) * 1000, 3) if len(walls) > 1 else None,
+    }
+
+
+# 자식 프로세스 (inprocess)
+def run_child(spec_path: str):
+    """spec 파일의 호출을 이 프로세스에서 실행하고 결과를 stdout에 JSON으로 출력"""
+    sys.path.insert(0, str(ROOT))
+    from excel_config import ServerConfig
+    from excel_encoding import encode_result
+    from excel_mcp_server import MCPServer
+
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    server = MCPServer(ServerConfig(cache_dir=spec["cache_dir"]))
+    walls, sizes, failures = [], [], []
+    for _ in range(spec["repeat"]):
+        session_id, size = None, 0
+        started = time.perf_counter()
+        for tool, arguments in spec["calls"]:
+            result = asyncio.run(server.call_tool(tool, _bind_session(arguments, session_id)))
+            text = encode_result(result)[0]
+            size += len(text.encode("utf-8"))
+            session_id = result.get("session_id", session_id)
+            if not result.get("success"):
+                failures.append(result.get("error"))
+        walls.append(time.perf_counter() - started)
+        sizes.append(size)
+    print(json.dumps({"walls": walls, "response_bytes": sizes[0], "errors": failures[:3]}))
+
+
+def _measure(command: List[str], env: Dict[str, str],
+             interact=None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """자식 프로세스를 실행하고 (interact 결과, 자원 사용량) 반환"""
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=env, cwd=str(ROOT))
+    try:
+        if interact is None:
+            process.stdin.close()
+            output = json.loads(process.stdout.read() or b"{}")
+        else:
+            output = interact(process)
+    finally:
+        if process.stdin and not process.stdin.closed:
+            process.stdin.close()
+    # wait4는 이 자식 하나의 자원 사용량을 돌려줌
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    resources = {
+        "cpu_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 1),
+        # Linux는 KB, macOS는 바이트 단위
+        "peak_rss_mb": round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+    }
+    return output, resources
+
+
+def run_inprocess(calls: List[Call], repeat: int, cache_dir: Path, env: Dict[str, str]) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump({"calls": calls, "repeat": repeat, "cache_dir": str(cache_dir)}, f, ensure_ascii=False)
+    try:
+        output, resources = _measure([sys.executable, "-m", "benchmarks.runner", "child", f.name], env)
+    finally:
+        os.unlink(f.name)
+    return {**_summary(output["walls"]), "response_bytes": output["response_bytes"],
+            "errors": output["errors"], **resources}
+
+
+def run_stdio(calls: List[Call], repeat: int, cache_dir: Path, env: Dict[str, str]) -> Dict[str, Any]:
+    env = {**env, "EXCEL_MCP_CACHE_DIR": str(cache_dir)}
+
+    def interact(process: subprocess.Popen) -> Dict[str, Any]:
+        next_id = 0
+
+        def request(method: str, params: Dict[str, Any]) -> bytes:
+            nonlocal next_id
+            next_id += 1
+            line = json.dumps({"jsonrpc": "2.0", "id": next_id, "method": method, "params": params},
+                              ensure_ascii=False) + "\n"
+            process.stdin.write(line.encode("utf-8"))
+            process.stdin.flush()
+            return process.stdout.readline()
+
+        request("initialize", {})
+        walls, sizes, failures = [], [], []
+        for _ in range(repeat):
+            session_id, size = None, 0
+            started = time.perf_counter()
+            for tool, arguments in calls:
+                raw = request("tools/call", {"name": tool, "arguments": _bind_session(arguments, session_id)})
+                size += len(raw)
+                response = json.loads(raw)
+                if "error" in response:
+                    failures.append(response["error"].get("message"))
+                    continue
+                result = json.loads(response["result"]["content"][0]["text"])
+                session_id = result.get("session_id", session_id)
+                if not result.get("success"):
+                    failures.append(result.get("error"))
+            walls.append(time.perf_counter() - started)
+            sizes.append(size)
+        process.stdin.close()
+        process.stdout.read()
+        return {"walls": walls, "response_bytes": sizes[0], "errors": failures[:3]}
+
+    output, resources = _measure([sys.executable, str(SERVER)], env, interact)
+    return {**_summary(output["walls"]), "response_bytes": output["response_bytes"],
+            "errors": output["errors"], **resources}
+
+
+def run_startup(repeat: int, data_dir: Path, env: Dict[str, str]) -> List[Dict[str, Any]]:
+    """서버를 repeat번 새로 띄워 시작 단계별 응답 시간 측정 (첫 회가 cold)"""
+    file_path = ensure_workbook(data_dir, "numeric-narrow", 1000)
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+        {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+         "params": {"name": "read_excel", "arguments": {"file_path": str(file_path), "rows": 10}}},
+    ]
+    walls: Dict[str, List[float]] = {step: [] for step in STARTUP_STEPS}
+    failures: List[Any] = []
+    resources: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+
+        def interact(process: subprocess.Popen) -> Dict[str, Any]:
+            for step, message in zip(STARTUP_STEPS, messages):
+                process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+                process.stdin.flush()
+                response = json.loads(process.stdout.readline() or b"{}")
+                walls[step].append(time.perf_counter() - started)
+                if "result" not in response:
+                    failures.append(response.get("error", "no response"))
+                if step == "initialize":
+                    notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+                    process.stdin.write((json.dumps(notification) + "\n").encode("utf-8"))
+            process.stdin.close()
+            process.stdout.read()
+            return {}
+
+        resources.append(_measure([sys.executable, str(SERVER)], env, interact)[1])
+
+    return [{"workload": "startup", "rows": 0, "mode": "stdio", "scenario": step, "success": not failures,
+             **_summary(walls[step]), "response_bytes": None, "errors": failures[:3], **resources[0]}
+            for step in STARTUP_STEPS]
+
+
+def run_benchmarks(workloads: List[str], row_counts: List[int], modes: List[str], repeat: int = 3,
+                   data_dir: Path = DEFAULT_DATA_DIR, only: Optional[List[str]] = None,
+                   log=print, startup: bool = False) -> Dict[str, Any]:
+    """워크로드 × 행 수 × 모드 × 시나리오를 실행한 결과 (startup이면 시작 시간도 측정)"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    results = []
+    if startup:
+        for entry in run_startup(repeat, data_dir, env):
+            results.append(entry)
+            log(f"{'startup':>14} {entry['scenario']:<16} cold {entry['cold_ms']:>10.1f}ms"
+                f"  warm {entry['warm_ms'] or 0:>10.1f}ms{'' if entry['success'] else '  FAILED'}")
+    for workload in workloads:
+        for rows in row_counts:
+            file_path = ensure_workbook(data_dir, workload, rows)
+            with tempfile.TemporaryDirectory(prefix="excel-mcp-bench-") as tmp:
+                for scenario, calls in scenarios(workload, rows, file_path, Path(tmp)).items():
+                    if only and scenario not in only:
+                        continue
+                    for mode in modes:
+                        # 시나리오마다 빈 캐시 폴더로 시작
+                        cache_dir = Path(tmp) / f"cache-{scenario}-{mode}"
+                        runner = run_inprocess if mode == "inprocess" else run_stdio
+                        measured = runner(calls, repeat, cache_dir, env)
+                        entry = {"workload": workload, "rows": rows, "mode": mode, "scenario": scenario,
+                                 "success": not measured["errors"], **measured}
+                        results.append(entry)
+                        log(f"{workload:>14} {rows:>8} {mode:>9} {scenario:<16} cold {entry['cold_ms']:>10.1f}ms"
+                            f"  warm {entry['warm_ms'] or 0:>10.1f}ms  rss {entry['peak_rss_mb']:>7.1f}MB"
+                            f"  {entry['response_bytes']:>10}B{'' if entry['success'] else '  FAILED'}")
+    return {"meta": environment(repeat), "results": results}
+
+
+def environment(repeat: int) -> Dict[str, Any]:
+    """결과 파일에 함께 기록하는 실행 환경"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT), capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["child"]:
+        run_child(argv[1])
+        return 0
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Excel MCP Server 벤치마크")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help=f"쉼표로 구분한 워크로드 ({', '.join(WORKLOADS)})")
+    parser.add_argument("--rows", default="10000", help="쉼표로 구분한 행 수 (예: 10000,100000,1000000)")
+    parser.add_argument("--modes", default=",".join(MODES), help="inprocess, stdio")
+    parser.add_argument("--scenarios", default=None, help="실행할 시나리오만 (쉼표로 구분)")
+    parser.add_argument("--startup", action="store_true",
+                        help="서버 시작 시간(initialize, tools/list, 첫 도구 호출 응답까지)도 측정")
+    parser.add_argument("--startup-only", action="store_true", help="서버 시작 시간만 측정")
+    parser.add_argument("--repeat", type=int, default=3, help="시나리오당 반복 횟수 (첫 회는 cold)")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="생성한 워크북을 보관할 폴더")
+    parser.add_argument("--output", help="결과 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON (회귀가 있으면 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 증가율 (기본 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = [w for w in workloads if w not in WORKLOADS]
+    if unknown:
+        parser.error(f"알 수 없는 워크로드: {unknown}")
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    if any(m not in MODES for m in modes):
+        parser.error(f"모드는 {', '.join(MODES)} 중에서 선택하세요")
+    only = [s.strip() for s in args.scenarios.split(",")] if args.scenarios else None
+
+    if args.startup_only:
+        workloads = []
+    report = run_benchmarks(workloads, [int(r) for r in args.rows.split(",")], modes, max(1, args.repeat),
+                            Path(args.data_dir), only, log=lambda line: print(line, file=sys.stderr),
+                            startup=args.startup or args.startup_only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        print(format_report(regressions), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+그룹별 집계
+캐시된 DataFrame에 pandas groupby를 한 번 적용해 작은 집계 결과만 만듭니다.
+모든 집계는 그룹 단위 파이썬 호출 없이 벡터화된 groupby 연산으로 계산합니다.
+
+집계 형식:
+    {"function": "count"}                              # 그룹의 행 수
+    {"column": "연봉", "function": "sum"}              # 결과 컬럼 이름: 연봉_sum
+    {"column": "연봉", "function": "quantile", "q": 0.9, "as": "연봉_p90"}
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+AGGREGATE_FUNCTIONS = ("sum", "mean", "count", "min", "max", "quantile", "distinct")
+# 숫자(또는 날짜) 컬럼에만 쓸 수 있는 집계
+NUMERIC_FUNCTIONS = frozenset({"sum", "mean", "quantile"})
+
+
+class Aggregation:
+    """집계 하나 (컬럼, 함수, 결과 컬럼 이름)"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict):
+            raise ValueError(f"집계는 객체여야 합니다: {spec!r}")
+        self.function = spec.get("function")
+        if self.function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"지원하지 않는 집계 함수입니다: {self.function} "
+                             f"(가능한 값: {', '.join(AGGREGATE_FUNCTIONS)})")
+        self.column: Optional[str] = spec.get("column")
+        if self.column is None and self.function != "count":
+            raise ValueError(f"{self.function} 집계에는 column이 필요합니다")
+        self.q = spec.get("q", 0.5)
+        if self.function == "quantile" and not (isinstance(self.q, (int, float)) and 0 <= self.q <= 1):
+            raise ValueError(f"quantile의 q는 0과 1 사이의 숫자여야 합니다: {self.q!r}")
+        self.name = spec.get("as") or self._default_name()
+
+    def _default_name(self) -> str:
+        if self.column is None:
+            return "count"
+        if self.function == "quantile":
+            return f"{self.column}_p{self.q * 100:g}"
+        return f"{self.column}_{self.function}"
+
+
+def compile_aggregations(specs: Sequence[Dict[str, Any]]) -> List[Aggregation]:
+    """집계 목록 확인 (결과 컬럼 이름이 겹치면 ValueError)"""
+    if not specs:
+        raise ValueError("aggregations에 집계를 하나 이상 지정해주세요")
+    aggregations = [Aggregation(spec) for spec in specs]
+    names = [aggregation.name for aggregation in aggregations]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"결과 컬럼 이름이 겹칩니다: {duplicated} (as로 이름을 지정해주세요)")
+    return aggregations
+
+
+def aggregate_columns(group_by: Sequence[str], aggregations: Sequence[Aggregation]) -> List[str]:
+    """집계에 필요한 입력 컬럼 (순서 유지, 중복 제거)"""
+    columns = list(group_by) + [a.column for a in aggregations if a.column is not None]
+    return list(dict.fromkeys(columns))
+
+
+def aggregate_frame(df: pd.DataFrame, group_by: Sequence[str],
+                    aggregations: Sequence[Aggregation]) -> pd.DataFrame:
+    """그룹 키 컬럼과 집계 컬럼으로 이루어진 결과 DataFrame
+
+    group_by가 비어 있으면 전체를 한 그룹으로 집계해 한 행을 반환합니다.
+    빈 값인 그룹 키도 하나의 그룹으로 유지하며, 범주형 키는 실제로 있는 값만 그룹으로 만듭니다.
+    """
+    missing = [c for c in aggregate_columns(group_by, aggregations) if c not in df.columns]
+    if missing:
+        raise ValueError(f"컬럼을 찾을 수 없습니다: {missing} (사용 가능한 컬럼: {df.columns.tolist()})")
+    clashes = [a.name for a in aggregations if a.name in group_by]
+    if clashes:
+        raise ValueError(f"집계 결과 이름이 그룹 키와 같습니다: {clashes} (as로 이름을 지정해주세요)")
+
+    frame = df[aggregate_columns(group_by, aggregations)].copy(deep=False)
+    for aggregation in aggregations:
+        if aggregation.column is not None and aggregation.column not in group_by:
+            frame[aggregation.column] = _measure_values(frame[aggregation.column], aggregation)
+
+    keys: Any = list(group_by) if group_by else np.zeros(len(frame), dtype=np.int8)
+    grouped = frame.groupby(keys, observed=True, dropna=False, sort=True)
+    results: List[Tuple[str, pd.Series]] = []
+    for aggregation in aggregations:
+        if aggregation.column is None:
+            values = grouped.size()
+        else:
+            column = grouped[aggregation.column]
+            if aggregation.function == "quantile":
+                values = column.quantile(aggregation.q)
+            elif aggregation.function == "distinct":
+                values = column.nunique()
+            else:
+                values = getattr(column, aggregation.function)()
+        results.append((aggregation.name, values))
+
+    result = pd.DataFrame({name: values for name, values in results})
+    if group_by:
+        return result.reset_index()
+    return result.reset_index(drop=True)
+
+
+def _measure_values(series: pd.Series, aggregation: Aggregation) -> pd.Series:
+    """집계할 값 준비 (범주형은 원래 값 타입으로, float32는 float64로 넓혀 정밀도 유지)"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and aggregation.function not in ("count", "distinct"):
+        # 순서 없는 범주형은 min/max를 계산할 수 없음
+        series = series.astype(series.cat.categories.dtype)
+    if aggregation.function in NUMERIC_FUNCTIONS:
+        dtype = series.dtype
+        numeric = pd.api.types.is_numeric_dtype(dtype) and not (
+            pd.api.types.is_bool_dtype(dtype) and aggregation.function == "quantile")
+        datetime_like = pd.api.types.is_datetime64_any_dtype(dtype) and aggregation.function != "sum"
+        if not (numeric or datetime_like):
+            raise ValueError(f"숫자가 아닌 컬럼에는 {aggregation.function} 집계를 쓸 수 없습니다: "
+                             f"{aggregation.column} ({dtype})")
+    if series.dtype == np.float32:
+        series = series.astype(np.float64)
+    return series
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+파싱된 Excel 데이터 캐시
+파일 버전(경로, 수정 시각, 크기)과 시트를 키로 DataFrame을 메모리에 보관합니다.
+분석 결과는 파일 버전과 옵션을 키로 따로 보관하며 선택적으로 SQLite 파일에 남깁니다
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+from excel_metrics import phase
+
+FileVersion = Tuple[str, int, int]
+
+
+def file_version(file_path: Union[str, Path]) -> FileVersion:
+    """파일 버전 키 반환 (절대 경로, 수정 시각(ns), 크기)"""
+    with phase("stat"):
+        path = Path(file_path).resolve()
+        stat = path.stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def frame_nbytes(df: Any) -> int:
+    """DataFrame이 차지하는 실제 메모리 크기"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class CacheEntry:
+    """캐시 항목 (DataFrame과 메모리 크기)"""
+
+    def __init__(self, frame: Any, nbytes: int):
+        self.frame = frame
+        self.nbytes = nbytes
+
+
+class FrameCache:
+    """메모리 예산 기반 LRU DataFrame 캐시
+
+    키의 첫 요소는 항상 file_version() 결과이므로 파일이 디스크에서 바뀌었을 때만
+    새 키가 만들어지고, 같은 경로의 이전 버전 항목은 즉시 제거됩니다.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: "weakref.WeakValueDictionary[Hashable, threading.Lock]" = weakref.WeakValueDictionary()
+
+    def key_lock(self, key: Hashable) -> threading.Lock:
+        """키별 적재 잠금 (동시 요청이 같은 시트를 중복 파싱하지 않도록)"""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._key_locks[key] = lock
+            return lock
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable, record: bool = True) -> Optional[Any]:
+        """캐시된 DataFrame 조회 (없으면 None, record=False면 통계에 반영하지 않음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return entry.frame
+
+    def put(self, key: Hashable, frame: Any) -> bool:
+        """DataFrame 저장 (예산보다 큰 경우 저장하지 않고 False 반환)"""
+        nbytes = frame_nbytes(frame)
+        if nbytes > self.max_bytes:
+            return False
+
+        with self._lock:
+            self._drop_stale_versions(key)
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = CacheEntry(frame, nbytes)
+            self.current_bytes += nbytes
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """모든 항목 제거"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _drop_stale_versions(self, key: Hashable):
+        """같은 경로의 이전 파일 버전 항목 제거"""
+        version = key[0]
+        stale = [
+            other for other in self._entries
+            if other[0][0] == version[0] and other[0] != version
+        ]
+        for other in stale:
+            self.current_bytes -= self._entries.pop(other).nbytes
+
+
+class ResultCache:
+    """도구 결과 캐시 (파일 버전 + 옵션 키, 최대 max_entries개 LRU)
+
+    db_path가 주어지면 결과를 SQLite 파일에도 저장해 서버를 다시 시작해도 사용합니다.
+    파일이 바뀌면 버전이 달라지므로 이전 결과는 조회되지 않고, 새 결과를 저장할 때 삭제됩니다.
+    """
+
+    def __init__(self, max_entries: int = 256, db_path: Optional[Union[str, Path]] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self._open(Path(db_path))
+
+    def get(self, version: FileVersion, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """저장된 결과 조회 (없으면 None)"""
+        key = (version, self._options_key(options))
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE path = ? AND mtime_ns = ? AND size = ? AND options = ?",
+                    (*version, key[1])
+                ).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, version: FileVersion, options: Dict[str, Any], result: Dict[str, Any]):
+        """결과 저장 (같은 경로의 이전 버전 결과는 삭제)"""
+        key = (version, self._options_key(options))
+        with self._lock:
+            for other in [k for k in self._entries if k[0][0] == version[0] and k[0] != version]:
+                del self._entries[other]
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute("DELETE FROM results WHERE path = ? AND (mtime_ns != ? OR size != ?)", version)
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                                 (*version, key[1], json.dumps(result, ensure_ascii=False, default=str), time.time()))
+                self._db.commit()
+
+    def clear(self):
+        """모든 항목 제거 (SQLite 파일 포함)"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: Hashable, result: Dict[str, Any]):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _options_key(self, options: Dict[str, Any]) -> str:
+        return json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _open(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 작업자 스레드에서 함께 쓰므로 잠금(self._lock)으로 직렬화
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                path TEXT, mtime_ns INTEGER, size INTEGER, options TEXT, value TEXT, created REAL,
+                PRIMARY KEY (path, mtime_ns, size, options)
+            )
+        """)
+        self._db.commit()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+DataFrame 메모리 압축
+캐시에 넣기 전에 숫자 컬럼을 값이 바뀌지 않는 가장 작은 타입으로 줄이고,
+고유값이 적은 문자열 컬럼은 category로 바꿉니다 (pyarrow가 있으면 나머지 문자열은 Arrow 문자열로 선택 가능).
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow가 없으면 Arrow 문자열 변환은 건너뜀
+    pa = None
+
+MIN_ROWS = 1000  # 이보다 작은 시트는 압축해도 줄어드는 메모리가 거의 없음
+# 압축 전 메모리 사용량(바이트)을 기록하는 DataFrame.attrs 키
+MEMORY_BEFORE = "memory_before_compaction"
+# 압축한 컬럼의 원래 타입({컬럼명: dtype})을 기록하는 DataFrame.attrs 키
+DTYPES_BEFORE = "dtypes_before_compaction"
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """DataFrame의 실제 메모리 사용량 (바이트, 문자열 객체 포함)"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compact_frame(df: pd.DataFrame, category_ratio: float = 0.5, arrow_strings: bool = False,
+                  min_rows: int = MIN_ROWS) -> pd.DataFrame:
+    """메모리를 덜 쓰는 타입으로 바꾼 DataFrame (값은 그대로, 바뀐 컬럼이 없으면 원본)
+
+    - 정수: 값 범위에 맞는 가장 작은 정수 타입
+    - 실수: float32로 바꿔도 모든 값이 같을 때만 float32
+    - 문자열: 고유값 수 / 값이 있는 행 수가 category_ratio 이하면 category,
+      아니면 arrow_strings이고 pyarrow가 있을 때 Arrow 문자열
+    압축 전 메모리 사용량은 df.attrs[MEMORY_BEFORE]에, 바꾼 컬럼의 원래 타입은
+    df.attrs[DTYPES_BEFORE]에 기록합니다.
+    """
+    if len(df) < min_rows:
+        return df
+    before = frame_memory(df)
+    changes: Dict[int, pd.Series] = {}
+    for position in range(df.shape[1]):
+        compacted = _compact_column(df.iloc[:, position], category_ratio, arrow_strings)
+        if compacted is not None:
+            changes[position] = compacted
+    if not changes:
+        return df
+
+    dtypes = {df.columns[position]: df.dtypes.iloc[position] for position in changes}
+    df = df.copy(deep=False)
+    for position, series in changes.items():
+        df.isetitem(position, series)
+    df.attrs[MEMORY_BEFORE] = before
+    df.attrs[DTYPES_BEFORE] = dtypes
+    return df
+
+
+def restore_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """compact_frame이 바꾼 컬럼을 원래 타입으로 되돌린 DataFrame (압축하지 않았으면 원본)
+
+    float32 합계처럼 압축한 타입에서는 결과가 달라지는 통계를 계산할 때 사용합니다.
+    """
+    dtypes = df.attrs.get(DTYPES_BEFORE)
+    if not dtypes:
+        return df
+    restored = df.copy(deep=False)
+    for position, name in enumerate(df.columns):
+        dtype = dtypes.get(name)
+        if dtype is not None and df.dtypes.iloc[position] != dtype:
+            restored.isetitem(position, df.iloc[:, position].astype(dtype))
+    del restored.attrs[DTYPES_BEFORE]
+    return restored
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, Any]:
+    """압축 전후 메모리 사용량 (압축하지 않았으면 전후가 같음)"""
+    after = frame_memory(df)
+    before = df.attrs.get(MEMORY_BEFORE, after)
+    return {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_ratio": round(1 - after / before, 4) if before else 0.0,
+    }
+
+
+def _compact_column(series: pd.Series, category_ratio: float, arrow_strings: bool) -> Optional[pd.Series]:
+    """컬럼 하나의 압축 결과 (바꿀 필요가 없으면 None)"""
+    # 확장 타입(nullable 정수 등)의 숫자 컬럼은 그대로 둠
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+    if kind in ("i", "u"):
+        return _downcast_integer(series)
+    if kind == "f":
+        return _downcast_float(series)
+    if not _is_text(series):
+        return None
+
+    values = series.count()
+    if values and series.nunique() <= values * category_ratio:
+        return series.astype("category")
+    dtype = _arrow_string_dtype() if arrow_strings else None
+    if dtype is not None and series.dtype != dtype:
+        return series.astype(dtype)
+    return None
+
+
+def _downcast_integer(series: pd.Series) -> Optional[pd.Series]:
+    if series.empty:
+        return None
+    low, high = series.min(), series.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype) if np.dtype(dtype).itemsize < series.dtype.itemsize else None
+    return None
+
+
+def _downcast_float(series: pd.Series) -> Optional[pd.Series]:
+    if series.dtype.itemsize <= 4:
+        return None
+    values = series.to_numpy()
+    with np.errstate(over="ignore"):
+        narrowed = values.astype(np.float32)
+    # NaN은 NaN끼리 같은 값으로 보고, 하나라도 달라지면 그대로 둠
+    same = (narrowed.astype(values.dtype) == values) | (np.isnan(values) & np.isnan(narrowed))
+    return pd.Series(narrowed, index=series.index, name=series.name) if same.all() else None
+
+
+def _is_text(series: pd.Series) -> bool:
+    """문자열(과 빈 값)만 있는 컬럼"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+        return False
+    return pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+
+def _arrow_string_dtype() -> Optional[Any]:
+    """빈 값을 NaN으로 두는 Arrow 문자열 타입 (pyarrow나 pandas가 지원하지 않으면 None)"""
+    if pa is None:
+        return None
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:  # na_value를 지원하지 않는 pandas는 빈 값이 pd.NA가 되므로 사용하지 않음
+        return None
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Excel MCP Server 설정
+클로드 데스크탑 설정의 "env" 항목(EXCEL_MCP_*)으로 서버 동작을 조정합니다
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "excel-mcp"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """정수 환경 변수 읽기 (없거나 잘못된 값이면 기본값)"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """참/거짓 환경 변수 읽기 (1, true, yes, on이면 참, 설정하지 않았으면 default)"""
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+def _env_limits(name: str) -> Dict[str, int]:
+    """도구별 개수 목록 환경 변수 읽기 (예: analyze_excel=1,read_excel=4)"""
+    limits = {}
+    for item in os.environ.get(name, "").split(","):
+        tool_name, _, value = item.partition("=")
+        if tool_name.strip() and value.strip().isdigit():
+            limits[tool_name.strip()] = max(1, int(value))
+    return limits
+
+
+class ServerConfig:
+    """서버 설정값"""
+
+    def __init__(self, cache_max_bytes: int = 512 * 1024 * 1024,
+                 max_workers: int = 4,
+                 tool_concurrency: Optional[Dict[str, int]] = None,
+                 parse_engine: str = "inline",
+                 parse_workers: Optional[int] = None,
+                 parse_warm: bool = False,
+                 cache_dir: Optional[Path] = None,
+                 sidecar: bool = False,
+                 max_response_bytes: Optional[int] = 16 * 1024 * 1024,
+                 max_rows: Optional[int] = None,
+                 persist_results: bool = False,
+                 trace_memory: bool = False,
+                 metrics_file: Optional[Path] = None,
+                 metrics_interval: int = 60,
+                 prewarm: bool = True,
+                 compact: bool = True,
+                 category_ratio: float = 0.5,
+                 arrow_strings: bool = False,
+                 sql_on_disk: bool = False,
+                 index_after: int = 3):
+        # 파싱된 DataFrame 캐시의 메모리 예산 (바이트)
+        self.cache_max_bytes = cache_max_bytes
+        # 도구 호출을 처리하는 작업자 스레드 수
+        self.max_workers = max(1, max_workers)
+        # 도구별 동시 실행 제한 (지정하지 않은 도구는 max_workers)
+        self.tool_concurrency = tool_concurrency or {}
+        # 시트 파싱 엔진 ("inline" 또는 "process")과 프로세스 풀 설정
+        self.parse_engine = parse_engine
+        self.parse_workers = parse_workers
+        self.parse_warm = parse_warm
+        # 디스크에 남기는 캐시(사이드카 등)의 위치
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        # 시트를 컬럼 형식 사이드카로 변환해 두고 다시 읽을 때 사용
+        self.sidecar = sidecar
+        # 응답 하나의 data 크기/행 수 상한 (None이나 0이면 제한 없음)
+        self.max_response_bytes = max_response_bytes or None
+        self.max_rows = max_rows or None
+        # 분석 결과를 cache_dir의 SQLite 파일에도 저장해 서버를 다시 시작해도 사용
+        self.persist_results = persist_results
+        # 도구 호출마다 tracemalloc으로 메모리 최대치 측정 (느려지므로 기본은 끔)
+        self.trace_memory = trace_memory
+        # 지표를 metrics_interval초마다 저장할 JSON 파일 (None이면 저장하지 않음)
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.metrics_interval = max(1, metrics_interval)
+        # 핸드셰이크 후 백그라운드 스레드에서 pandas/openpyxl 등을 미리 불러옴
+        self.prewarm = prewarm
+        # 캐시에 넣는 시트의 타입 압축 (숫자 다운캐스트, 고유값 비율이 category_ratio 이하인 문자열은 category)
+        self.compact = compact
+        self.category_ratio = category_ratio
+        # 압축할 때 category가 아닌 문자열 컬럼은 Arrow 문자열로 (pyarrow가 있을 때만)
+        self.arrow_strings = arrow_strings
+        # query_excel이 시트를 적재하는 SQLite DB를 메모리 대신 cache_dir의 파일로 (다시 시작해도 재사용)
+        self.sql_on_disk = sql_on_disk
+        # 같은 시트/컬럼을 index_after번 필터링하면 보조 인덱스를 만듦 (0이면 요청할 때만)
+        self.index_after = max(0, index_after)
+
+    def tool_limit(self, tool_name: str) -> int:
+        """도구의 동시 실행 제한"""
+        return min(self.tool_concurrency.get(tool_name, self.max_workers), self.max_workers)
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """환경 변수에서 설정 생성"""
+        return cls(
+            cache_max_bytes=_env_int("EXCEL_MCP_CACHE_MB", 512) * 1024 * 1024,
+            max_workers=_env_int("EXCEL_MCP_WORKERS", min(4, os.cpu_count() or 1)),
+            tool_concurrency=_env_limits("EXCEL_MCP_TOOL_CONCURRENCY"),
+            parse_engine=os.environ.get("EXCEL_MCP_PARSE_ENGINE", "inline").strip() or "inline",
+            parse_workers=_env_int("EXCEL_MCP_PARSE_WORKERS", None),
+            parse_warm=_env_flag("EXCEL_MCP_PARSE_WARM"),
+            cache_dir=os.environ.get("EXCEL_MCP_CACHE_DIR") or None,
+            sidecar=_env_flag("EXCEL_MCP_SIDECAR"),
+            max_response_bytes=_env_int("EXCEL_MCP_MAX_RESPONSE_MB", 16) * 1024 * 1024,
+            max_rows=_env_int("EXCEL_MCP_MAX_ROWS", None),
+            persist_results=_env_flag("EXCEL_MCP_PERSIST_RESULTS"),
+            trace_memory=_env_flag("EXCEL_MCP_TRACE_MEMORY"),
+            metrics_file=os.environ.get("EXCEL_MCP_METRICS_FILE") or None,
+            metrics_interval=_env_int("EXCEL_MCP_METRICS_INTERVAL", 60),
+            prewarm=_env_flag("EXCEL_MCP_PREWARM", default=True),
+            compact=_env_flag("EXCEL_MCP_COMPACT", default=True),
+            category_ratio=_env_int("EXCEL_MCP_CATEGORY_PERCENT", 50) / 100,
+            arrow_strings=_env_flag("EXCEL_MCP_ARROW_STRINGS"),
+            sql_on_disk=_env_flag("EXCEL_MCP_SQL_DISK"),
+            index_after=_env_int("EXCEL_MCP_INDEX_AFTER", 3)
+        )
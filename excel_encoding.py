@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+결과 직렬화
+도구 결과의 data를 요청한 형식(records, columns, rows+header)으로 만들고,
+들여쓰기 없는 JSON으로 한 번만 인코딩합니다 (orjson이 있으면 사용)
+"""
+
+import json
+import re
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # 서버 시작 시 pandas를 불러오지 않도록 타입 검사에서만 import
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+FORMATS = ("records", "columns", "rows+header")
+DEFAULT_FORMAT = "records"
+
+ENCODER = "orjson" if orjson is not None else "json"
+
+# encode_result에서 미리 인코딩된 data 자리에 넣는 자리표시 문자열 (JSON 문자열 형태)
+_TOKEN_PATTERN = re.compile(r'"@@encoded:[0-9a-f]{32}@@"')
+
+
+def check_format(fmt: str) -> str:
+    """결과 형식 이름 확인"""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 결과 형식입니다: {fmt} (가능한 값: {', '.join(FORMATS)})")
+    return fmt
+
+
+def shape_frame(df: "pd.DataFrame", fmt: str = DEFAULT_FORMAT) -> Any:
+    """DataFrame을 결과 형식의 data로 변환
+
+    records: [{컬럼: 값}, ...] (기존 형식)
+    columns: {컬럼: [값, ...]}
+    rows+header: [[값, ...], ...] (컬럼명은 결과의 columns 항목에 한 번만 포함)
+    """
+    if fmt == "records":
+        return df.to_dict("records")
+    if fmt == "columns":
+        return df.to_dict("list")
+    return df.to_dict("split")["data"]
+
+
+def shape_rows(header: Sequence[str], rows: Sequence[Sequence[Any]], fmt: str = DEFAULT_FORMAT) -> Any:
+    """행 튜플 목록을 결과 형식의 data로 변환 (shape_frame과 같은 형태)"""
+    if fmt == "records":
+        return [dict(zip(header, row)) for row in rows]
+    if fmt == "columns":
+        return {name: [row[i] for row in rows] for i, name in enumerate(header)}
+    return [list(row) for row in rows]
+
+
+class EncodedList(list):
+    """인코딩된 JSON 문자열(json 속성)을 함께 가진 data
+
+    encode_result는 이 값을 다시 인코딩하지 않고 json 문자열을 그대로 이어 붙입니다.
+    """
+
+    json = "[]"
+
+
+class EncodedDict(dict):
+    """EncodedList의 columns 형식 버전"""
+
+    json = "{}"
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        # 날짜는 표준 json 경로와 같은 str() 형식으로 맞춤
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=str, option=options)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """들여쓰기 없는 UTF-8 JSON 문자열 (날짜 등 JSON 타입이 아닌 값은 str())"""
+    return _dumps_bytes(obj).decode("utf-8")
+
+
+def _fragments(shaped: Any) -> Tuple[Any, int]:
+    """shape 결과를 대괄호를 뺀 JSON 조각으로 인코딩 (columns 형식은 컬럼별 조각)"""
+    if isinstance(shaped, dict):
+        parts = {key: _dumps_bytes(values)[1:-1] for key, values in shaped.items()}
+        return parts, sum(len(part) + 1 for part in parts.values())
+    part = _dumps_bytes(shaped)[1:-1]
+    return part, len(part) + 1
+
+
+def encode_rows(total: int, shape: Callable[[int, int], Any], max_bytes: Optional[int] = None,
+                max_rows: Optional[int] = None, chunk_rows: int = 1000) -> Tuple[Any, int]:
+    """행을 조각 단위로 인코딩하면서 예산 안에 들어가는 만큼만 data로 만들기
+
+    shape(start, stop)은 해당 범위 행의 data(shape_frame/shape_rows 결과)를 반환합니다.
+    예산을 넘는 조각은 이진 탐색으로 들어가는 행 수를 찾고, 나머지 행은 변환하지 않습니다.
+    진행이 멈추지 않도록 첫 행은 예산을 넘어도 포함합니다.
+    반환값: (EncodedList 또는 EncodedDict, 포함한 행 수)
+    """
+    limit = total if max_rows is None else min(total, max_rows)
+    initial = shape(0, 0)
+    columnar = isinstance(initial, dict)
+    values: Any = {key: [] for key in initial} if columnar else []
+    parts: Any = {key: [] for key in initial} if columnar else []
+    used = len(_dumps_bytes(initial))
+
+    def append(shaped: Any, fragment: Any):
+        if columnar:
+            for key in values:
+                values[key].extend(shaped[key])
+                parts[key].append(fragment[key])
+        else:
+            values.extend(shaped)
+            parts.append(fragment)
+
+    start = 0
+    while start < limit:
+        stop = min(limit, start + chunk_rows)
+        shaped = shape(start, stop)
+        fragment, size = _fragments(shaped)
+        if max_bytes is None or used + size <= max_bytes or (start == 0 and stop - start == 1):
+            append(shaped, fragment)
+            used += size
+            start = stop
+            continue
+
+        # 조각의 일부만 들어감: 들어가는 최대 행 수 찾기
+        low, high = 1 if start == 0 else 0, stop - start - 1
+        best = None
+        while low <= high:
+            middle = (low + high) // 2
+            candidate = shape(start, start + middle)
+            candidate_fragment, candidate_size = _fragments(candidate)
+            if used + candidate_size <= max_bytes or (start == 0 and middle == 1):
+                best = (middle, candidate, candidate_fragment)
+                low = middle + 1
+            else:
+                high = middle - 1
+        if best is not None and best[0]:
+            append(best[1], best[2])
+            start += best[0]
+        break
+
+    if columnar:
+        data = EncodedDict(values)
+        data.json = "{" + ",".join(
+            dumps(key) + ":[" + b",".join(parts[key]).decode("utf-8") + "]" for key in parts
+        ) + "}"
+    else:
+        data = EncodedList(values)
+        data.json = "[" + b",".join(parts).decode("utf-8") + "]"
+    return data, start
+
+
+def frame_summary(df: Any) -> Dict[str, Any]:
+    """잘린 응답에 붙이는 간단한 요약 (행 수, 컬럼 타입)"""
+    return {"total_rows": len(df), "dtypes": {str(name): str(dtype) for name, dtype in df.dtypes.items()}}
+
+
+def rows_summary(header: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    """행 튜플 목록의 간단한 요약 (타입은 처음 나오는 값 기준)"""
+    dtypes: Dict[str, str] = {}
+    for i, name in enumerate(header):
+        value = next((row[i] for row in rows if i < len(row) and row[i] is not None), None)
+        dtypes[name] = type(value).__name__ if value is not None else "unknown"
+    return {"total_rows": len(rows), "dtypes": dtypes}
+
+
+def _detach_encoded(value: Any, encoded: Dict[str, str]) -> Any:
+    """객체 안(중첩된 dict/list 포함)의 EncodedList/EncodedDict를 자리표시 문자열로 바꾼 사본"""
+    if isinstance(value, (EncodedList, EncodedDict)):
+        token = f"@@encoded:{uuid.uuid4().hex}@@"
+        encoded['"' + token + '"'] = value.json
+        return token
+    if isinstance(value, dict):
+        return {key: _detach_encoded(item, encoded) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_detach_encoded(item, encoded) if isinstance(item, (dict, list)) else item for item in value]
+    return value
+
+
+def encode_result(result: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """도구 결과를 한 번 인코딩하고 직렬화 시간/크기를 _meta로 덧붙임
+
+    _meta는 인코딩이 끝난 문자열 끝에 이어 붙이므로 결과를 다시 인코딩하지 않습니다.
+    반환값: (JSON 문자열, _meta)
+    """
+    started = time.perf_counter()
+    # 이미 인코딩된 data는 자리표시 문자열로 바꿔 두었다가 그대로 끼워 넣음
+    encoded: Dict[str, str] = {}
+    text = dumps(_detach_encoded(result, encoded))
+    if encoded:
+        # 한 번 훑으면서 모든 자리표시를 바꿈 (블록마다 전체 문자열을 다시 복사하지 않음)
+        text = _TOKEN_PATTERN.sub(lambda match: encoded.get(match.group(0), match.group(0)), text)
+    meta = {
+        "encoder": ENCODER,
+        "serialize_ms": round((time.perf_counter() - started) * 1000, 3),
+        "payload_bytes": len(text.encode("utf-8")),
+    }
+
+    extra = '"_meta":' + dumps(meta) + "}"
+    text = text[:-1] + extra if text == "{}" else text[:-1] + "," + extra
+    return text, meta
+
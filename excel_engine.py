@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+시트 파싱 엔진
+openpyxl 파싱은 순수 파이썬이라 GIL 때문에 스레드로는 확장되지 않으므로,
+선택적으로 프로세스 풀에서 파싱하고 결과를 컬럼 단위(Arrow IPC 또는 NumPy 배열)로 돌려받습니다
+"""
+
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from excel_metrics import phase
+from excel_paging import header_names
+from excel_stats import NA_STRINGS
+from excel_xml import read_columns
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow가 없으면 NumPy 컬럼으로 전송
+    pa = None
+
+ParseJob = Tuple[Union[str, Path], Union[str, int], Dict[str, Any]]
+
+ENGINE_MODES = ("inline", "process")
+# pandas.read_excel이 기본으로 불리언으로 읽는 문자열
+TRUE_STRINGS = frozenset({"True", "TRUE", "true"})
+FALSE_STRINGS = frozenset({"False", "FALSE", "false"})
+
+
+def encode_frame(df: pd.DataFrame) -> Tuple[str, Any]:
+    """DataFrame을 프로세스 간 전송용 컬럼 형식으로 변환"""
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return "arrow", sink.getvalue().to_pybytes()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # 한 컬럼에 숫자와 문자열이 섞인 경우 등은 NumPy 형식으로 전송
+            pass
+
+    columns = df.columns.tolist()
+    arrays = [df.iloc[:, i].to_numpy() for i in range(len(columns))]
+    dtypes = [str(dtype) for dtype in df.dtypes]
+    return "numpy", (columns, arrays, dtypes)
+
+
+def decode_frame(kind: str, payload: Any) -> pd.DataFrame:
+    """encode_frame 결과를 DataFrame으로 복원"""
+    if kind == "arrow":
+        with pa.ipc.open_stream(payload) as reader:
+            return reader.read_all().to_pandas()
+
+    columns, arrays, dtypes = payload
+    data = {}
+    for i, (array, dtype) in enumerate(zip(arrays, dtypes)):
+        data[i] = pd.Series(array, dtype=dtype) if dtype in ("str", "string") else array
+    df = pd.DataFrame(data)
+    df.columns = columns
+    return df
+
+
+def read_frame(file_path: Union[str, Path], sheet: Union[str, int] = 0,
+               usecols: Optional[Sequence[int]] = None, **read_kwargs) -> pd.DataFrame:
+    """시트를 DataFrame으로 읽기
+
+    usecols(컬럼 위치 목록)가 주어지면 XLSX XML에서 해당 컬럼의 셀만 변환하는
+    저수준 리더를 사용하고, 지원하지 않는 파일이면 pandas로 읽습니다.
+    결과 컬럼은 시트 순서를 따릅니다.
+    """
+    if usecols is not None:
+        positions = sorted(set(usecols))
+        nrows = read_kwargs.get("nrows")
+        try:
+            data = read_columns(file_path, sheet, positions, nrows=nrows)
+        except (NotImplementedError, zipfile.BadZipFile):
+            return pd.read_excel(file_path, sheet_name=sheet, usecols=positions, **read_kwargs)
+        if not data:
+            return pd.DataFrame()
+        return frame_from_rows(data)
+    return pd.read_excel(file_path, sheet_name=sheet, **read_kwargs)
+
+
+def frame_from_rows(data: List[List[Any]]) -> pd.DataFrame:
+    """첫 행이 헤더인 셀 값 목록을 pandas.read_excel과 같은 규칙으로 DataFrame으로 변환
+
+    기본 결측 문자열은 결측으로, 숫자 문자열만 있는 컬럼은 숫자로,
+    "TRUE"/"False" 같은 문자열과 불리언만 있는 컬럼은 불리언으로, 값이 없는 컬럼은 float64로 읽습니다.
+    """
+    header = header_names(tuple(None if value == "" else value for value in data[0]))
+    rows = [[np.nan if isinstance(value, str) and value in NA_STRINGS else value for value in row]
+            for row in data[1:]]
+    df = pd.DataFrame(rows, columns=header)
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if not len(column) or not (pd.api.types.is_object_dtype(column.dtype)
+                                   or pd.api.types.is_string_dtype(column.dtype)):
+            continue
+        values = column.dropna()
+        if not len(values):
+            converted = column.astype("float64")
+        elif len(values) == len(column) and all(
+                isinstance(value, bool) or value in TRUE_STRINGS or value in FALSE_STRINGS for value in values):
+            converted = column.map(lambda value: value if isinstance(value, bool) else value in TRUE_STRINGS)
+            converted = converted.astype(bool)
+        else:
+            try:
+                converted = pd.to_numeric(column)
+            except (ValueError, TypeError):
+                continue
+        df.isetitem(i, converted)
+    return df
+
+
+def _parse_sheet(file_path: str, sheet: Union[str, int], read_kwargs: Dict[str, Any]) -> Tuple[str, Any]:
+    """작업자 프로세스에서 시트 파싱"""
+    df = read_frame(file_path, sheet, **read_kwargs)
+    return encode_frame(df)
+
+
+def _warm_up() -> bool:
+    """작업자 프로세스에 무거운 모듈을 미리 적재"""
+    import openpyxl  # noqa: F401
+    return True
+
+
+class ParseEngine:
+    """시트 파싱 엔진
+
+    mode="inline"이면 호출한 스레드에서 바로 파싱하고,
+    mode="process"이면 프로세스 풀에서 파싱합니다.
+    풀은 처음 파싱할 때 만들어 shutdown()까지 유지하며,
+    warm=True이면 엔진을 만들 때 풀을 띄우고 모든 작업자에 모듈을 미리 적재합니다.
+    """
+
+    def __init__(self, mode: str = "inline", workers: Optional[int] = None, warm: bool = False):
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"지원하지 않는 파싱 엔진입니다: {mode} (가능한 값: {', '.join(ENGINE_MODES)})")
+        self.mode = mode
+        self.workers = max(1, workers or multiprocessing.cpu_count() or 1)
+        self.warm = warm
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        if self.mode == "process" and self.warm:
+            self._get_pool()
+
+    def parse(self, file_path: Union[str, Path], sheet: Union[str, int] = 0, **read_kwargs) -> pd.DataFrame:
+        """시트 하나 파싱"""
+        return self.parse_many([(file_path, sheet, read_kwargs)])[0]
+
+    def parse_many(self, jobs: Sequence[ParseJob]) -> List[pd.DataFrame]:
+        """여러 파일/시트를 파싱 (process 모드에서는 각 작업을 별도 코어에서 실행)"""
+        with phase("parse"):
+            if self.mode == "inline":
+                return [read_frame(path, sheet, **kwargs) for path, sheet, kwargs in jobs]
+
+            pool = self._get_pool()
+            futures = [pool.submit(_parse_sheet, str(path), sheet, kwargs) for path, sheet, kwargs in jobs]
+            try:
+                return [decode_frame(*future.result()) for future in futures]
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def iter_workbook(self, file_path: Union[str, Path],
+                      sheets: Sequence[Union[str, int]]) -> Iterator[Tuple[Union[str, int], pd.DataFrame]]:
+        """한 워크북의 여러 시트를 파싱해 끝나는 순서대로 (시트, DataFrame) 반환
+
+        inline 모드는 워크북을 한 번만 열어(공유 문자열도 한 번만 읽음) 시트를 하나씩 파싱해 바로 반환하고,
+        process 모드는 시트마다 작업자에 나눠 파싱합니다.
+        """
+        if not sheets:
+            return
+        if self.mode == "inline":
+            with pd.ExcelFile(file_path) as workbook:
+                for sheet in sheets:
+                    with phase("parse"):
+                        frame = workbook.parse(sheet)
+                    yield sheet, frame
+            return
+
+        pool = self._get_pool()
+        futures = {pool.submit(_parse_sheet, str(file_path), sheet, {}): sheet for sheet in sheets}
+        try:
+            for future in as_completed(futures):
+                with phase("parse"):
+                    frame = decode_frame(*future.result())
+                yield futures[future], frame
+        finally:
+            # 중간에 그만 읽으면 아직 시작하지 않은 작업 취소 (풀은 유지)
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        """유지 중인 작업자 프로세스 종료"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """엔진의 작업자 풀 반환 (처음이면 만들고, warm이면 모든 작업자에 모듈을 적재)"""
+        with self._lock:
+            if self._pool is None:
+                # 스레드가 있는 프로세스에서 fork하지 않도록 spawn 사용
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+                if self.warm:
+                    for _ in range(self.workers):
+                        self._pool.submit(_warm_up)
+            return self._pool
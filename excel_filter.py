@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+필터 조건 엔진
+JSON 필터 조건을 한 번 컴파일해 DataFrame에는 벡터화된 NumPy 마스크로,
+스트리밍 모드에서는 행 단위 판정으로 적용합니다
+
+필터 형식:
+    {"부서": "개발팀"}                        # 문자열은 포함 검색 (기존 형식)
+    {"나이": 30}                              # 그 외 값은 일치 검색 (기존 형식)
+    {"나이": {">=": 30, "<": 40}}             # 연산자 객체 (여러 연산자는 AND)
+    {"연봉": {"between": [3000, 5000]}}
+    {"부서": {"in": ["개발팀", "인사팀"]}}
+    {"이메일": {"is_null": true}}
+    {"이름": {"regex": "^김"}}
+    {"or": [{"부서": "개발팀"}, {"나이": {">": 30}}]}
+    {"not": {"부서": "인사팀"}}
+"""
+
+import json
+import math
+from abc import ABC, abstractmethod
+import operator
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from excel_index import ColumnIndex, index_kind
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+OPERATORS = tuple(_COMPARISONS) + ("between", "in", "not_in", "is_null", "contains", "regex")
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT
+
+
+class Predicate(ABC):
+    """컴파일된 필터 조건"""
+
+    columns: Set[str] = set()
+
+    @abstractmethod
+    def mask(self, df: pd.DataFrame, indexes: Optional[Dict[str, ColumnIndex]] = None) -> np.ndarray:
+        """조건을 만족하는 행의 불리언 마스크 (indexes에 컬럼 인덱스가 있으면 스캔 대신 사용)"""
+
+    def index_kinds(self) -> Dict[str, Set[str]]:
+        """인덱스로 답할 수 있는 조건의 컬럼 → 필요한 인덱스 종류"""
+        return {}
+
+    @abstractmethod
+    def match(self, row: Dict[str, Any]) -> bool:
+        """행 하나(컬럼명: 값)가 조건을 만족하는지 판정"""
+
+
+class _All(Predicate):
+    def __init__(self, parts: List[Predicate]):
+        self.parts = parts
+        self.columns = set().union(*(part.columns for part in parts)) if parts else set()
+
+    def mask(self, df: pd.DataFrame, indexes: Optional[Dict[str, ColumnIndex]] = None) -> np.ndarray:
+        result = np.ones(len(df), dtype=bool)
+        for part in self.parts:
+            result &= part.mask(df, indexes)
+        return result
+
+    def index_kinds(self) -> Dict[str, Set[str]]:
+        return _merge_kinds(self.parts)
+
+    def match(self, row: Dict[str, Any]) -> bool:
+        return all(part.match(row) for part in self.parts)
+
+
+class _Any(Predicate):
+    def __init__(self, parts: List[Predicate]):
+        self.parts = parts
+        self.columns = set().union(*(part.columns for part in parts)) if parts else set()
+
+    def mask(self, df: pd.DataFrame, indexes: Optional[Dict[str, ColumnIndex]] = None) -> np.ndarray:
+        result = np.zeros(len(df), dtype=bool)
+        for part in self.parts:
+            result |= part.mask(df, indexes)
+        return result
+
+    def index_kinds(self) -> Dict[str, Set[str]]:
+        return _merge_kinds(self.parts)
+
+    def match(self, row: Dict[str, Any]) -> bool:
+        return any(part.match(row) for part in self.parts)
+
+
+class _Not(Predicate):
+    def __init__(self, part: Predicate):
+        self.part = part
+        self.columns = part.columns
+
+    def mask(self, df: pd.DataFrame, indexes: Optional[Dict[str, ColumnIndex]] = None) -> np.ndarray:
+        return ~self.part.mask(df, indexes)
+
+    def index_kinds(self) -> Dict[str, Set[str]]:
+        return self.part.index_kinds()
+
+    def match(self, row: Dict[str, Any]) -> bool:
+        return not self.part.match(row)
+
+
+class _Condition(Predicate):
+    """컬럼 하나에 대한 연산자 조건"""
+
+    def __init__(self, column: str, op: str, value: Any, strict: bool = True):
+        if op not in OPERATORS:
+            raise ValueError(f"지원하지 않는 필터 연산자입니다: {op} (가능한 값: {', '.join(OPERATORS)})")
+        if op == "between" and (not isinstance(value, (list, tuple)) or len(value) != 2):
+            raise ValueError(f"between 값은 [최소, 최대] 형식이어야 합니다: {column}")
+        if op in ("in", "not_in") and not isinstance(value, (list, tuple)):
+            raise ValueError(f"{op} 값은 배열이어야 합니다: {column}")
+
+        self.column = column
+        self.op = op
+        self.value = value
+        # 기존 형식 조건은 없는 컬럼을 무시 (이전 동작 유지)
+        self.strict = strict
+        self.columns = {column}
+        self._pattern = re.compile(value) if op == "regex" else None
+
+    def mask(self, df: pd.DataFrame, indexes: Optional[Dict[str, ColumnIndex]] = None) -> np.ndarray:
+        if self.column not in df.columns:
+            if self.strict:
+                raise ValueError(f"컬럼을 찾을 수 없습니다: {self.column}")
+            return np.ones(len(df), dtype=bool)
+
+        series = df[self.column]
+        op, value = self.op, self.value
+
+        if op == "is_null":
+            missing = series.isna().to_numpy()
+            return missing if value else ~missing
+        index = indexes.get(self.column) if indexes else None
+        if index is not None and index.rows == len(df):
+            coerced = [_coerce(series, v) for v in value] if op in ("in", "between") else _coerce(series, value)
+            found = index.mask(op, coerced)
+            if found is not None:
+                return found
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self._category_mask(series)
+        if op in ("contains", "regex"):
+            strings = series if _is_string_dtype(series) else series.astype(str).where(series.notna())
+            pattern = self._pattern if op == "regex" else value
+            return strings.str.contains(pattern, regex=(op == "regex"), na=False).to_numpy(dtype=bool)
+        if op in ("in", "not_in"):
+            values = [_coerce(series, v) for v in value]
+            found = series.isin(values).to_numpy()
+            return found if op == "in" else ~found & series.notna().to_numpy()
+        if op == "between":
+            low, high = _coerce(series, value[0]), _coerce(series, value[1])
+            return _compare(series, operator.ge, low) & _compare(series, operator.le, high)
+        return _compare(series, _COMPARISONS[op], _coerce(series, value))
+
+    def index_kinds(self) -> Dict[str, Set[str]]:
+        kind = index_kind(self.op)
+        return {self.column: {kind}} if kind is not None else {}
+
+    def _category_mask(self, series: pd.Series) -> np.ndarray:
+        """범주형 컬럼은 범주(고유값)마다 한 번만 판정해 코드로 펼침 (코드 -1인 빈 값은 마지막 칸)"""
+        categories = series.cat.categories
+        values = pd.Series(categories).reindex(range(len(categories) + 1))
+        per_category = self.mask(pd.DataFrame({self.column: values}))
+        return per_category[series.cat.codes.to_numpy()]
+
+    def match(self, row: Dict[str, Any]) -> bool:
+        if self.column not in row:
+            if self.strict:
+                raise ValueError(f"컬럼을 찾을 수 없습니다: {self.column}")
+            return True
+
+        cell, op, value = row[self.column], self.op, self.value
+
+        if op == "is_null":
+            return _is_missing(cell) == bool(value)
+        if _is_missing(cell):
+            return False
+        if op == "contains":
+            return value in str(cell)
+        if op == "regex":
+            return self._pattern.search(str(cell)) is not None
+        if op in ("in", "not_in"):
+            found = any(_scalar_equal(cell, v) for v in value)
+            return found if op == "in" else not found
+        if op == "between":
+            return _scalar_compare(cell, operator.ge, value[0]) and _scalar_compare(cell, operator.le, value[1])
+        if op == "==":
+            return _scalar_equal(cell, value)
+        if op == "!=":
+            return not _scalar_equal(cell, value)
+        return _scalar_compare(cell, _COMPARISONS[op], value)
+
+
+def _merge_kinds(parts: List[Predicate]) -> Dict[str, Set[str]]:
+    kinds: Dict[str, Set[str]] = {}
+    for part in parts:
+        for column, needed in part.index_kinds().items():
+            kinds.setdefault(column, set()).update(needed)
+    return kinds
+
+
+def _is_string_dtype(series: pd.Series) -> bool:
+    return pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype)
+
+
+def _coerce(series: pd.Series, value: Any) -> Any:
+    """비교 값을 컬럼 타입에 맞게 변환 (날짜 컬럼과 문자열 날짜 등)"""
+    if isinstance(value, str) and pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return pd.Timestamp(value)
+    return value
+
+
+def _compare(series: pd.Series, func: Callable[[Any, Any], Any], value: Any) -> np.ndarray:
+    """컬럼과 값 비교 (타입이 섞인 object 컬럼은 숫자로 변환해 비교)"""
+    try:
+        result = func(series, value)
+    except TypeError:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            result = func(pd.to_numeric(series, errors="coerce"), value)
+        else:
+            result = func(series.astype(str).where(series.notna()), str(value))
+    return np.asarray(result.fillna(False) if hasattr(result, "fillna") else result, dtype=bool)
+
+
+def _scalar_value(cell: Any, value: Any) -> Any:
+    if isinstance(value, str) and isinstance(cell, (datetime, date)):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _scalar_equal(cell: Any, value: Any) -> bool:
+    return cell == _scalar_value(cell, value)
+
+
+def _scalar_compare(cell: Any, func: Callable[[Any, Any], Any], value: Any) -> bool:
+    try:
+        return bool(func(cell, _scalar_value(cell, value)))
+    except TypeError:
+        if isinstance(value, (int, float)) and isinstance(cell, str):
+            try:
+                return bool(func(float(cell), value))
+            except ValueError:
+                return False
+        return bool(func(str(cell), str(value)))
+
+
+def _compile(spec: Any) -> Predicate:
+    if not isinstance(spec, dict):
+        raise ValueError(f"필터 조건은 객체여야 합니다: {spec!r}")
+
+    parts: List[Predicate] = []
+    for key, value in spec.items():
+        if key in ("and", "or") and isinstance(value, list):
+            children = [_compile(child) for child in value]
+            parts.append(_All(children) if key == "and" else _Any(children))
+        elif key == "not" and isinstance(value, dict):
+            parts.append(_Not(_compile(value)))
+        elif isinstance(value, dict):
+            parts.extend(_Condition(key, op, operand) for op, operand in value.items())
+        elif isinstance(value, str):
+            parts.append(_Condition(key, "contains", value, strict=False))
+        else:
+            parts.append(_Condition(key, "==", value, strict=False))
+    return parts[0] if len(parts) == 1 else _All(parts)
+
+
+@lru_cache(maxsize=256)
+def _compile_cached(spec_json: str) -> Predicate:
+    return _compile(json.loads(spec_json))
+
+
+def compile_filter(spec: Dict[str, Any]) -> Predicate:
+    """필터 조건 컴파일 (같은 조건은 한 번만 컴파일)"""
+    return _compile_cached(json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def stream_filter(records: Iterable[Dict[str, Any]], predicate: Predicate,
+                  limit: Optional[int] = None) -> Dict[str, Any]:
+    """행을 하나씩 판정해 조건을 만족하는 행을 limit개까지 보관
+
+    limit개를 채우면 다음 일치 행 하나를 찾을 때까지만 더 읽어 has_more를 정하고 멈춥니다.
+    has_more가 False면 시트 끝까지 읽었으므로 rows가 일치하는 행 전부입니다.
+    """
+    matched: List[Dict[str, Any]] = []
+    scanned = 0
+    has_more = False
+    for record in records:
+        scanned += 1
+        if predicate.match(record):
+            if limit is not None and len(matched) >= limit:
+                has_more = True
+                break
+            matched.append(record)
+    return {"scanned_rows": scanned, "rows": matched, "has_more": has_more}
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+컬럼 보조 인덱스
+같은 컬럼을 반복해서 필터링할 때 전체 스캔 대신 인덱스로 행 위치를 찾습니다.
+
+- 해시 인덱스: 값 → 행 위치 (==, in 조건을 O(1)로 조회)
+- 정렬 인덱스: 정렬된 값과 행 위치 (>, >=, <, <=, between 조건을 O(log n)으로 조회, 숫자/날짜 컬럼만)
+
+인덱스는 (파일 버전, 시트, 컬럼)을 키로 보관하므로 파일이 바뀌면 더 이상 쓰이지 않고,
+새 버전의 인덱스를 만들 때 삭제됩니다.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+FileVersion = Tuple[str, int, int]
+
+HASH = "hash"
+SORTED = "sorted"
+HASH_OPERATORS = frozenset({"==", "in"})
+RANGE_OPERATORS = frozenset({">", ">=", "<", "<=", "between"})
+
+
+def index_kind(op: str) -> Optional[str]:
+    """필터 연산자를 조회할 수 있는 인덱스 종류 (없으면 None)"""
+    if op in HASH_OPERATORS:
+        return HASH
+    if op in RANGE_OPERATORS:
+        return SORTED
+    return None
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value))
+
+
+class ColumnIndex:
+    """컬럼 하나의 해시/정렬 인덱스 (행 위치는 인덱스를 만든 DataFrame 기준)"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.kinds: Set[str] = set()
+        # 만들 수 없는 종류 (문자열 컬럼의 정렬 인덱스 등, 다시 시도하지 않음)
+        self.skipped: Set[str] = set()
+        self._lookup: Optional[pd.Index] = None  # 고유값 (위치가 코드)
+        self._order: Optional[np.ndarray] = None  # 코드 순으로 정렬한 행 위치
+        self._starts: Optional[np.ndarray] = None  # 코드별 _order 시작 위치
+        self._sorted_values: Optional[np.ndarray] = None
+        self._sorted_positions: Optional[np.ndarray] = None
+        self._dtype = None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self._order, self._starts, self._sorted_values, self._sorted_positions)
+        size = sum(array.nbytes for array in arrays if array is not None)
+        if self._lookup is not None:
+            size += int(self._lookup.memory_usage(deep=True))
+        return size
+
+    def build(self, series: pd.Series, kinds: Iterable[str]):
+        """필요한 종류의 인덱스 만들기 (이미 있거나 만들 수 없는 종류는 건너뜀)"""
+        self._dtype = series.dtype
+        for kind in set(kinds) - self.kinds - self.skipped:
+            built = self._build_hash(series) if kind == HASH else self._build_sorted(series)
+            (self.kinds if built else self.skipped).add(kind)
+
+    def _build_hash(self, series: pd.Series) -> bool:
+        # float32로 압축된 컬럼은 스캔과 같은 비교 정밀도를 보장하기 어려워 만들지 않음
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind == "f" and series.dtype.itemsize < 8:
+            return False
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # 빈 값(코드 -1)은 맨 앞에 모이므로 그 수만큼 밀어서 시작 위치 계산
+        self._starts = np.concatenate(([0], np.cumsum(counts))) + int((codes < 0).sum())
+        self._order = order
+        self._lookup = pd.Index(uniques)
+        return True
+
+    def _build_sorted(self, series: pd.Series) -> bool:
+        dtype = series.dtype
+        if not (isinstance(dtype, np.dtype) and dtype.kind in "iufM"):
+            return False
+        values = series.to_numpy()
+        present = np.flatnonzero(~pd.isna(values)) if dtype.kind in "fM" else np.arange(len(values))
+        order = present[np.argsort(values[present], kind="stable")]
+        self._sorted_values = values[order]
+        self._sorted_positions = order
+        return True
+
+    def mask(self, op: str, value: Any) -> Optional[np.ndarray]:
+        """조건을 만족하는 행의 불리언 마스크 (이 인덱스로 답할 수 없으면 None)"""
+        positions = self.positions(op, value)
+        if positions is None:
+            return None
+        result = np.zeros(self.rows, dtype=bool)
+        result[positions] = True
+        return result
+
+    def positions(self, op: str, value: Any) -> Optional[np.ndarray]:
+        """조건을 만족하는 행 위치 (순서 없음, 답할 수 없으면 None)"""
+        if op in HASH_OPERATORS and HASH in self.kinds:
+            return self._hash_positions([value] if op == "==" else value)
+        if op in RANGE_OPERATORS and SORTED in self.kinds:
+            if op == "between":
+                return self._range_positions(value[0], True, value[1], True)
+            if op in (">", ">="):
+                return self._range_positions(value, op == ">=", None, False)
+            return self._range_positions(None, False, value, op == "<=")
+        return None
+
+    def _hash_positions(self, values: Iterable[Any]) -> Optional[np.ndarray]:
+        values = list(values)
+        # 빈 값 비교와 bool/숫자 혼용은 스캔과 결과가 달라질 수 있어 스캔에 맡김
+        if any(_is_missing(v) or isinstance(v, (list, dict)) for v in values):
+            return None
+        if any(isinstance(v, bool) for v in values) and not pd.api.types.is_bool_dtype(self._dtype):
+            return None
+        codes = set()
+        for value in values:
+            try:
+                # get_loc는 해시 테이블 조회 (get_indexer는 호출마다 고유값 전체를 확인해 느림)
+                codes.add(self._lookup.get_loc(value))
+            except KeyError:
+                continue
+            except (TypeError, ValueError, OverflowError):
+                return None
+        parts = [self._order[self._starts[code]:self._starts[code + 1]] for code in sorted(codes)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+    def _range_positions(self, low: Any, low_inclusive: bool,
+                         high: Any, high_inclusive: bool) -> Optional[np.ndarray]:
+        bounds = [bound for bound in (low, high) if bound is not None]
+        if not all(self._comparable(bound) for bound in bounds):
+            return None
+        values = self._sorted_values
+        # 원소와 값을 스캔과 같은 규칙(numpy 스칼라 비교)으로 비교하는 이진 탐색
+        start = 0 if low is None else (bisect_left if low_inclusive else bisect_right)(values, low)
+        stop = len(values) if high is None else (bisect_right if high_inclusive else bisect_left)(values, high)
+        return self._sorted_positions[start:max(start, stop)]
+
+    def _comparable(self, value: Any) -> bool:
+        if self._dtype.kind == "M":
+            return isinstance(value, pd.Timestamp) and value.tz is None and not _is_missing(value)
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and not _is_missing(value)
+
+
+class IndexRegistry:
+    """(파일 버전, 시트, 컬럼)별 인덱스 보관소
+
+    같은 컬럼 조회가 build_after번째가 되면 인덱스를 만들고(0이면 요청할 때만),
+    메모리 예산을 넘으면 가장 오래 쓰지 않은 인덱스부터 삭제합니다.
+    """
+
+    def __init__(self, build_after: int = 3, max_bytes: int = 128 * 1024 * 1024):
+        self.build_after = build_after
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.builds = 0
+        self.lookups = 0
+        self._entries: "OrderedDict[Hashable, ColumnIndex]" = OrderedDict()
+        self._uses: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+
+    def lookup(self, version: FileVersion, sheet: Union[str, int], df: pd.DataFrame,
+               wanted: Dict[str, Set[str]], build: bool = False) -> Dict[str, ColumnIndex]:
+        """필터에 쓸 수 있는 컬럼 인덱스 (필요하면 만듦)
+
+        wanted: 컬럼 → 필요한 인덱스 종류, build: 조회 횟수와 관계없이 바로 만들기
+        """
+        indexes: Dict[str, ColumnIndex] = {}
+        with self._lock:
+            self._drop_stale_versions(version)
+            for column, kinds in wanted.items():
+                if column not in df.columns:
+                    continue
+                key = (version, sheet, column)
+                index = self._entries.get(key)
+                if index is not None and index.rows != len(df):
+                    # 행 수가 다른 DataFrame의 인덱스는 위치가 맞지 않음
+                    self._remove(key)
+                    index = None
+                missing = set(kinds) - (index.kinds | index.skipped if index is not None else set())
+                if missing:
+                    uses = self._uses.get(key, 0) + 1
+                    self._uses[key] = uses
+                    if build or (self.build_after and uses >= self.build_after):
+                        index = self._build(key, index, df[column], missing, len(df))
+                if index is not None and index.kinds & set(kinds):
+                    self._entries.move_to_end(key)
+                    indexes[column] = index
+            if indexes:
+                self.lookups += 1
+        return indexes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "builds": self.builds,
+                "lookups": self.lookups
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._uses.clear()
+            self.current_bytes = 0
+
+    def _build(self, key: Hashable, index: Optional[ColumnIndex], series: pd.Series,
+               kinds: Set[str], rows: int) -> Optional[ColumnIndex]:
+        if index is None:
+            index = ColumnIndex(rows)
+        else:
+            self.current_bytes -= self._entries.pop(key).nbytes
+        index.build(series, kinds)
+        self.builds += 1
+        nbytes = index.nbytes
+        if nbytes > self.max_bytes:
+            # 예산보다 큰 인덱스는 보관하지 않고 다시 build_after번 조회한 뒤에 시도
+            self._uses[key] = 0
+            return None
+        self._entries[key] = index
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+        return index
+
+    def _remove(self, key: Hashable):
+        self.current_bytes -= self._entries.pop(key).nbytes
+
+    def _drop_stale_versions(self, version: FileVersion):
+        """같은 경로의 이전 파일 버전 인덱스와 조회 횟수 제거"""
+        for key in [key for key in self._uses if key[0][0] == version[0] and key[0] != version]:
+            del self._uses[key]
+        for key in [key for key in self._entries if key[0][0] == version[0] and key[0] != version]:
+            self._remove(key)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+워크북 목록과 메타데이터 매니페스트
+디렉터리나 glob 패턴에서 워크북 파일을 찾고, 파일별 메타데이터를 (경로, 수정 시각, 크기)와 함께
+SQLite 파일에 남겨 다음 스캔에서 바뀌지 않은 파일은 다시 열지 않도록 합니다.
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_workbook(path: Path) -> bool:
+    # ~$로 시작하는 파일은 Excel이 열려 있는 동안 만드는 잠금 파일
+    return path.suffix.lower() in WORKBOOK_EXTENSIONS and not path.name.startswith("~$") and path.is_file()
+
+
+def workbook_files(directory: Path, recursive: bool = True) -> Iterable[Path]:
+    """디렉터리 아래 워크북 파일"""
+    for path in directory.glob("**/*" if recursive else "*"):
+        if is_workbook(path):
+            yield path
+
+
+def resolve_targets(target: Union[str, Path], recursive: bool = True) -> Tuple[Optional[Path], List[Path]]:
+    """디렉터리 또는 glob 패턴의 워크북 파일 (절대 경로, 정렬)
+
+    반환값: (디렉터리였으면 그 절대 경로, 아니면 None, 파일 목록)
+    """
+    text = os.path.expanduser(str(target))
+    if any(char in text for char in _GLOB_CHARS):
+        paths = {Path(match).resolve() for match in glob.glob(text, recursive=True)}
+        return None, sorted(path for path in paths if is_workbook(path))
+    directory = Path(text).resolve()
+    if not directory.is_dir():
+        raise NotADirectoryError(f"디렉터리를 찾을 수 없습니다: {directory} (파일 하나는 get_excel_info를 사용해주세요)")
+    return directory, sorted(workbook_files(directory, recursive))
+
+
+def prefix_range(directory: Path) -> Tuple[str, str]:
+    """디렉터리 아래 경로의 문자열 범위 (LIKE 대신 인덱스를 쓰는 범위 비교)"""
+    prefix = str(directory).rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class Manifest:
+    """파일별 메타데이터 매니페스트 (작업자 스레드에서 함께 쓰므로 잠금으로 직렬화)"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS manifest (
+                    path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, exact INTEGER, info TEXT,
+                    scanned_at REAL
+                )
+            """)
+            self._db.commit()
+
+    def get(self, path: str, mtime_ns: int, size: int, exact: bool = False) -> Optional[Dict[str, Any]]:
+        """파일이 바뀌지 않았으면 저장된 메타데이터 (exact 요청에는 정확한 행 수로 스캔한 결과만)"""
+        with self._lock:
+            row = self._db.execute("SELECT mtime_ns, size, exact, info FROM manifest WHERE path = ?",
+                                   (path,)).fetchone()
+        if row is None or (row[0], row[1]) != (mtime_ns, size) or (exact and not row[2]):
+            return None
+        return json.loads(row[3])
+
+    def put(self, path: str, mtime_ns: int, size: int, exact: bool, info: Dict[str, Any]):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?)",
+                             (path, mtime_ns, size, int(exact), json.dumps(info, ensure_ascii=False, default=str),
+                              time.time()))
+            self._db.commit()
+
+    def prune(self, directory: Path, present: Iterable[str]) -> int:
+        """디렉터리 아래에서 사라진 파일의 항목 삭제, 삭제한 수 반환"""
+        present = set(present)
+        with self._lock:
+            known = [row[0] for row in self._db.execute(
+                "SELECT path FROM manifest WHERE path >= ? AND path < ?", prefix_range(directory))]
+            missing = [path for path in known if path not in present and not os.path.exists(path)]
+            self._db.executemany("DELETE FROM manifest WHERE path = ?", [(path,) for path in missing])
+            self._db.commit()
+        return len(missing)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            files = self._db.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+        return {"files": files, "db_path": str(self.db_path)}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
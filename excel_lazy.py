@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+지연 import
+pandas/openpyxl처럼 import에 시간이 걸리는 모듈을 처음 속성에 접근할 때 불러옵니다.
+서버가 initialize/tools/list에 이 모듈들을 불러오기 전에 응답할 수 있습니다.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+# 모든 지연 모듈은 이 잠금 안에서 불러옴
+# 파이썬의 모듈별 import 잠금만으로는 두 스레드가 서로 다른 순서로 패키지를 불러올 때
+# 교착 상태나 부분 초기화된 모듈 오류가 날 수 있음 (예: openpyxl 하위 모듈)
+LOAD_LOCK = threading.RLock()
+
+
+class LazyModule:
+    """처음 속성에 접근할 때 import하는 모듈 대리 객체
+
+    import는 LOAD_LOCK 안에서 한 스레드씩 실행합니다.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            with LOAD_LOCK:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    self._module = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}{'' if self.loaded else ' (not loaded)'}>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
@@ -5,23 +5,174 @@ Provides Excel file manipulation capabilities through MCP protocol
 """
 
 import asyncio
+import contextvars
 import json
+import os
 import sys
+import threading
+import time
 import traceback
-from typing import Any, Dict, List, Optional, Union
-import pandas as pd
-import openpyxl
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 from pathlib import Path
 import logging
 
+from excel_cache import FileVersion, FrameCache, ResultCache, file_version
+from excel_config import ServerConfig
+from excel_encoding import (DEFAULT_FORMAT, FORMATS, check_format, dumps, encode_result, encode_rows, frame_summary,
+                            rows_summary, shape_frame, shape_rows)
+from excel_lazy import LOAD_LOCK, lazy_import
+from excel_metrics import Metrics, phase
+from excel_paging import (DEFAULT_PAGE_SIZE, RowStreamPool, decode_cursor, encode_cursor,
+                          resolve_columns, sheet_header)
+
+# pandas/openpyxl을 쓰는 모듈은 처음 도구를 호출할 때(또는 prewarm 스레드에서) 불러옴
+# initialize/tools/list는 이 모듈들을 불러오기 전에 응답
+pd = lazy_import("pandas")
+openpyxl = lazy_import("openpyxl")
+excel_aggregate = lazy_import("excel_aggregate")
+excel_compact = lazy_import("excel_compact")
+excel_engine = lazy_import("excel_engine")
+excel_filter = lazy_import("excel_filter")
+excel_index = lazy_import("excel_index")
+excel_inventory = lazy_import("excel_inventory")
+excel_search = lazy_import("excel_search")
+excel_sidecar = lazy_import("excel_sidecar")
+excel_sql = lazy_import("excel_sql")
+excel_stats = lazy_import("excel_stats")
+excel_writer = lazy_import("excel_writer")
+excel_xml = lazy_import("excel_xml")
+HEAVY_MODULES = (pd, openpyxl, excel_aggregate, excel_compact, excel_engine, excel_filter, excel_index,
+                 excel_inventory, excel_search, excel_sidecar, excel_sql, excel_stats, excel_writer, excel_xml)
+
+# batch에서 앞의 호출이 모두 끝난 뒤 하나씩 실행하는 쓰기 도구
+WRITE_TOOLS = frozenset({"write_excel", "begin_write", "append_rows", "commit_write", "abort_write"})
+# 시트 전체 DataFrame을 사용하는 도구 (batch에서 시트를 미리 한 번만 파싱)
+FRAME_TOOLS = frozenset({"read_excel", "analyze_excel", "filter_excel_data", "aggregate_excel"})
+# scan_excel_files의 최대 동시 작업 수 (파일 앞부분만 읽는 I/O 위주 작업이라 CPU 수보다 많이 허용)
+MAX_SCAN_WORKERS = 32
+
+# 현재 도구 호출의 progressToken (클라이언트가 진행 상황 알림을 요청한 경우)
+_progress_token: "contextvars.ContextVar[Any]" = contextvars.ContextVar("progress_token", default=None)
+
 # MCP 프로토콜 구현
 class MCPServer:
-    def __init__(self):
+    def __init__(self, config: Optional[ServerConfig] = None):
         self.tools = {}
         self.resources = {}
+        self.config = config or ServerConfig.from_env()
+        self.frame_cache = FrameCache(self.config.cache_max_bytes)
+        self.row_streams = RowStreamPool()
+        self.results = ResultCache(db_path=self.config.cache_dir / "results.sqlite3"
+                                   if self.config.persist_results else None)
+        # pandas 등을 쓰는 구성 요소(engine, sidecars, write_sessions)는 처음 사용할 때 생성
+        self._components: Dict[str, Any] = {}
+        self._components_lock = threading.Lock()
+        self._prewarm_thread: Optional[threading.Thread] = None
+        # 알림 전송 함수 (StdioDispatcher가 설정)
+        self.notifier: Optional[Callable[[Dict[str, Any]], None]] = None
+        # 도구 호출별 단계 시간/지연 시간/입출력 지표 (server/metrics)
+        self.metrics = Metrics(self.config.trace_memory)
+        if self.config.metrics_file:
+            self.metrics.start_snapshots(self.config.metrics_file, self.config.metrics_interval,
+                                         self.metrics_snapshot)
         self.setup_logging()
         self.register_tools()
         
+    def _component(self, name: str, factory: Callable[[], Any]) -> Any:
+        """구성 요소를 처음 사용할 때 한 번만 생성"""
+        if name not in self._components:
+            with self._components_lock:
+                if name not in self._components:
+                    self._components[name] = factory()
+        return self._components[name]
+
+    @property
+    def engine(self) -> "excel_engine.ParseEngine":
+        """시트 파싱 엔진"""
+        return self._component("engine", lambda: excel_engine.ParseEngine(
+            self.config.parse_engine, workers=self.config.parse_workers, warm=self.config.parse_warm))
+
+    @property
+    def sidecars(self) -> Optional["excel_sidecar.SidecarStore"]:
+        """컬럼 사이드카 저장소 (사용하지 않으면 None)"""
+        return self._component("sidecars", lambda: excel_sidecar.SidecarStore(self.config.cache_dir / "sidecars")
+                               if self.config.sidecar else None)
+
+    @property
+    def write_sessions(self) -> "excel_writer.WriteSessions":
+        """진행 중인 쓰기 세션 (begin_write → append_rows → commit_write)"""
+        return self._component("write_sessions", excel_writer.WriteSessions)
+
+    @property
+    def sql_store(self) -> "excel_sql.SqlStore":
+        """query_excel이 시트를 적재하는 SQLite DB"""
+        return self._component("sql_store", lambda: excel_sql.SqlStore(
+            self.config.cache_dir / "query.sqlite3" if self.config.sql_on_disk else None))
+
+    @property
+    def manifest(self) -> "excel_inventory.Manifest":
+        """scan_excel_files가 파일별 메타데이터를 남기는 매니페스트 (cache_dir의 SQLite 파일)"""
+        return self._component("manifest", lambda: excel_inventory.Manifest(
+            self.config.cache_dir / "manifest.sqlite3"))
+
+    @property
+    def search_index(self) -> "excel_search.SearchIndex":
+        """index_directory/search_excel의 전문 검색 색인 (cache_dir의 SQLite 파일)"""
+        return self._component("search_index", lambda: excel_search.SearchIndex(
+            self.config.cache_dir / "search.sqlite3"))
+
+    @property
+    def indexes(self) -> "excel_index.IndexRegistry":
+        """필터 컬럼 보조 인덱스 (메모리 예산은 시트 캐시의 1/4)"""
+        return self._component("indexes", lambda: excel_index.IndexRegistry(
+            self.config.index_after, self.config.cache_max_bytes // 4))
+
+    def prewarm(self):
+        """무거운 모듈과 구성 요소를 백그라운드 스레드에서 미리 준비 (한 번만)
+
+        도구 호출은 준비가 끝날 때까지 기다립니다 (wait_prewarm).
+        실패해도 무시하며, 그 경우 처음 도구를 호출할 때 다시 불러오고 오류를 돌려줍니다.
+        """
+        if self._prewarm_thread is not None:
+            return
+
+        def run():
+            try:
+                # 모듈 안에서 직접 하는 import(pandas가 부르는 openpyxl 등)도 섞이지 않도록 잠금을 한 번에 잡음
+                with LOAD_LOCK:
+                    for module in HEAVY_MODULES:
+                        module.load()
+                for name in ("engine", "sidecars", "write_sessions"):
+                    getattr(self, name)
+            except Exception as e:
+                self.logger.warning(f"Prewarm failed: {e}")
+
+        self._prewarm_thread = threading.Thread(target=run, name="prewarm", daemon=True)
+        self._prewarm_thread.start()
+
+    def wait_prewarm(self):
+        """진행 중인 prewarm이 끝날 때까지 대기 (도구가 무거운 모듈을 동시에 불러오지 않도록)"""
+        thread = self._prewarm_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def close(self):
+        """서버 종료 시 생성된 구성 요소 정리"""
+        engine = self._components.get("engine")
+        if engine is not None:
+            engine.shutdown()
+        sessions = self._components.get("write_sessions")
+        if sessions is not None:
+            sessions.close()
+        self.row_streams.close_all()
+        for name in ("sql_store", "search_index", "manifest"):
+            component = self._components.get(name)
+            if component is not None:
+                component.close()
+        self.metrics.stop()
+
     def setup_logging(self):
         """로깅 설정"""
         logging.basicConfig(
@@ -48,14 +199,50 @@ class MCPServer:
                             "description": "Excel 파일 경로"
                         },
                         "sheet_name": {
-                            "type": "string",
-                            "description": "시트 이름 (선택사항, 기본값: 첫 번째 시트)",
+                            "anyOf": [{"type": "string"}, {"type": "array", "items": {"type": "string"}}],
+                            "description": "시트 이름 (선택사항, 기본값: 첫 번째 시트). \"*\"이면 모든 시트, 배열이면 지정한 시트들을 병렬로 처리",
                             "default": None
                         },
                         "rows": {
                             "type": "integer",
                             "description": "읽을 행 수 제한 (선택사항)",
                             "default": None
+                        },
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "읽을 컬럼 이름 목록 (선택사항, 기본값: 모든 컬럼)"
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "페이지 읽기 시작 행 (헤더 제외 0부터, 선택사항)",
+                            "default": None
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"페이지 크기 (선택사항, 페이지 읽기 기본값: {DEFAULT_PAGE_SIZE})",
+                            "default": None
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "이전 응답의 next_cursor 값 (다음 페이지 읽기)",
+                            "default": None
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": list(FORMATS),
+                            "description": "결과 data 형식: records(행별 객체, 기본값), columns(컬럼별 배열), rows+header(행 배열, 컬럼명은 columns에 한 번만)",
+                            "default": DEFAULT_FORMAT
+                        },
+                        "max_response_bytes": {
+                            "type": "integer",
+                            "description": "응답 data의 최대 바이트 수 (선택사항, 넘으면 잘라서 next_cursor와 요약을 반환)",
+                            "default": None
+                        },
+                        "max_rows": {
+                            "type": "integer",
+                            "description": "응답에 담을 최대 행 수 (선택사항, 넘으면 잘라서 next_cursor와 요약을 반환)",
+                            "default": None
                         }
                     },
                     "required": ["file_path"]
@@ -63,7 +250,7 @@ class MCPServer:
             },
             "write_excel": {
                 "name": "write_excel",
-                "description": "데이터를 Excel 파일로 저장합니다.",
+                "description": "데이터를 Excel 파일로 저장합니다. append 모드는 기존 파일의 시트 끝에 행을 추가합니다.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -73,26 +260,41 @@ class MCPServer:
                         },
                         "data": {
                             "type": "array",
-                            "description": "저장할 데이터 (딕셔너리 배열)"
+                            "description": "저장할 데이터 (딕셔너리 배열 또는 배열의 배열, sheets를 쓰지 않을 때). 배열의 배열이면 0부터 매긴 번호가 헤더가 됨"
                         },
                         "sheet_name": {
                             "type": "string",
                             "description": "시트 이름",
                             "default": "Sheet1"
+                        },
+                        "sheets": {
+                            "type": "object",
+                            "description": "여러 시트를 한 번에 저장 ({시트 이름: 행 배열}, data 대신 사용)",
+                            "additionalProperties": {"type": "array"}
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": ["replace", "append"],
+                            "description": "replace: 파일 전체를 새로 씀, append: 기존 시트 끝에 행 추가 (없는 시트는 새로 만들고, 다른 시트는 그대로 유지)",
+                            "default": "replace"
                         }
                     },
-                    "required": ["file_path", "data"]
+                    "required": ["file_path"]
                 }
             },
             "get_excel_info": {
                 "name": "get_excel_info",
-                "description": "Excel 파일의 기본 정보를 가져옵니다.",
+                "description": "Excel 파일의 기본 정보를 가져옵니다. 시트 데이터를 읽지 않고 zip 메타데이터만 읽으므로 큰 파일도 빠릅니다.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "file_path": {
                             "type": "string",
                             "description": "Excel 파일 경로"
+                        },
+                        "exact_rows": {
+                            "type": "boolean",
+                            "description": "true이면 시트에 선언된 범위 대신 행 태그를 훑어 실제 행/컬럼 수를 계산 (선택)"
                         }
                     },
                     "required": ["file_path"]
@@ -109,9 +311,19 @@ class MCPServer:
                             "description": "Excel 파일 경로"
                         },
                         "sheet_name": {
-                            "type": "string",
-                            "description": "분석할 시트 이름",
+                            "anyOf": [{"type": "string"}, {"type": "array", "items": {"type": "string"}}],
+                            "description": "분석할 시트 이름 (선택사항, 기본값: 첫 번째 시트). \"*\"이면 모든 시트, 배열이면 지정한 시트들을 병렬로 처리",
                             "default": None
+                        },
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "분석할 컬럼 이름 목록 (선택사항, 기본값: 모든 컬럼)"
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "메모리에 올리기 어려운 큰 시트를 한 번 읽으며 통계 계산 (사분위수, 고유값 수, 최빈값은 근사값일 수 있으며 approximations에 오차 범위 표시)",
+                            "default": False
                         }
                     },
                     "required": ["file_path"]
@@ -134,16 +346,365 @@ class MCPServer:
                         },
                         "filters": {
                             "type": "object",
-                            "description": "필터 조건 (컬럼명: 값)"
+                            "description": (
+                                "필터 조건. {컬럼명: 값}이면 문자열은 포함 검색, 그 외는 일치 검색. "
+                                "{컬럼명: {연산자: 값}} 형식으로 ==, !=, >, >=, <, <=, between, in, not_in, "
+                                "is_null, contains, regex 연산자를 쓸 수 있고 and/or/not으로 조합합니다"
+                            )
+                        },
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "결과에 포함할 컬럼 이름 목록 (선택사항, 기본값: 모든 컬럼)"
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "메모리에 올리기 어려운 큰 시트를 한 행씩 읽으며 조건에 맞는 행만 보관 (limit에서 멈추면 filtered_rows 대신 matched_so_far와 has_more 반환)",
+                            "default": False
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "반환할 최대 행 수 (선택사항)",
+                            "default": None
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": list(FORMATS),
+                            "description": "결과 data 형식 (read_excel과 같음)",
+                            "default": DEFAULT_FORMAT
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "조건에 맞는 행 중 건너뛸 행 수 (선택사항)",
+                            "default": None
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "이전 응답의 next_cursor 값 (잘린 결과 이어서 받기)",
+                            "default": None
+                        },
+                        "max_response_bytes": {
+                            "type": "integer",
+                            "description": "응답 data의 최대 바이트 수 (선택사항, 넘으면 잘라서 next_cursor와 요약을 반환)",
+                            "default": None
+                        },
+                        "max_rows": {
+                            "type": "integer",
+                            "description": "응답에 담을 최대 행 수 (선택사항, 넘으면 잘라서 next_cursor와 요약을 반환)",
+                            "default": None
+                        },
+                        "index": {
+                            "type": "boolean",
+                            "description": "조건 컬럼(==, in, 범위 비교)의 인덱스를 바로 만들기 (같은 컬럼을 여러 값으로 반복 조회할 때, 기본값: 반복되면 자동)",
+                            "default": False
                         }
                     },
                     "required": ["file_path", "filters"]
                 }
+            },
+            "aggregate_excel": {
+                "name": "aggregate_excel",
+                "description": "시트를 그룹별로 집계해 집계 결과만 반환합니다 (예: 부서별 연봉 합계). 행 전체를 읽어 오지 않아도 됩니다.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "file_path": {
+                            "type": "string",
+                            "description": "Excel 파일 경로"
+                        },
+                        "sheet_name": {
+                            "type": "string",
+                            "description": "시트 이름",
+                            "default": None
+                        },
+                        "group_by": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "그룹 키 컬럼 목록 (선택사항, 없으면 전체를 한 행으로 집계)"
+                        },
+                        "aggregations": {
+                            "type": "array",
+                            "items": {"type": "object"},
+                            "description": (
+                                "집계 목록. [{\"column\": 컬럼명, \"function\": 함수, \"as\": 결과 컬럼 이름}, ...]. "
+                                "함수는 sum, mean, count, min, max, quantile(q: 0~1), distinct(고유값 수). "
+                                "column 없이 {\"function\": \"count\"}이면 그룹의 행 수"
+                            )
+                        },
+                        "filters": {
+                            "type": "object",
+                            "description": "집계 전에 적용할 필터 조건 (filter_excel_data와 같은 형식, 선택사항)"
+                        },
+                        "sort_by": {
+                            "type": "string",
+                            "description": "결과 정렬 기준 컬럼 (그룹 키 또는 집계 결과 이름, 선택사항, 기본값: 그룹 키 순)",
+                            "default": None
+                        },
+                        "descending": {
+                            "type": "boolean",
+                            "description": "sort_by 내림차순 정렬 여부",
+                            "default": False
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "반환할 최대 그룹 수 (선택사항, 정렬 후 앞에서부터)",
+                            "default": None
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": list(FORMATS),
+                            "description": "결과 data 형식 (read_excel과 같음)",
+                            "default": DEFAULT_FORMAT
+                        }
+                    },
+                    "required": ["file_path", "aggregations"]
+                }
+            },
+            "query_excel": {
+                "name": "query_excel",
+                "description": "시트에 SQL(SQLite) 질의를 실행합니다. 조인, 윈도 함수, 정렬 등 filter_excel_data로 표현하기 어려운 질문에 사용합니다.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "sql": {
+                            "type": "string",
+                            "description": "읽기 전용 SELECT 질의. file_path의 시트는 시트 이름으로 참조 (공백이 있으면 \"큰따옴표\"로 감싸기)"
+                        },
+                        "file_path": {
+                            "type": "string",
+                            "description": "시트를 테이블로 쓸 Excel 파일 경로 (선택사항)",
+                            "default": None
+                        },
+                        "tables": {
+                            "type": "object",
+                            "description": "추가 테이블 {이름: 파일 경로 또는 {\"file_path\": 경로, \"sheet_name\": 시트}} (여러 파일 조인용, 선택사항)"
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "건너뛸 결과 행 수 (선택사항)",
+                            "default": None
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"페이지 크기 (선택사항, 기본값: {DEFAULT_PAGE_SIZE})",
+                            "default": None
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": list(FORMATS),
+                            "description": "결과 data 형식 (read_excel과 같음)",
+                            "default": DEFAULT_FORMAT
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "이전 응답의 next_cursor 값 (다음 페이지 받기)",
+                            "default": None
+                        },
+                        "max_response_bytes": {
+                            "type": "integer",
+                            "description": "응답 data의 최대 바이트 수 (선택사항, 넘으면 잘라서 next_cursor 반환)",
+                            "default": None
+                        },
+                        "max_rows": {
+                            "type": "integer",
+                            "description": "응답에 담을 최대 행 수 (선택사항)",
+                            "default": None
+                        }
+                    },
+                    "required": ["sql"]
+                }
+            },
+            "scan_excel_files": {
+                "name": "scan_excel_files",
+                "description": "디렉터리나 glob 패턴에 해당하는 Excel 파일들의 정보(get_excel_info와 같은 시트 목록/크기)를 병렬로 한 번에 가져옵니다. 이전 스캔 뒤 바뀌지 않은 파일은 다시 열지 않습니다",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "path": {
+                            "type": "string",
+                            "description": "디렉터리 경로 또는 glob 패턴 (예: /share/reports/**/*.xlsx)"
+                        },
+                        "recursive": {
+                            "type": "boolean",
+                            "description": "디렉터리일 때 하위 디렉터리 포함 여부",
+                            "default": True
+                        },
+                        "exact_rows": {
+                            "type": "boolean",
+                            "description": "get_excel_info와 같음 (시트를 훑어 정확한 행 수 계산)",
+                            "default": False
+                        },
+                        "concurrency": {
+                            "type": "integer",
+                            "description": f"동시에 여는 파일 수 (선택사항, 기본값: 작업자 수, 최대 {MAX_SCAN_WORKERS})",
+                            "default": None
+                        }
+                    },
+                    "required": ["path"]
+                }
+            },
+            "index_directory": {
+                "name": "index_directory",
+                "description": "디렉터리의 Excel 파일(.xlsx, .xlsm) 셀 텍스트를 전문 검색 색인에 저장합니다. 다시 실행하면 바뀐 파일만 색인합니다",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "directory": {
+                            "type": "string",
+                            "description": "색인할 디렉터리 경로"
+                        },
+                        "recursive": {
+                            "type": "boolean",
+                            "description": "하위 디렉터리 포함 여부",
+                            "default": True
+                        },
+                        "include_numbers": {
+                            "type": "boolean",
+                            "description": "숫자 셀도 색인 (송장 번호처럼 숫자로 저장된 값을 검색할 때, 색인이 커짐)",
+                            "default": False
+                        }
+                    },
+                    "required": ["directory"]
+                }
+            },
+            "search_excel": {
+                "name": "search_excel",
+                "description": "index_directory로 색인한 워크북에서 텍스트가 들어 있는 셀(파일, 시트, 셀 좌표)을 찾습니다. 워크북을 열지 않고 색인만 조회합니다",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "검색어 (공백으로 나눈 단어가 모두 들어 있는 셀)"
+                        },
+                        "directory": {
+                            "type": "string",
+                            "description": "이 디렉터리 아래 파일만 검색 (선택사항)",
+                            "default": None
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "반환할 최대 결과 수",
+                            "default": 20
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "건너뛸 결과 수",
+                            "default": 0
+                        },
+                        "prefix": {
+                            "type": "boolean",
+                            "description": "단어로 시작하는 값도 찾기 (예: 송장 → 송장번호)",
+                            "default": False
+                        }
+                    },
+                    "required": ["query"]
+                }
+            },
+            "batch": {
+                "name": "batch",
+                "description": "여러 도구 호출을 한 번에 실행하고 결과를 순서대로 반환합니다. 같은 파일의 시트는 한 번만 파싱하고, 읽기 호출은 동시에 실행합니다.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "description": "도구 호출 목록 ([{\"tool\": 도구 이름, \"arguments\": {...}}, ...])",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "tool": {"type": "string"},
+                                    "arguments": {"type": "object"}
+                                },
+                                "required": ["tool"]
+                            }
+                        },
+                        "file_path": {
+                            "type": "string",
+                            "description": "호출에 file_path가 없으면 사용할 Excel 파일 경로 (선택사항)"
+                        }
+                    },
+                    "required": ["calls"]
+                }
+            },
+            "begin_write": {
+                "name": "begin_write",
+                "description": "큰 데이터를 나눠 저장하는 쓰기 세션을 시작합니다. append_rows로 행을 추가하고 commit_write로 파일을 완성합니다.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "file_path": {
+                            "type": "string",
+                            "description": "저장할 Excel 파일 경로 (commit_write 전까지는 바뀌지 않음)"
+                        },
+                        "sheet_name": {
+                            "type": "string",
+                            "description": "시트 이름",
+                            "default": "Sheet1"
+                        },
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "헤더 컬럼 목록 (선택사항, 없으면 첫 행의 키 사용)"
+                        }
+                    },
+                    "required": ["file_path"]
+                }
+            },
+            "append_rows": {
+                "name": "append_rows",
+                "description": "쓰기 세션에 행을 추가합니다. 행은 받는 즉시 디스크에 기록됩니다.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "begin_write가 반환한 세션 ID"
+                        },
+                        "rows": {
+                            "type": "array",
+                            "description": "추가할 행 (딕셔너리 배열 또는 헤더 순서의 값 배열)"
+                        }
+                    },
+                    "required": ["session_id", "rows"]
+                }
+            },
+            "commit_write": {
+                "name": "commit_write",
+                "description": "쓰기 세션을 마치고 파일을 저장합니다 (기존 파일은 한 번에 교체).",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "begin_write가 반환한 세션 ID"
+                        }
+                    },
+                    "required": ["session_id"]
+                }
+            },
+            "abort_write": {
+                "name": "abort_write",
+                "description": "쓰기 세션을 취소합니다 (대상 파일은 바뀌지 않음).",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "begin_write가 반환한 세션 ID"
+                        }
+                    },
+                    "required": ["session_id"]
+                }
             }
         }
 
-    async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
-        """MCP 메시지 처리"""
+    async def handle_message(self, message: Union[Dict[str, Any], List[Any]]) -> Any:
+        """MCP 메시지 처리 (JSON-RPC 배치 배열이면 응답 배열 반환)"""
+        if isinstance(message, list):
+            return await self.handle_batch(message)
+        if not isinstance(message, dict):
+            return self.error_response(None, -32600, "Invalid Request")
         try:
             method = message.get("method")
             params = message.get("params", {})
@@ -155,6 +716,13 @@ class MCPServer:
                 return await self.handle_list_tools(msg_id)
             elif method == "tools/call":
                 return await self.handle_call_tool(msg_id, params)
+            elif method == "notifications/initialized":
+                # 핸드셰이크가 끝나면 첫 도구 호출 전에 pandas 등을 미리 불러옴
+                if self.config.prewarm:
+                    self.prewarm()
+                return None
+            elif method == "server/metrics":
+                return {"jsonrpc": "2.0", "id": msg_id, "result": self.metrics_snapshot()}
             else:
                 return self.error_response(msg_id, -32601, f"Method not found: {method}")
 
@@ -162,6 +730,31 @@ class MCPServer:
             self.logger.error(f"Error handling message: {e}\n{traceback.format_exc()}")
             return self.error_response(message.get("id"), -32603, str(e))
 
+    async def handle_batch(self, messages: List[Any]) -> Union[List[Dict[str, Any]], Dict[str, Any], None]:
+        """JSON-RPC 배치를 순서대로 처리 (알림에는 응답하지 않으며, 응답이 없으면 None)"""
+        if not messages:
+            return self.error_response(None, -32600, "Invalid Request")
+        responses = []
+        for message in messages:
+            response = await self.handle_message(message)
+            if not isinstance(message, dict) or "id" in message:
+                responses.append(response)
+        return responses or None
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """도구별 지표와 캐시 통계"""
+        snapshot = self.metrics.snapshot()
+        snapshot["caches"] = {"frames": self.frame_cache.stats(), "results": self.results.stats()}
+        if "indexes" in self._components:
+            snapshot["caches"]["indexes"] = self.indexes.stats()
+        if "sql_store" in self._components:
+            snapshot["caches"]["sql"] = self.sql_store.stats()
+        if "search_index" in self._components:
+            snapshot["caches"]["search"] = self.search_index.stats()
+        if "manifest" in self._components:
+            snapshot["caches"]["manifest"] = self.manifest.stats()
+        return snapshot
+
     async def handle_initialize(self, msg_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
         """초기화 핸들러"""
         return {
@@ -198,19 +791,19 @@ class MCPServer:
         if tool_name not in self.tools:
             return self.error_response(msg_id, -32602, f"Unknown tool: {tool_name}")
 
+        self.wait_prewarm()
+        token = _progress_token.set((params.get("_meta") or {}).get("progressToken"))
+        timer = None
         try:
-            if tool_name == "read_excel":
-                result = await self.read_excel(**arguments)
-            elif tool_name == "write_excel":
-                result = await self.write_excel(**arguments)
-            elif tool_name == "get_excel_info":
-                result = await self.get_excel_info(**arguments)
-            elif tool_name == "analyze_excel":
-                result = await self.analyze_excel(**arguments)
-            elif tool_name == "filter_excel_data":
-                result = await self.filter_excel_data(**arguments)
-            else:
-                return self.error_response(msg_id, -32602, f"Tool not implemented: {tool_name}")
+            with self.metrics.track() as timer:
+                result = await self.call_tool(tool_name, arguments)
+                if result is None:
+                    return self.error_response(msg_id, -32602, f"Tool not implemented: {tool_name}")
+                # 결과는 들여쓰기 없이 한 번만 인코딩
+                with phase("serialize"):
+                    text, meta = encode_result(result)
+            self.metrics.record_call(tool_name, timer, success=bool(result.get("success", True)),
+                                     cache_hit=result.get("cache_hit"), bytes_out=meta["payload_bytes"])
 
             return {
                 "jsonrpc": "2.0",
@@ -219,7 +812,7 @@ class MCPServer:
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, ensure_ascii=False, indent=2)
+                            "text": text
                         }
                     ]
                 }
@@ -227,7 +820,66 @@ class MCPServer:
 
         except Exception as e:
             self.logger.error(f"Error calling tool {tool_name}: {e}\n{traceback.format_exc()}")
+            if timer is not None:
+                self.metrics.record_call(tool_name, timer, success=False)
             return self.error_response(msg_id, -32603, str(e))
+        finally:
+            _progress_token.reset(token)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """도구 이름으로 도구 실행 (구현되지 않은 도구면 None)"""
+        if tool_name == "read_excel":
+            return await self.read_excel(**arguments)
+        elif tool_name == "write_excel":
+            return await self.write_excel(**arguments)
+        elif tool_name == "get_excel_info":
+            return await self.get_excel_info(**arguments)
+        elif tool_name == "analyze_excel":
+            return await self.analyze_excel(**arguments)
+        elif tool_name == "filter_excel_data":
+            return await self.filter_excel_data(**arguments)
+        elif tool_name == "aggregate_excel":
+            return await self.aggregate_excel(**arguments)
+        elif tool_name == "query_excel":
+            return await self.query_excel(**arguments)
+        elif tool_name == "scan_excel_files":
+            return await self.scan_excel_files(**arguments)
+        elif tool_name == "index_directory":
+            return await self.index_directory(**arguments)
+        elif tool_name == "search_excel":
+            return await self.search_excel(**arguments)
+        elif tool_name == "begin_write":
+            return await self.begin_write(**arguments)
+        elif tool_name == "append_rows":
+            return await self.append_rows(**arguments)
+        elif tool_name == "commit_write":
+            return await self.commit_write(**arguments)
+        elif tool_name == "abort_write":
+            return await self.abort_write(**arguments)
+        elif tool_name == "batch":
+            return await self.batch(**arguments)
+        return None
+
+    def progress_reporter(self) -> Callable[..., None]:
+        """현재 도구 호출의 진행 상황 알림 함수 (작업자 스레드에서도 호출 가능)
+
+        클라이언트가 progressToken을 보내지 않았으면 아무것도 하지 않습니다.
+        data를 주면 알림의 params.data에 함께 실어 보냅니다 (끝난 항목의 요약 등).
+        """
+        token = _progress_token.get()
+        notifier = self.notifier
+
+        def report(progress: int, total: int, message: Optional[str] = None,
+                   data: Optional[Dict[str, Any]] = None):
+            if token is None or notifier is None:
+                return
+            params = {"progressToken": token, "progress": progress, "total": total}
+            if message:
+                params["message"] = message
+            if data is not None:
+                params["data"] = data
+            notifier({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+        return report
 
     def error_response(self, msg_id: int, code: int, message: str) -> Dict[str, Any]:
         """에러 응답 생성"""
@@ -240,30 +892,191 @@ class MCPServer:
             }
         }
 
+    def load_frame(self, file_path: Path, sheet_name: Optional[str] = None,
+                   nrows: Optional[int] = None,
+                   columns: Optional[List[str]] = None) -> Tuple["pd.DataFrame", bool]:
+        """시트를 DataFrame으로 읽기 (파일이 바뀌지 않았다면 캐시 사용)
+
+        columns가 주어지면 헤더 행에서 위치를 한 번 찾아 해당 컬럼만 파싱합니다.
+        nrows가 주어지고 캐시에 없으면 필요한 행만 파싱하며 그 결과는 캐시하지 않습니다.
+        반환값: (DataFrame, 캐시 적중 여부)
+        """
+        sheet = sheet_name if sheet_name else 0
+        version = file_version(file_path)
+        full_key = (version, sheet)
+
+        usecols = None
+        if columns:
+            header = sheet_header(version, sheet)
+            usecols = sorted(set(resolve_columns(header, columns)))
+            # 시트 전체가 캐시에 있으면 파싱 없이 컬럼만 선택
+            df = self.frame_cache.get(full_key) if full_key in self.frame_cache else None
+            if df is not None:
+                df = df[list(columns)]
+                return (df.head(nrows) if nrows else df), True
+
+        key = (version, sheet, tuple(usecols)) if usecols else full_key
+        df = self.frame_cache.get(key)
+        if df is not None:
+            return (df.head(nrows) if nrows else df), True
+
+        read_kwargs = {"usecols": usecols} if usecols else {}
+        if nrows:
+            df = self.sidecars.load(file_path, sheet, columns) if self.sidecars else None
+            if df is not None:
+                return df.head(nrows), False
+            df = self.engine.parse(file_path, sheet, nrows=nrows, **read_kwargs)
+            return self._projected(df, header, usecols, columns) if usecols else df, False
+
+        with self.frame_cache.key_lock(key):
+            # 잠금을 기다리는 동안 다른 요청이 적재했을 수 있음
+            df = self.frame_cache.get(key, record=False)
+            if df is not None:
+                return df, True
+
+            df = self.sidecars.load(file_path, sheet, columns) if self.sidecars else None
+            if df is None:
+                df = self.engine.parse(file_path, sheet, **read_kwargs)
+                if usecols:
+                    df = self._projected(df, header, usecols, columns)
+                elif self.sidecars:
+                    self._save_sidecar(file_path, sheet, df)
+                df = self._compact(df)
+            if not self.frame_cache.put(key, df):
+                self.logger.info(f"캐시 예산 초과로 캐시하지 않음: {file_path} [{sheet}]")
+        return df, False
+
+    def _compact(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """캐시에 넣기 전 타입 압축 (사이드카에서 읽은 메모리 매핑 프레임은 복사되므로 압축하지 않음)"""
+        if not self.config.compact:
+            return df
+        return excel_compact.compact_frame(df, self.config.category_ratio, self.config.arrow_strings)
+
+    def _save_sidecar(self, file_path: Path, sheet: Union[str, int], df: "pd.DataFrame"):
+        """컬럼 사이드카 저장 (실패해도 읽기 결과에는 영향 없음)"""
+        try:
+            self.sidecars.save(file_path, sheet, df)
+        except Exception as e:
+            self.logger.warning(f"사이드카 저장 실패: {file_path} [{sheet}]: {e}")
+
+    def _projected(self, df: "pd.DataFrame", header: Tuple[Any, ...], usecols: List[int],
+                   columns: List[Any]) -> "pd.DataFrame":
+        """usecols로 읽은 결과에 전체 헤더 기준 컬럼명을 붙이고 요청한 순서로 정렬
+
+        컬럼 인덱스 타입도 전체 시트를 읽었을 때와 같도록 전체 헤더에서 고릅니다 (숫자 헤더 등).
+        """
+        df.columns = pd.Index(list(header))[usecols]
+        return df if df.columns.tolist() == list(columns) else df[list(columns)]
+
+    def _budget(self, max_response_bytes: Optional[int], max_rows: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        """서버 설정과 호출 인자 중 더 작은 응답 예산 (바이트, 행 수)"""
+        def smaller(*values: Optional[int]) -> Optional[int]:
+            values = [v for v in values if v]
+            return min(values) if values else None
+        return (smaller(self.config.max_response_bytes, max_response_bytes),
+                smaller(self.config.max_rows, max_rows))
+
+    def _sheet_list(self, file_path: Path, sheet_name: Any) -> Optional[List[str]]:
+        """sheet_name이 "*"이면 모든 시트, 배열이면 해당 시트 목록 (시트 하나면 None)"""
+        if sheet_name != "*" and not isinstance(sheet_name, (list, tuple)):
+            return None
+        # 시트 목록은 zip의 workbook.xml만 읽어 확인
+        try:
+            with excel_xml.XlsxReader(file_path) as reader:
+                names = reader.sheet_names
+        except (zipfile.BadZipFile, KeyError):
+            workbook = openpyxl.load_workbook(file_path, read_only=True)
+            names = workbook.sheetnames
+            workbook.close()
+        if sheet_name == "*":
+            return names
+        unknown = [name for name in sheet_name if name not in names]
+        if unknown:
+            raise ValueError(f"시트를 찾을 수 없습니다: {unknown} (사용 가능한 시트: {names})")
+        return list(sheet_name)
+
+    def _iter_frames(self, file_path: Path, sheets: List[str]) -> Iterator[Tuple[str, "pd.DataFrame", bool]]:
+        """여러 시트를 준비되는 순서대로 (시트, DataFrame, 캐시 적중 여부)로 반환
+
+        캐시나 사이드카에 없는 시트는 엔진에서 파싱하며, 파싱이 끝난 시트부터 반환합니다.
+        """
+        version = file_version(file_path)
+        missing = []
+        for sheet in sheets:
+            df = self.frame_cache.get((version, sheet))
+            if df is not None:
+                yield sheet, df, True
+                continue
+            df = self.sidecars.load(file_path, sheet) if self.sidecars else None
+            if df is not None:
+                self.frame_cache.put((version, sheet), df)
+                yield sheet, df, False
+            else:
+                missing.append(sheet)
+
+        for sheet, df in self.engine.iter_workbook(file_path, missing):
+            if self.sidecars:
+                self._save_sidecar(file_path, sheet, df)
+            df = self._compact(df)
+            self.frame_cache.put((version, sheet), df)
+            yield sheet, df, False
+
     # Excel 처리 메서드들
-    async def read_excel(self, file_path: str, sheet_name: Optional[str] = None, rows: Optional[int] = None) -> Dict[str, Any]:
+    async def read_excel(self, file_path: str, sheet_name: Optional[str] = None, rows: Optional[int] = None,
+                         columns: Optional[List[str]] = None, offset: Optional[int] = None,
+                         limit: Optional[int] = None, cursor: Optional[str] = None,
+                         format: str = DEFAULT_FORMAT, max_response_bytes: Optional[int] = None,
+                         max_rows: Optional[int] = None) -> Dict[str, Any]:
         """Excel 파일 읽기"""
         try:
             file_path = Path(file_path)
+            check_format(format)
+            budget = self._budget(max_response_bytes, max_rows)
+            if cursor:
+                state = decode_cursor(cursor)
+                if "q" in state:
+                    raise ValueError("filter_excel_data의 커서입니다. filter_excel_data에 전달해주세요")
+                if "sql" in state:
+                    raise ValueError("query_excel의 커서입니다. query_excel에 전달해주세요")
+                file_path = Path(state["f"])
+                sheet_name, offset, limit = state.get("s"), state["o"], state.get("l")
+                columns = state.get("c")
+
             if not file_path.exists():
                 raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
 
-            # pandas로 Excel 읽기
-            kwargs = {}
-            if sheet_name:
-                kwargs['sheet_name'] = sheet_name
-            if rows:
-                kwargs['nrows'] = rows
+            sheets = self._sheet_list(file_path, sheet_name)
+            if sheets is not None:
+                if cursor or offset is not None or limit is not None:
+                    raise ValueError("여러 시트를 읽을 때는 페이지 읽기를 사용할 수 없습니다. 시트별 next_cursor를 사용해주세요")
+                return self._read_workbook(file_path, sheets, rows, columns, format, budget)
 
-            df = pd.read_excel(file_path, **kwargs)
+            if cursor or offset is not None or limit is not None:
+                return self.read_excel_page(file_path, sheet_name, offset or 0, limit or DEFAULT_PAGE_SIZE,
+                                            columns=columns,
+                                            expected_version=state["v"] if cursor else None,
+                                            format=format, budget=budget,
+                                            end=state.get("e") if cursor else None)
+
+            # pandas로 Excel 읽기
+            df, cache_hit = self.load_frame(file_path, sheet_name, nrows=rows, columns=columns)
+            # 예산 안에 들어가는 행까지만 변환/인코딩
+            data, returned = encode_rows(len(df), lambda a, b: shape_frame(df.iloc[a:b], format), *budget)
             
-            return {
+            result = {
                 "success": True,
-                "data": df.to_dict('records'),
+                "data": data,
+                "format": format,
                 "shape": df.shape,
                 "columns": df.columns.tolist(),
+                "cache_hit": cache_hit,
+                "truncated": returned < len(df),
                 "file_path": str(file_path)
             }
+            if returned < len(df):
+                result.update(returned_rows=returned, summary=frame_summary(df), next_cursor=self._rest_cursor(
+                    file_path, sheet_name, returned, rows, columns, file_version(file_path)))
+            return result
 
         except Exception as e:
             return {
@@ -272,19 +1085,172 @@ class MCPServer:
                 "file_path": str(file_path)
             }
 
-    async def write_excel(self, file_path: str, data: List[Dict], sheet_name: str = "Sheet1") -> Dict[str, Any]:
+    def _read_workbook(self, file_path: Path, sheets: List[str], rows: Optional[int],
+                       columns: Optional[List[str]], format: str,
+                       budget: Tuple[Optional[int], Optional[int]]) -> Dict[str, Any]:
+        """여러 시트 읽기 (응답 예산은 시트 순서대로 나눠 씀)"""
+        remaining, row_cap = budget
+        report = self.progress_reporter()
+        version = file_version(file_path)
+        if columns:
+            frames = ((sheet, *self.load_frame(file_path, sheet, nrows=rows, columns=columns)) for sheet in sheets)
+        else:
+            frames = self._iter_frames(file_path, sheets)
+
+        results: Dict[str, Any] = {}
+        for done, (sheet, df, cache_hit) in enumerate(frames, start=1):
+            if rows:
+                df = df.head(rows)
+            if remaining is not None and remaining <= 2:
+                # 앞 시트들이 예산을 모두 씀
+                data, returned = encode_rows(0, lambda a, b, df=df: shape_frame(df.iloc[a:b], format))
+            else:
+                data, returned = encode_rows(len(df), lambda a, b, df=df: shape_frame(df.iloc[a:b], format),
+                                             remaining, row_cap)
+                if remaining is not None:
+                    remaining -= len(data.json.encode("utf-8"))
+
+            result = {
+                "data": data,
+                "shape": df.shape,
+                "columns": df.columns.tolist(),
+                "cache_hit": cache_hit,
+                "truncated": returned < len(df)
+            }
+            if returned < len(df):
+                result.update(returned_rows=returned, summary=frame_summary(df), next_cursor=self._rest_cursor(
+                    file_path, sheet, returned, rows, columns, version))
+            results[sheet] = result
+            report(done, len(sheets), f"{sheet} 읽기 완료")
+
+        return {
+            "success": True,
+            "format": format,
+            "sheets": {sheet: results[sheet] for sheet in sheets},
+            "total_sheets": len(sheets),
+            "total_rows": sum(result["shape"][0] for result in results.values()),
+            "file_path": str(file_path)
+        }
+
+    def _rest_cursor(self, file_path: Path, sheet_name: Optional[Union[str, int]], returned: int,
+                     rows: Optional[int], columns: Optional[List[str]], version: FileVersion) -> str:
+        """예산 때문에 잘린 전체 읽기를 이어 받을 커서 (rows로 제한했으면 그 행까지만 페이지로 읽음)"""
+        state = {
+            "f": str(file_path), "s": sheet_name, "o": returned, "l": DEFAULT_PAGE_SIZE,
+            "c": list(columns) if columns else None, "v": list(version[1:])
+        }
+        if rows:
+            state.update(l=max(1, min(DEFAULT_PAGE_SIZE, rows - returned)), e=rows)
+        return encode_cursor(state)
+
+    def read_excel_page(self, file_path: Path, sheet_name: Optional[str], offset: int, limit: int,
+                        columns: Optional[List[str]] = None,
+                        expected_version: Optional[List[int]] = None,
+                        format: str = DEFAULT_FORMAT,
+                        budget: Tuple[Optional[int], Optional[int]] = (None, None),
+                        end: Optional[int] = None) -> Dict[str, Any]:
+        """offset부터 limit개 행을 읽어 다음 페이지 커서와 함께 반환
+
+        시트가 캐시에 있으면 잘라서 반환하고, 없으면 read_only 스트리밍으로
+        해당 페이지만 읽습니다 (메모리 사용량은 페이지 크기에 비례).
+        end가 주어지면 그 행(제외) 앞에서 멈춥니다 (read_excel의 rows 제한을 이어 받은 커서).
+        """
+        if end is not None:
+            limit = min(limit, end - offset)
+        if offset < 0 or limit <= 0:
+            raise ValueError("offset은 0 이상, limit은 1 이상이어야 합니다")
+
+        version = file_version(file_path)
+        if expected_version is not None and list(version[1:]) != list(expected_version):
+            raise ValueError("커서를 만든 뒤 파일이 변경되었습니다. 처음부터 다시 읽어주세요")
+
+        sheet = sheet_name if sheet_name else 0
+        positions = resolve_columns(sheet_header(version, sheet), columns) if columns else None
+        df = self.frame_cache.get((version, sheet))
+        if df is None and self.sidecars:
+            # 사이드카가 있으면 시트 전체를 매핑해 캐시에 올리는 편이 스트리밍보다 빠름
+            df = self.sidecars.load(file_path, sheet)
+            if df is not None:
+                self.frame_cache.put((version, sheet), df)
+        if df is not None:
+            page = df.iloc[offset:offset + limit]
+            if columns:
+                page = page[list(columns)]
+            header = page.columns.tolist()
+            data, returned = encode_rows(len(page), lambda a, b: shape_frame(page.iloc[a:b], format), *budget)
+            truncated = returned < len(page)
+            summary = frame_summary(page) if truncated else None
+            has_more = truncated or offset + limit < len(df)
+        else:
+            header, page_rows, has_more = self.row_streams.read_page(file_path, version, sheet, offset, limit)
+            if positions is not None:
+                header = list(columns)
+                page_rows = [tuple(row[i] if i < len(row) else None for i in positions) for row in page_rows]
+            data, returned = encode_rows(len(page_rows), lambda a, b: shape_rows(header, page_rows[a:b], format),
+                                         *budget)
+            truncated = returned < len(page_rows)
+            summary = rows_summary(header, page_rows) if truncated else None
+            has_more = truncated or has_more
+
+        if end is not None and offset + returned >= end:
+            has_more = False
+        next_cursor = None
+        if has_more:
+            state = {
+                "f": str(file_path), "s": sheet_name, "o": offset + returned, "l": limit,
+                "c": list(columns) if columns else None, "v": list(version[1:])
+            }
+            if end is not None:
+                state["e"] = end
+            next_cursor = encode_cursor(state)
+
+        result = {
+            "success": True,
+            "data": data,
+            "format": format,
+            "columns": header,
+            "offset": offset,
+            "limit": limit,
+            "returned_rows": returned,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+            "cache_hit": df is not None,
+            "truncated": truncated,
+            "file_path": str(file_path)
+        }
+        if truncated:
+            result["summary"] = summary
+        return result
+
+    async def write_excel(self, file_path: str, data: Optional[List[Dict]] = None, sheet_name: str = "Sheet1",
+                          sheets: Optional[Dict[str, List[Any]]] = None, mode: str = "replace") -> Dict[str, Any]:
         """Excel 파일 쓰기"""
         try:
-            df = pd.DataFrame(data)
             file_path = Path(file_path)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            df.to_excel(file_path, sheet_name=sheet_name, index=False)
+            if (data is None) == (sheets is None):
+                raise ValueError("data와 sheets 중 하나만 지정해주세요")
+            if mode not in ("replace", "append"):
+                raise ValueError(f"지원하지 않는 쓰기 모드입니다: {mode}")
+            sheets = {sheet_name: data} if sheets is None else sheets
+            if not sheets:
+                raise ValueError("저장할 시트가 없습니다")
+
+            self.row_streams.close_path(file_path)
+            if mode == "append" and file_path.exists():
+                # 바뀌는 시트 XML만 새로 쓰고 나머지 zip 항목은 그대로 복사
+                try:
+                    written = excel_writer.append_workbook(file_path, sheets)
+                except (NotImplementedError, zipfile.BadZipFile, KeyError):
+                    written = excel_writer.append_openpyxl(file_path, sheets)
+            else:
+                written = self._write_sheets(file_path, sheets)
             
             return {
                 "success": True,
                 "message": f"파일이 성공적으로 저장되었습니다: {file_path}",
-                "rows_written": len(data),
+                "rows_written": sum(written.values()),
+                "sheets": written,
+                "mode": mode,
                 "file_path": str(file_path)
             }
 
@@ -295,84 +1261,576 @@ class MCPServer:
                 "file_path": str(file_path)
             }
 
-    async def get_excel_info(self, file_path: str) -> Dict[str, Any]:
+    def _write_sheets(self, file_path: Path, sheets: Dict[str, List[Any]]) -> Dict[str, int]:
+        """시트들을 새 파일로 기록 (DataFrame을 거치지 않고 임시 파일에 쓴 뒤 교체)"""
+        writer = None
+        written = {}
+        try:
+            for name, rows in sheets.items():
+                columns = excel_writer.record_columns(rows) if all(isinstance(row, dict) for row in rows) else None
+                if writer is None:
+                    writer = excel_writer.StreamingWriter(file_path, name, columns)
+                else:
+                    writer.add_sheet(name, columns)
+                written[name] = writer.append(rows)
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
+        writer.commit()
+        return written
+
+    async def batch(self, calls: List[Dict[str, Any]], file_path: Optional[str] = None) -> Dict[str, Any]:
+        """여러 도구 호출을 실행하고 결과를 호출 순서대로 반환
+
+        읽기 호출은 작업자 풀에서 동시에 실행하고, 쓰기 호출은 앞의 호출이 모두 끝난 뒤 하나씩 실행합니다.
+        여러 호출이 같은 시트를 읽으면 먼저 한 번만 파싱해 캐시에 올려 둡니다.
+        """
+        try:
+            prepared = [self._batch_call(call, file_path) for call in calls]
+            self._preload_sheets([call for call in prepared if isinstance(call, tuple)])
+            report = self.progress_reporter()
+            results: List[Optional[Dict[str, Any]]] = [
+                call if isinstance(call, dict) else None for call in prepared
+            ]
+
+            def run(index: int):
+                name, arguments = prepared[index]
+                # 하위 호출도 도구별 지표에 따로 기록 (작업자 스레드라 batch 호출의 단계 시간에는 들어가지 않음)
+                with self.metrics.track() as timer:
+                    try:
+                        result = asyncio.run(self.call_tool(name, arguments))
+                    except Exception as e:
+                        result = {"success": False, "error": str(e)}
+                self.metrics.record_call(name, timer, success=bool(result.get("success", True)),
+                                         cache_hit=result.get("cache_hit"))
+                results[index] = result
+                report(sum(result is not None for result in results), len(results), f"{name} 완료")
+
+            with ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="excel-batch") as pool:
+                group = []
+                for index, call in enumerate(prepared):
+                    if not isinstance(call, tuple):
+                        continue
+                    if call[0] in WRITE_TOOLS:
+                        # 앞의 호출이 끝난 뒤 쓰기 실행
+                        list(pool.map(run, group))
+                        group = []
+                        pool.submit(run, index).result()
+                    else:
+                        group.append(index)
+                list(pool.map(run, group))
+
+            return {
+                "success": True,
+                "results": results,
+                "total_calls": len(results),
+                "failed_calls": sum(not result.get("success", False) for result in results)
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_path": file_path
+            }
+
+    def _batch_call(self, call: Dict[str, Any], file_path: Optional[str]) -> Union[Tuple[str, Dict[str, Any]], Dict[str, Any]]:
+        """batch 항목을 (도구 이름, 인자)로 (잘못된 항목이면 오류 결과)"""
+        name = call.get("tool") if isinstance(call, dict) else None
+        if name not in self.tools or name == "batch":
+            return {"success": False, "error": f"batch에서 사용할 수 없는 도구입니다: {name}"}
+        arguments = dict(call.get("arguments") or {})
+        if file_path and "file_path" not in arguments and "file_path" in self.tools[name]["inputSchema"]["properties"]:
+            arguments["file_path"] = file_path
+        return name, arguments
+
+    def _preload_sheets(self, calls: List[Tuple[str, Dict[str, Any]]]):
+        """여러 호출이 같은 시트 전체를 쓰면 호출 전에 한 번만 파싱"""
+        counts: Dict[Tuple[str, Any], int] = {}
+        for name, arguments in calls:
+            if name in WRITE_TOOLS:
+                # 쓰기 뒤의 호출은 바뀐 파일을 읽어야 하므로 그 앞까지만
+                break
+            sheet = arguments.get("sheet_name")
+            if (name not in FRAME_TOOLS or not arguments.get("file_path") or arguments.get("stream")
+                    or isinstance(sheet, list) or sheet == "*"
+                    or any(arguments.get(key) is not None for key in ("offset", "limit", "cursor"))):
+                continue
+            key = (arguments["file_path"], sheet or None)
+            counts[key] = counts.get(key, 0) + 1
+
+        for (path, sheet), count in counts.items():
+            if count < 2:
+                continue
+            try:
+                self.load_frame(Path(path), sheet)
+            except Exception as e:
+                # 각 호출이 자신의 오류를 보고함
+                self.logger.info(f"batch 미리 읽기 실패: {path} [{sheet}]: {e}")
+
+    async def begin_write(self, file_path: str, sheet_name: str = "Sheet1",
+                          columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """쓰기 세션 시작"""
+        try:
+            session = self.write_sessions.begin(file_path, sheet_name, columns)
+            return {
+                "success": True,
+                "session_id": session.session_id,
+                "file_path": str(session.writer.file_path),
+                "sheet_name": sheet_name
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_path": str(file_path)
+            }
+
+    async def append_rows(self, session_id: str, rows: List[Any]) -> Dict[str, Any]:
+        """쓰기 세션에 행 추가"""
+        try:
+            session = self.write_sessions.get(session_id)
+            with session.lock:
+                appended = session.writer.append(rows)
+                total = session.writer.rows_written
+            return {
+                "success": True,
+                "session_id": session_id,
+                "rows_appended": appended,
+                "rows_written": total
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "session_id": session_id
+            }
+
+    async def commit_write(self, session_id: str) -> Dict[str, Any]:
+        """쓰기 세션을 마치고 파일 저장"""
+        try:
+            session = self.write_sessions.pop(session_id)
+            with session.lock:
+                self.row_streams.close_path(session.writer.file_path)
+                file_path = session.writer.commit()
+            return {
+                "success": True,
+                "message": f"파일이 성공적으로 저장되었습니다: {file_path}",
+                "rows_written": session.writer.rows_written,
+                "file_path": str(file_path),
+                "file_size": file_path.stat().st_size
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "session_id": session_id
+            }
+
+    async def abort_write(self, session_id: str) -> Dict[str, Any]:
+        """쓰기 세션 취소"""
+        try:
+            session = self.write_sessions.pop(session_id)
+            with session.lock:
+                session.writer.abort()
+            return {
+                "success": True,
+                "session_id": session_id,
+                "rows_discarded": session.writer.rows_written
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "session_id": session_id
+            }
+
+    async def get_excel_info(self, file_path: str, exact_rows: bool = False) -> Dict[str, Any]:
         """Excel 파일 정보 가져오기"""
         try:
             file_path = Path(file_path)
             if not file_path.exists():
                 raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+            return self._workbook_info(file_path, exact_rows)
 
-            # openpyxl로 시트 정보 가져오기
-            workbook = openpyxl.load_workbook(file_path, read_only=True)
-            sheets_info = []
-            
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                sheets_info.append({
-                    "name": sheet_name,
-                    "max_row": sheet.max_row,
-                    "max_column": sheet.max_column,
-                    "dimensions": f"{sheet.max_column}x{sheet.max_row}"
-                })
-            
-            workbook.close()
-            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_path": str(file_path)
+            }
+
+    def _workbook_info(self, file_path: Path, exact_rows: bool = False) -> Dict[str, Any]:
+        """get_excel_info 결과 (여러 작업자 스레드에서 동시에 호출 가능)"""
+        # zip 메타데이터와 시트 XML 앞부분만 읽기
+        try:
+            info = excel_xml.workbook_info(file_path, exact_rows=exact_rows)
+        except (zipfile.BadZipFile, NotImplementedError, KeyError, ValueError):
+            info = None
+        if info is not None:
             return {
                 "success": True,
                 "file_path": str(file_path),
                 "file_size": file_path.stat().st_size,
-                "sheets": sheets_info,
-                "total_sheets": len(sheets_info)
+                "sheets": info["sheets"],
+                "total_sheets": len(info["sheets"]),
+                "defined_names": info["defined_names"],
+                "date1904": info["date1904"]
+            }
+
+        # 직접 읽을 수 없는 파일은 openpyxl로 시트 정보 가져오기
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        sheets_info = []
+        
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            sheets_info.append({
+                "name": sheet_name,
+                "max_row": sheet.max_row,
+                "max_column": sheet.max_column,
+                "dimensions": f"{sheet.max_column}x{sheet.max_row}"
+            })
+        
+        workbook.close()
+        
+        return {
+            "success": True,
+            "file_path": str(file_path),
+            "file_size": file_path.stat().st_size,
+            "sheets": sheets_info,
+            "total_sheets": len(sheets_info)
+        }
+
+    async def scan_excel_files(self, path: str, recursive: bool = True, exact_rows: bool = False,
+                               concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """디렉터리나 glob 패턴의 워크북 메타데이터를 작업자 풀에서 병렬로 수집
+
+        매니페스트에 같은 (경로, 수정 시각, 크기)로 저장된 파일은 다시 열지 않고,
+        파일마다 끝나는 대로 그 파일의 요약(성공 여부, 캐시 여부, 시트 수, 오류)을 담아
+        진행 상황 알림을 보냅니다.
+        """
+        try:
+            started = time.perf_counter()
+            directory, paths = excel_inventory.resolve_targets(path, recursive)
+            manifest = self.manifest
+            report = self.progress_reporter()
+            workers = max(1, min(concurrency or self.config.max_workers, MAX_SCAN_WORKERS))
+            results: Dict[str, Dict[str, Any]] = {}
+
+            def finish(file_path: Path, result: Dict[str, Any]):
+                results[str(file_path)] = result
+                summary = {"file_path": str(file_path), "success": result.get("success", False),
+                           "cached": result.get("cached", False)}
+                if "total_sheets" in result:
+                    summary["total_sheets"] = result["total_sheets"]
+                if "error" in result:
+                    summary["error"] = result["error"]
+                report(len(results), len(paths), str(file_path), summary)
+
+            def scan(file_path: Path, stat: os.stat_result) -> Dict[str, Any]:
+                try:
+                    info = self._workbook_info(file_path, exact_rows)
+                    manifest.put(str(file_path), stat.st_mtime_ns, stat.st_size, exact_rows, info)
+                    return {**info, "cached": False}
+                except Exception as e:
+                    return {"success": False, "error": str(e), "file_path": str(file_path)}
+
+            pending = []
+            for file_path in paths:
+                try:
+                    stat = file_path.stat()
+                except OSError as e:
+                    finish(file_path, {"success": False, "error": str(e), "file_path": str(file_path)})
+                    continue
+                cached = manifest.get(str(file_path), stat.st_mtime_ns, stat.st_size, exact_rows)
+                if cached is not None:
+                    finish(file_path, {**cached, "cached": True})
+                else:
+                    pending.append((file_path, stat))
+
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(workers, len(pending)),
+                                        thread_name_prefix="excel-scan") as pool:
+                    futures = {pool.submit(scan, *item): item[0] for item in pending}
+                    # 끝나는 순서대로 결과를 모으고 알림을 보냄
+                    for future in as_completed(futures):
+                        finish(futures[future], future.result())
+
+            removed = manifest.prune(directory, results) if directory is not None else 0
+            files = [results[str(file_path)] for file_path in paths]
+            return {
+                "success": True,
+                "path": str(directory) if directory is not None else path,
+                "files": files,
+                "total_files": len(files),
+                "scanned_files": len(pending),
+                "cached_files": sum(1 for result in files if result.get("cached")),
+                "failed_files": sum(1 for result in files if not result.get("success")),
+                "removed_from_manifest": removed,
+                "concurrency": workers,
+                "seconds": round(time.perf_counter() - started, 3)
             }
 
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e),
-                "file_path": str(file_path)
+                "path": path
             }
 
-    async def analyze_excel(self, file_path: str, sheet_name: Optional[str] = None) -> Dict[str, Any]:
+    async def analyze_excel(self, file_path: str, sheet_name: Optional[Union[str, List[str]]] = None,
+                            columns: Optional[List[str]] = None, stream: bool = False) -> Dict[str, Any]:
         """Excel 데이터 분석"""
         try:
             file_path = Path(file_path)
             if not file_path.exists():
                 raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
 
-            kwargs = {}
-            if sheet_name:
-                kwargs['sheet_name'] = sheet_name
+            sheets = self._sheet_list(file_path, sheet_name)
+            if sheets is not None:
+                return self._analyze_workbook(file_path, sheets, columns, stream)
 
-            df = pd.read_excel(file_path, **kwargs)
-            
-            # 기본 통계 정보
-            analysis = {
+            # 바뀌지 않은 파일을 같은 옵션으로 다시 분석하면 저장된 결과 반환
+            version = file_version(file_path)
+            options = self._analysis_options(sheet_name or 0, columns, stream)
+            cached = self.results.get(version, options)
+            if cached is not None:
+                return {**cached, "cache_hit": True, "result_cached": True}
+
+            analysis = self._analyze(file_path, sheet_name, columns, stream)
+            self.results.put(version, options, analysis)
+            return {**analysis, "result_cached": False}
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_path": str(file_path)
+            }
+
+    def _analysis_options(self, sheet: Union[str, int], columns: Optional[List[str]], stream: bool) -> Dict[str, Any]:
+        """분석 결과 캐시 키에 들어가는 옵션"""
+        return {"tool": "analyze_excel", "sheet": sheet,
+                "columns": list(columns) if columns else None, "stream": bool(stream)}
+
+    def _analyze_workbook(self, file_path: Path, sheets: List[str], columns: Optional[List[str]],
+                          stream: bool) -> Dict[str, Any]:
+        """여러 시트를 작업자 풀에서 분석하고 워크북 요약과 함께 반환
+
+        시트마다 분석이 끝날 때 진행 상황 알림을 보냅니다.
+        """
+        version = file_version(file_path)
+        report = self.progress_reporter()
+        results: Dict[str, Dict[str, Any]] = {}
+        lock = threading.Lock()
+
+        def finish(sheet: str, result: Dict[str, Any]):
+            with lock:
+                results[sheet] = result
+                done = len(results)
+            report(done, len(sheets), f"{sheet} 분석 완료")
+
+        def analyze(sheet: str, df: Optional["pd.DataFrame"] = None, cache_hit: bool = False):
+            try:
+                if df is None:
+                    analysis = self._analyze(file_path, sheet, columns, stream)
+                else:
+                    analysis = self._frame_statistics(file_path, df, cache_hit)
+                self.results.put(version, self._analysis_options(sheet, columns, stream), analysis)
+                finish(sheet, {**analysis, "result_cached": False})
+            except Exception as e:
+                finish(sheet, {"success": False, "error": str(e)})
+
+        pending = []
+        for sheet in sheets:
+            cached = self.results.get(version, self._analysis_options(sheet, columns, stream))
+            if cached is not None:
+                finish(sheet, {**cached, "cache_hit": True, "result_cached": True})
+            else:
+                pending.append(sheet)
+
+        with ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="excel-sheet") as pool:
+            if stream or columns:
+                for sheet in pending:
+                    pool.submit(analyze, sheet)
+            else:
+                # 파싱된 시트부터 통계 계산을 시작
+                for sheet, df, cache_hit in self._iter_frames(file_path, pending):
+                    pool.submit(analyze, sheet, df, cache_hit)
+
+        ordered = {sheet: results[sheet] for sheet in sheets}
+        analyzed = [result for result in ordered.values() if result.get("success")]
+        return {
+            "success": True,
+            "file_path": str(file_path),
+            "workbook": {
+                "total_sheets": len(sheets),
+                "analyzed_sheets": len(analyzed),
+                "failed_sheets": [sheet for sheet, result in ordered.items() if not result.get("success")],
+                "total_rows": sum(result["shape"][0] for result in analyzed),
+                "total_cells": sum(result["shape"][0] * result["shape"][1] for result in analyzed),
+                "total_missing_values": sum(sum(result["missing_values"].values()) for result in analyzed)
+            },
+            "sheets": ordered
+        }
+
+    def _analyze(self, file_path: Path, sheet_name: Optional[str], columns: Optional[List[str]],
+                 stream: bool) -> Dict[str, Any]:
+        """analyze_excel의 통계 계산"""
+        if stream:
+            # 시트를 메모리에 올리지 않고 한 번 읽으며 통계 누적
+            sheet = sheet_name if sheet_name else 0
+            header = sheet_header(file_version(file_path), sheet)
+            if columns:
+                resolve_columns(header, columns)
+            return {
                 "success": True,
                 "file_path": str(file_path),
-                "shape": df.shape,
-                "columns": df.columns.tolist(),
-                "data_types": {k: str(v) for k, v in df.dtypes.to_dict().items()},
-                "missing_values": df.isnull().sum().to_dict(),
-                "memory_usage": df.memory_usage(deep=True).to_dict()
+                "mode": "stream",
+                **excel_stats.analyze_stream(file_path, sheet, header, columns)
             }
-            
-            # 숫자 컬럼 통계
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            if len(numeric_cols) > 0:
-                analysis["numeric_statistics"] = df[numeric_cols].describe().to_dict()
-            
-            # 텍스트 컬럼 정보
-            text_cols = df.select_dtypes(include=['object']).columns
-            if len(text_cols) > 0:
-                text_info = {}
-                for col in text_cols:
-                    text_info[col] = {
-                        "unique_values": df[col].nunique(),
-                        "most_common": df[col].value_counts().head(5).to_dict()
-                    }
-                analysis["text_statistics"] = text_info
-            
-            return analysis
+
+        df, cache_hit = self.load_frame(file_path, sheet_name, columns=columns)
+        return self._frame_statistics(file_path, df, cache_hit)
+
+    def _frame_statistics(self, file_path: Path, df: "pd.DataFrame", cache_hit: bool) -> Dict[str, Any]:
+        """DataFrame 통계 계산 (캐시에서 압축한 컬럼은 원래 타입으로 되돌려 계산)"""
+        compacted = df
+        df = excel_compact.restore_frame(df)
+        # 기본 통계 정보
+        analysis = {
+            "success": True,
+            "file_path": str(file_path),
+            "cache_hit": cache_hit,
+            "shape": df.shape,
+            "columns": df.columns.tolist(),
+            "data_types": {k: str(v) for k, v in df.dtypes.to_dict().items()},
+            "missing_values": df.isnull().sum().to_dict(),
+            # 캐시에 올라간 (압축한) 프레임의 메모리 사용량
+            "memory_usage": compacted.memory_usage(deep=True).to_dict(),
+            # 캐시에 넣기 전 타입 압축 전후의 전체 메모리 사용량
+            "memory": excel_compact.memory_report(compacted)
+        }
+        
+        # 숫자 컬럼 통계
+        numeric_cols = df.select_dtypes(include=['number']).columns
+        if len(numeric_cols) > 0:
+            analysis["numeric_statistics"] = df[numeric_cols].describe().to_dict()
+        
+        # 텍스트 컬럼 정보
+        text_cols = df.select_dtypes(include=['object', 'string', 'category']).columns
+        if len(text_cols) > 0:
+            text_info = {}
+            for col in text_cols:
+                text_info[col] = {
+                    "unique_values": df[col].nunique(),
+                    "most_common": df[col].value_counts().head(5).to_dict()
+                }
+            analysis["text_statistics"] = text_info
+        
+        return analysis
+
+    async def filter_excel_data(self, file_path: str, filters: Dict[str, Any], sheet_name: Optional[str] = None,
+                                columns: Optional[List[str]] = None, stream: bool = False,
+                                limit: Optional[int] = None, format: str = DEFAULT_FORMAT,
+                                offset: Optional[int] = None, cursor: Optional[str] = None,
+                                max_response_bytes: Optional[int] = None,
+                                max_rows: Optional[int] = None, index: bool = False) -> Dict[str, Any]:
+        """Excel 데이터 필터링"""
+        try:
+            file_path = Path(file_path)
+            check_format(format)
+            budget = self._budget(max_response_bytes, max_rows)
+            expected_version = None
+            if cursor:
+                state = decode_cursor(cursor)
+                if "sql" in state:
+                    raise ValueError("query_excel의 커서입니다. query_excel에 전달해주세요")
+                if "q" not in state:
+                    raise ValueError("read_excel의 커서입니다. read_excel에 전달해주세요")
+                file_path = Path(state["f"])
+                sheet_name, offset, limit = state.get("s"), state["o"], state.get("l")
+                columns, filters, stream, expected_version = state.get("c"), state["q"], state.get("m", False), state["v"]
+            offset = offset or 0
+            if not file_path.exists():
+                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+
+            predicate = excel_filter.compile_filter(filters)
+            sheet = sheet_name if sheet_name else 0
+            version = file_version(file_path)
+            if expected_version is not None and list(version[1:]) != list(expected_version):
+                raise ValueError("커서를 만든 뒤 파일이 변경되었습니다. 처음부터 다시 읽어주세요")
+            header = sheet_header(version, sheet)
+            if columns:
+                resolve_columns(header, columns)
+
+            if stream:
+                # 조건에 맞는 행만 보관하며 한 행씩 읽기
+                output = list(columns) if columns else list(header)
+                needed = output + [c for c in header if c in predicate.columns and c not in output]
+                records = excel_xml.iter_records(file_path, sheet, needed, header)
+                scanned = excel_filter.stream_filter(records, predicate, offset + limit if limit is not None else None)
+                rows = [tuple(row[c] for c in output) for row in scanned["rows"][offset:]]
+                data, returned = encode_rows(len(rows), lambda a, b: shape_rows(output, rows[a:b], format), *budget)
+                # limit에서 멈췄으면 전체 일치 행 수를 모르므로 지금까지 찾은 수와 has_more만 반환
+                result = {
+                    "success": True,
+                    "scanned_rows": scanned["scanned_rows"],
+                    "matched_so_far": len(scanned["rows"]),
+                    "has_more": scanned["has_more"],
+                    "filters_applied": filters,
+                    "data": data,
+                    "format": format,
+                    "columns": output,
+                    "file_path": str(file_path)
+                }
+                if not scanned["has_more"]:
+                    result["filtered_rows"] = len(scanned["rows"])
+                summary = rows_summary(output, rows) if returned < len(rows) else None
+            else:
+                # 결과 컬럼과 필터에 쓰인 컬럼만 읽기
+                needed = None
+                if columns:
+                    needed = list(columns) + [c for c in header if c in predicate.columns and c not in columns]
+                df, cache_hit = self.load_frame(file_path, sheet_name, columns=needed)
+
+                # 필터 적용 (컴파일된 조건으로 마스크를 한 번에 계산, 인덱스가 있는 조건은 인덱스로 조회)
+                indexes = self._filter_indexes(predicate, version, sheet, df, build=index)
+                mask = predicate.mask(df, indexes)
+                filtered_df = df[mask]
+                if columns:
+                    filtered_df = filtered_df[list(columns)]
+                filtered_df = filtered_df.iloc[offset:offset + limit if limit is not None else None]
+                data, returned = encode_rows(len(filtered_df),
+                                             lambda a, b: shape_frame(filtered_df.iloc[a:b], format), *budget)
+                result = {
+                    "success": True,
+                    "original_rows": len(df),
+                    "filtered_rows": int(mask.sum()),
+                    "filters_applied": filters,
+                    "data": data,
+                    "format": format,
+                    "columns": filtered_df.columns.tolist(),
+                    "indexed_columns": sorted(indexes),
+                    "cache_hit": cache_hit,
+                    "file_path": str(file_path)
+                }
+                summary = frame_summary(filtered_df) if returned < len(filtered_df) else None
+
+            # 예산을 넘어 잘린 경우 이어 받을 커서와 요약 추가
+            result["truncated"] = summary is not None
+            if summary is not None:
+                result.update(offset=offset, returned_rows=returned, summary=summary, next_cursor=encode_cursor({
+                    "f": str(file_path), "s": sheet_name, "o": offset + returned,
+                    "l": limit - returned if limit is not None else None,
+                    "c": list(columns) if columns else None, "q": filters, "m": stream, "v": list(version[1:])
+                }))
+            return result
 
         except Exception as e:
             return {
@@ -381,37 +1839,68 @@ class MCPServer:
                 "file_path": str(file_path)
             }
 
-    async def filter_excel_data(self, file_path: str, filters: Dict[str, Any], sheet_name: Optional[str] = None) -> Dict[str, Any]:
-        """Excel 데이터 필터링"""
+    def _filter_indexes(self, predicate: "excel_filter.Predicate", version: FileVersion,
+                        sheet: Union[str, int], df: "pd.DataFrame",
+                        build: bool = False) -> Dict[str, "excel_index.ColumnIndex"]:
+        """조건에 쓸 수 있는 컬럼 인덱스 (반복 조회되었거나 build면 만듦)"""
+        kinds = predicate.index_kinds()
+        if not kinds or not (build or self.config.index_after):
+            return {}
+        return self.indexes.lookup(version, sheet, df, kinds, build=build)
+
+    async def aggregate_excel(self, file_path: str, aggregations: List[Dict[str, Any]],
+                              group_by: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                              sheet_name: Optional[str] = None, sort_by: Optional[str] = None,
+                              descending: bool = False, limit: Optional[int] = None,
+                              format: str = DEFAULT_FORMAT) -> Dict[str, Any]:
+        """그룹별 집계 (캐시된 시트에서 필요한 컬럼만 벡터화된 groupby로 계산)"""
         try:
             file_path = Path(file_path)
+            check_format(format)
             if not file_path.exists():
                 raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+            group_by = list(group_by or [])
+            specs = excel_aggregate.compile_aggregations(aggregations)
+            predicate = excel_filter.compile_filter(filters) if filters else None
 
-            kwargs = {}
-            if sheet_name:
-                kwargs['sheet_name'] = sheet_name
+            # 그룹 키, 집계 컬럼, 필터에 쓰인 컬럼만 읽기
+            needed = excel_aggregate.aggregate_columns(group_by, specs)
+            sheet = sheet_name if sheet_name else 0
+            version = file_version(file_path)
+            if predicate is not None:
+                header = sheet_header(version, sheet)
+                needed += [c for c in header if c in predicate.columns and c not in needed]
+            df, cache_hit = self.load_frame(file_path, sheet_name, columns=needed or None)
 
-            df = pd.read_excel(file_path, **kwargs)
-            
-            # 필터 적용
-            filtered_df = df.copy()
-            for column, value in filters.items():
-                if column in df.columns:
-                    if isinstance(value, str):
-                        # 문자열 포함 검색
-                        filtered_df = filtered_df[filtered_df[column].astype(str).str.contains(value, na=False)]
-                    else:
-                        # 정확한 값 매칭
-                        filtered_df = filtered_df[filtered_df[column] == value]
-            
+            filtered = df
+            if predicate is not None:
+                filtered = df[predicate.mask(df, self._filter_indexes(predicate, version, sheet, df))]
+            result_df = excel_aggregate.aggregate_frame(filtered, group_by, specs)
+            if sort_by is not None:
+                if sort_by not in result_df.columns:
+                    raise ValueError(f"정렬 기준 컬럼을 찾을 수 없습니다: {sort_by} "
+                                     f"(사용 가능한 컬럼: {result_df.columns.tolist()})")
+                result_df = result_df.sort_values(sort_by, ascending=not descending, kind="stable")
+            groups = len(result_df)
+            if limit is not None:
+                result_df = result_df.head(limit)
+
+            data, returned = encode_rows(len(result_df), lambda a, b: shape_frame(result_df.iloc[a:b], format),
+                                         *self._budget(None, None))
             return {
                 "success": True,
-                "original_rows": len(df),
-                "filtered_rows": len(filtered_df),
-                "filters_applied": filters,
-                "data": filtered_df.to_dict('records'),
-                "file_path": str(file_path)
+                "file_path": str(file_path),
+                "group_by": group_by,
+                "aggregations": [spec.name for spec in specs],
+                "input_rows": len(df),
+                "aggregated_rows": len(filtered),
+                "groups": groups,
+                "returned_groups": returned,
+                "truncated": returned < groups,
+                "data": data,
+                "format": format,
+                "columns": result_df.columns.tolist(),
+                "cache_hit": cache_hit
             }
 
         except Exception as e:
@@ -421,28 +1910,267 @@ class MCPServer:
                 "file_path": str(file_path)
             }
 
+
+    async def query_excel(self, sql: Optional[str] = None, file_path: Optional[str] = None,
+                          tables: Optional[Dict[str, Any]] = None, offset: Optional[int] = None,
+                          limit: Optional[int] = None, format: str = DEFAULT_FORMAT,
+                          cursor: Optional[str] = None, max_response_bytes: Optional[int] = None,
+                          max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """시트에 SQL 질의 (참조한 시트만 SQLite에 적재해 재사용하고 결과는 페이지 단위로 반환)"""
+        try:
+            check_format(format)
+            budget = self._budget(max_response_bytes, max_rows)
+            expected_versions = None
+            if cursor:
+                state = decode_cursor(cursor)
+                if "sql" not in state:
+                    raise ValueError("query_excel의 커서가 아닙니다. 커서를 만든 도구에 전달해주세요")
+                sql, file_path, tables = state["sql"], state["f"], state.get("t")
+                offset, limit, expected_versions = state["o"], state.get("l"), state["v"]
+            if not sql:
+                raise ValueError("sql을 지정해주세요")
+            offset = offset or 0
+            limit = limit or DEFAULT_PAGE_SIZE
+
+            store = self.sql_store
+            names = excel_sql.referenced_names(sql)
+            predicates = excel_sql.predicate_columns(sql)
+            with store.lock:
+                # SQL에 나오는 이름의 시트만 적재 (파일이 바뀌지 않았으면 이전 테이블 재사용)
+                views, versions, loaded, indexed = {}, {}, {}, {}
+                for alias, (path, sheet) in self._query_sources(file_path, tables).items():
+                    if alias.lower() not in names:
+                        continue
+                    version = file_version(path)
+                    table, reused = store.table(version, sheet, lambda: self.load_frame(path, sheet)[0])
+                    views[alias], versions[alias], loaded[alias] = table, list(version[1:]), not reused
+                    created = store.ensure_indexes(table, [c for c in store.columns(table) if c.lower() in predicates])
+                    if created:
+                        indexed[alias] = created
+                if expected_versions is not None and versions != expected_versions:
+                    raise ValueError("커서를 만든 뒤 파일이 변경되었습니다. 처음부터 다시 질의해주세요")
+                columns, rows, has_more = store.query(sql, views, offset, limit)
+
+            data, returned = encode_rows(len(rows), lambda a, b: shape_rows(columns, rows[a:b], format), *budget)
+            result = {
+                "success": True,
+                "sql": sql,
+                "tables": {alias: {"loaded": loaded[alias], "indexed_columns": indexed.get(alias, [])}
+                           for alias in views},
+                "columns": columns,
+                "data": data,
+                "format": format,
+                "offset": offset,
+                "returned_rows": returned,
+                "has_more": has_more or returned < len(rows)
+            }
+            if result["has_more"]:
+                result["next_cursor"] = encode_cursor({
+                    "f": file_path, "o": offset + returned, "sql": sql, "t": tables, "l": limit, "v": versions
+                })
+            return result
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_path": file_path
+            }
+
+    async def index_directory(self, directory: str, recursive: bool = True,
+                              include_numbers: bool = False) -> Dict[str, Any]:
+        """디렉터리 워크북의 셀 텍스트 전문 검색 색인 (바뀐 파일만 다시 색인)"""
+        try:
+            result = self.search_index.index_directory(directory, recursive, include_numbers,
+                                                       progress=self.progress_reporter())
+            return {"success": True, **result}
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "directory": directory
+            }
+
+    async def search_excel(self, query: str, directory: Optional[str] = None, limit: int = 20,
+                           offset: int = 0, prefix: bool = False) -> Dict[str, Any]:
+        """index_directory로 만든 색인에서 셀 텍스트 검색 (워크북을 열지 않음)"""
+        try:
+            hits, has_more, ranked = self.search_index.search(query, directory, limit, offset, prefix)
+            return {
+                "success": True,
+                "query": query,
+                "hits": hits,
+                "returned_hits": len(hits),
+                "offset": offset,
+                "has_more": has_more,
+                "ranked": ranked
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "query": query
+            }
+
+    def _query_sources(self, file_path: Optional[str],
+                       tables: Optional[Dict[str, Any]]) -> Dict[str, Tuple[Path, Union[str, int]]]:
+        """SQL에서 쓸 수 있는 이름 → (파일, 시트)
+
+        file_path의 시트는 시트 이름으로, tables는 {이름: 파일 경로 또는 {"file_path", "sheet_name"}}으로 지정합니다.
+        """
+        sources: Dict[str, Tuple[Path, Union[str, int]]] = {}
+        if file_path:
+            path = Path(file_path)
+            if not path.exists():
+                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {path}")
+            for sheet in self._sheet_list(path, "*"):
+                sources[sheet] = (path, sheet)
+        for alias, spec in (tables or {}).items():
+            if isinstance(spec, str):
+                spec = {"file_path": spec}
+            if not isinstance(spec, dict) or not spec.get("file_path"):
+                raise ValueError(f"tables의 {alias}에는 파일 경로 또는 {{\"file_path\", \"sheet_name\"}}를 지정해주세요")
+            path = Path(spec["file_path"])
+            if not path.exists():
+                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {path}")
+            sources[alias] = (path, spec.get("sheet_name") or 0)
+        if not sources:
+            raise ValueError("file_path 또는 tables를 지정해주세요")
+        return sources
+
+class StdioDispatcher:
+    """stdin/stdout JSON-RPC 디스패처
+
+    stdin은 별도 스레드에서 계속 읽고, 도구 호출은 제한된 작업자 풀에서 실행합니다.
+    응답은 완료되는 순서대로 쓰며 클라이언트는 JSON-RPC id로 요청과 짝을 맞춥니다.
+    """
+
+    def __init__(self, server: MCPServer):
+        self.server = server
+        self.config = server.config
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_workers,
+                                           thread_name_prefix="excel-tool")
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stdin-reader")
+        self._tool_slots: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        server.notifier = self.notify
+
+    async def run(self):
+        """EOF까지 메시지를 읽어 비동기로 처리"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        try:
+            while True:
+                line = await loop.run_in_executor(self._reader, sys.stdin.readline)
+                if not line:
+                    break
+
+                try:
+                    message = json.loads(line.strip())
+                except json.JSONDecodeError:
+                    continue
+
+                task = asyncio.create_task(self.dispatch(message, len(line.encode("utf-8"))))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+            # 남은 요청 처리 후 종료
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+        finally:
+            self.executor.shutdown(wait=False)
+            self._reader.shutdown(wait=False)
+
+    async def dispatch(self, message: Union[Dict[str, Any], List[Any]], size: int = 0):
+        """메시지 하나(또는 JSON-RPC 배치) 처리 후 응답 전송
+
+        size는 요청 줄의 바이트 수이며, 단일 도구 호출이면 그 도구의 입력 바이트와 쓰기 시간을 기록합니다.
+        """
+        if isinstance(message, list):
+            # 배치 안의 요청은 동시에 처리하고 응답은 배열 하나로 전송
+            if not message:
+                self.write(self.server.error_response(None, -32600, "Invalid Request"))
+                return
+            responses = await asyncio.gather(*(self.respond(item) for item in message))
+            responses = [response for response in responses if response is not None]
+            if responses:
+                self.write(responses)
+            return
+
+        response = await self.respond(message)
+        if response is None:
+            return
+        started = time.perf_counter()
+        self.write(response)
+        if isinstance(message, dict) and message.get("method") == "tools/call":
+            tool_name = (message.get("params") or {}).get("name")
+            if tool_name in self.server.tools:
+                self.server.metrics.record_io(tool_name, size, time.perf_counter() - started)
+
+    async def respond(self, message: Any) -> Optional[Dict[str, Any]]:
+        """메시지 하나의 응답 (알림이면 None)"""
+        if not isinstance(message, dict):
+            return self.server.error_response(None, -32600, "Invalid Request")
+        try:
+            if message.get("method") == "tools/call":
+                tool_name = (message.get("params") or {}).get("name")
+                async with self._tool_slot(tool_name):
+                    loop = asyncio.get_running_loop()
+                    response = await loop.run_in_executor(self.executor, self._handle_blocking, message)
+            else:
+                response = await self.server.handle_message(message)
+
+        except Exception as e:
+            self.server.logger.error(f"Dispatch error: {e}\n{traceback.format_exc()}")
+            response = self.server.error_response(message.get("id"), -32603, str(e))
+
+        # 알림(id 없음)에는 응답하지 않음
+        return response if "id" in message else None
+
+    def _handle_blocking(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """작업자 스레드에서 도구 호출 실행 (pandas/openpyxl 호출이 이벤트 루프를 막지 않도록)"""
+        return asyncio.run(self.server.handle_message(message))
+
+    def _tool_slot(self, tool_name: str) -> asyncio.Semaphore:
+        """도구별 동시 실행 제한 세마포어"""
+        slot = self._tool_slots.get(tool_name)
+        if slot is None:
+            slot = asyncio.Semaphore(self.config.tool_limit(tool_name))
+            self._tool_slots[tool_name] = slot
+        return slot
+
+    def notify(self, message: Dict[str, Any]):
+        """알림 전송 (작업자 스레드에서도 호출 가능, 쓰기는 이벤트 루프 스레드에서)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.write, message)
+
+    def write(self, response: Union[Dict[str, Any], List[Dict[str, Any]]]):
+        """stdout으로 응답 전송 (이벤트 루프 스레드에서만 호출)
+
+        한글을 유니코드 이스케이프하지 않도록 UTF-8 바이트로 직접 씁니다.
+        """
+        line = dumps(response) + "\n"
+        stream = getattr(sys.stdout, "buffer", None)
+        if stream is None:
+            sys.stdout.write(line)
+        else:
+            stream.write(line.encode("utf-8"))
+        sys.stdout.flush()
+
+
 async def main():
     """메인 함수 - stdin/stdout으로 MCP 통신"""
     server = MCPServer()
     
-    # stdin에서 JSON-RPC 메시지 읽기
-    while True:
-        try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-                
-            message = json.loads(line.strip())
-            response = await server.handle_message(message)
-            
-            # stdout으로 응답 전송
-            print(json.dumps(response), flush=True)
-            
-        except json.JSONDecodeError:
-            continue
-        except Exception as e:
-            server.logger.error(f"Main loop error: {e}")
-            break
+    try:
+        await StdioDispatcher(server).run()
+    except Exception as e:
+        server.logger.error(f"Main loop error: {e}")
+    finally:
+        server.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
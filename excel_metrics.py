@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+도구 호출 지표
+도구 호출마다 단계별 시간(stat, parse, compute, serialize, write)을 재고,
+도구별 지연 시간 히스토그램, 캐시 적중, 입출력 바이트, 메모리 최대치를 메모리에 모읍니다.
+
+단계 시간은 현재 호출의 타이머(contextvar)에 더하므로, 같은 스레드(호출 흐름)에서
+phase()로 감싼 구간만 집계되고 작업자 스레드 안의 시간은 compute에 포함됩니다.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+PHASES = ("stat", "parse", "compute", "serialize", "write")
+# 지연 시간 히스토그램 구간 상한 (ms, 마지막 구간은 그 이상 전부)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+RECENT_CALLS = 20  # snapshot에 포함하는 최근 호출 수
+
+
+class CallTimer:
+    """도구 호출 하나의 단계별 시간"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.peak_memory = 0
+        self._depth = 0
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+_current: "contextvars.ContextVar[Optional[CallTimer]]" = contextvars.ContextVar("call_timer", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """현재 호출의 name 단계 시간 측정 (호출 중이 아니거나 다른 단계 안이면 측정하지 않음)"""
+    timer = _current.get()
+    if timer is None or timer._depth:
+        yield
+        return
+    timer._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer._depth -= 1
+        timer.add(name, time.perf_counter() - started)
+
+
+class Histogram:
+    """고정 구간 지연 시간 히스토그램"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))
+        self.counts[index] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위수가 속한 구간의 상한 (마지막 구간이면 최댓값)"""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(BUCKETS_MS[index]) if index < len(BUCKETS_MS) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 3) if self.total else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class ToolMetrics:
+    """도구 하나의 누적 지표"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.phase_ms = {name: 0.0 for name in PHASES}
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.peak_memory = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "calls": self.latency.total,
+            "errors": self.errors,
+            "latency": self.latency.to_dict(),
+            "phase_ms": {name: round(ms, 3) for name, ms in self.phase_ms.items()},
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": round(self.cache_hits / lookups, 4) if lookups else None,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+
+class Metrics:
+    """서버 전체 지표 (여러 작업자 스레드에서 기록)"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self._tools: Dict[str, ToolMetrics] = {}
+        self._recent: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def track(self) -> Iterator[CallTimer]:
+        """도구 호출 하나를 측정 (with 블록 안이 한 호출)"""
+        timer = CallTimer()
+        token = _current.set(timer)
+        memory_start = 0
+        if self.trace_memory:
+            # 동시에 실행 중인 호출이 있으면 그 할당도 함께 잡힘
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        try:
+            yield timer
+        finally:
+            _current.reset(token)
+            if self.trace_memory:
+                timer.peak_memory = max(0, tracemalloc.get_traced_memory()[1] - memory_start)
+
+    def record_call(self, tool_name: str, timer: CallTimer, success: bool,
+                    cache_hit: Optional[bool] = None, bytes_out: int = 0):
+        """호출이 끝난 뒤 지표 기록 (compute는 전체 시간에서 다른 단계를 뺀 나머지)"""
+        total = time.perf_counter() - timer.started
+        phases = dict(timer.phases)
+        phases["compute"] = max(0.0, total - sum(phases.values()))
+        with self._lock:
+            tool = self._tools.setdefault(tool_name, ToolMetrics())
+            tool.latency.add(total * 1000)
+            for name, seconds in phases.items():
+                tool.phase_ms[name] = tool.phase_ms.get(name, 0.0) + seconds * 1000
+            if not success:
+                tool.errors += 1
+            if cache_hit is True:
+                tool.cache_hits += 1
+            elif cache_hit is False:
+                tool.cache_misses += 1
+            tool.bytes_out += bytes_out
+            tool.peak_memory = max(tool.peak_memory, timer.peak_memory)
+            self._recent.append({
+                "tool": tool_name,
+                "total_ms": round(total * 1000, 3),
+                "phase_ms": {name: round(seconds * 1000, 3) for name, seconds in phases.items()},
+                "success": success,
+            })
+            del self._recent[:-RECENT_CALLS]
+
+    def record_io(self, tool_name: str, bytes_in: int = 0, write_seconds: float = 0.0):
+        """stdio 디스패처가 재는 요청 크기와 stdout 쓰기 시간"""
+        with self._lock:
+            tool = self._tools.setdefault(tool_name, ToolMetrics())
+            tool.bytes_in += bytes_in
+            tool.phase_ms["write"] += write_seconds * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재까지의 지표"""
+        with self._lock:
+            tools = {name: tool.to_dict() for name, tool in sorted(self._tools.items())}
+            recent = list(self._recent)
+        snapshot = {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "tools": tools,
+            "recent_calls": recent,
+        }
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot["traced_memory"] = {"current_bytes": current, "peak_bytes": peak}
+        return snapshot
+
+    def start_snapshots(self, path: Union[str, Path], interval: float, collect=None):
+        """interval초마다 지표를 path에 JSON으로 저장 (collect가 있으면 그 결과를 저장)"""
+        path = Path(path)
+        collect = collect or self.snapshot
+
+        def loop():
+            while True:
+                stopped = self._stop.wait(interval)
+                try:
+                    self._write_snapshot(path, collect())
+                except OSError:
+                    pass
+                if stopped:
+                    return
+
+        self._snapshot_thread = threading.Thread(target=loop, name="metrics-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def stop(self):
+        """주기적 저장을 멈추고 마지막 지표 저장"""
+        self._stop.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join(timeout=5)
+
+    def _write_snapshot(self, path: Path, snapshot: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+페이지 단위 시트 읽기
+openpyxl read_only 스트리밍으로 페이지 크기만큼만 메모리를 사용하며,
+다음 페이지 요청이 오면 열어 둔 행 반복자를 이어서 읽습니다
+"""
+
+import base64
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """커서 상태를 불투명한 토큰 문자열로 변환"""
+    raw = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """토큰 문자열을 커서 상태로 복원"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {e}")
+    if not isinstance(state, dict) or "f" not in state or "o" not in state:
+        raise ValueError("잘못된 커서입니다: 필수 항목이 없습니다")
+    return state
+
+
+def header_names(raw_header: Tuple[Any, ...]) -> List[Any]:
+    """헤더 행을 pandas.read_excel과 같은 규칙의 컬럼명으로 변환 (빈 칸, 중복 처리)
+
+    pandas와 같이 숫자/날짜 헤더는 원래 값 그대로 두고, 중복된 이름에만 ".1" 등을 붙인 문자열을 씁니다.
+    """
+    names = []
+    seen: Dict[Any, int] = {}
+    for i, value in enumerate(raw_header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _is_blank(row: Tuple[Any, ...]) -> bool:
+    return all(value is None for value in row)
+
+
+def _trim_trailing_blanks(rows: Iterator[Tuple[Any, ...]]) -> Iterator[Tuple[Any, ...]]:
+    """빈 행은 뒤에 값이 있는 행이 나올 때만 내보냄"""
+    pending = []
+    for row in rows:
+        if _is_blank(row):
+            pending.append(row)
+            continue
+        yield from pending
+        pending.clear()
+        yield row
+
+
+def _worksheet(workbook: Any, sheet: Union[str, int, None]) -> Any:
+    """시트 이름 또는 순번으로 워크시트 찾기 (None이면 첫 번째 시트)"""
+    if isinstance(sheet, str):
+        return workbook[sheet]
+    return workbook.worksheets[sheet or 0]
+
+
+@lru_cache(maxsize=256)
+def sheet_header(version: Hashable, sheet: Union[str, int, None]) -> Tuple[Any, ...]:
+    """시트의 컬럼명 (첫 행만 읽음)
+
+    version은 file_version() 결과이므로 파일이 바뀌면 새로 읽습니다.
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(version[0], read_only=True, data_only=True)
+    try:
+        worksheet = _worksheet(workbook, sheet)
+        first = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        return tuple(header_names(first))
+    finally:
+        workbook.close()
+
+
+def resolve_columns(header: Sequence[str], columns: Sequence[str]) -> List[int]:
+    """컬럼명을 헤더 위치로 변환 (없는 컬럼이면 ValueError)"""
+    positions = {name: i for i, name in enumerate(header)}
+    missing = [name for name in columns if name not in positions]
+    if missing:
+        raise ValueError(f"컬럼을 찾을 수 없습니다: {missing} (사용 가능한 컬럼: {list(header)})")
+    return [positions[name] for name in columns]
+
+
+class RowStream:
+    """열려 있는 read_only 워크북과 다음에 읽을 행 위치"""
+
+    def __init__(self, file_path: Union[str, Path], sheet: Union[str, int, None], offset: int):
+        import openpyxl
+        self.workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        worksheet = _worksheet(self.workbook, sheet)
+
+        # pandas와 같이 첫 행을 헤더로 쓰고, 중간의 빈 행은 유지하되 끝의 빈 행은 제외
+        self.header = header_names(next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ()))
+        self._rows: Iterator[Tuple[Any, ...]] = _trim_trailing_blanks(worksheet.iter_rows(min_row=2, values_only=True))
+        self.offset = offset
+        if offset:
+            next(islice(self._rows, offset, offset), None)
+        self._peeked: Optional[Tuple[Any, ...]] = None
+
+    def take(self, limit: int) -> Tuple[List[Tuple[Any, ...]], bool]:
+        """limit개 행을 읽고 (행 목록, 남은 행 존재 여부) 반환"""
+        rows = []
+        if self._peeked is not None:
+            rows.append(self._peeked)
+            self._peeked = None
+        rows.extend(islice(self._rows, limit - len(rows)))
+        self.offset += len(rows)
+        self._peeked = next(self._rows, None)
+        return rows, self._peeked is not None
+
+    def close(self):
+        self.workbook.close()
+
+
+class RowStreamPool:
+    """페이지 사이에 열어 두는 행 스트림 모음 (LRU, 최대 max_open개)
+
+    키는 (파일 버전, 시트, 다음 오프셋)이므로 다음 페이지 요청만 기존 스트림을 이어받고,
+    파일이 바뀌면 자연히 새 스트림을 엽니다.
+    """
+
+    def __init__(self, max_open: int = 8):
+        self.max_open = max_open
+        self._streams: "OrderedDict[Hashable, RowStream]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_page(self, file_path: Union[str, Path], version: Hashable, sheet: Union[str, int, None],
+                  offset: int, limit: int) -> Tuple[List[str], List[Tuple[Any, ...]], bool]:
+        """offset부터 limit개 행 읽기
+
+        반환값: (컬럼명, 행 목록, 다음 페이지 존재 여부)
+        """
+        with self._lock:
+            stream = self._streams.pop((version, sheet, offset), None)
+        if stream is None:
+            stream = RowStream(file_path, sheet, offset)
+
+        try:
+            rows, has_more = stream.take(limit)
+        except Exception:
+            stream.close()
+            raise
+
+        if has_more:
+            self._keep((version, sheet, stream.offset), stream)
+        else:
+            stream.close()
+        return stream.header, rows, has_more
+
+    def close_all(self):
+        """열린 스트림 모두 닫기"""
+        with self._lock:
+            streams = list(self._streams.values())
+            self._streams.clear()
+        for stream in streams:
+            stream.close()
+
+    def close_path(self, file_path: Union[str, Path]):
+        """파일의 열린 스트림 닫기 (파일을 교체하기 전에 호출, Windows에서는 열린 핸들이 교체를 막음)"""
+        path = str(Path(file_path).resolve())
+        with self._lock:
+            keys = [key for key in self._streams if key[0][0] == path]
+            streams = [self._streams.pop(key) for key in keys]
+        for stream in streams:
+            stream.close()
+
+    def _keep(self, key: Hashable, stream: RowStream):
+        evicted = []
+        with self._lock:
+            self._streams[key] = stream
+            while len(self._streams) > self.max_open:
+                evicted.append(self._streams.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
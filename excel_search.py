@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+워크북 전문 검색 색인
+디렉터리의 XLSX 파일에서 문자열 셀(공유 문자열, 인라인 문자열, 수식 문자열 결과)을 읽어
+시트/셀 좌표와 함께 SQLite FTS5 역색인에 저장합니다.
+
+색인은 파일별 (수정 시각, 크기)를 기록해 두고 바뀐 파일만 다시 읽으며,
+검색은 색인만 조회하므로 워크북을 열지 않습니다.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from excel_inventory import prefix_range, workbook_files
+from excel_xml import XlsxReader, column_letters
+
+INSERT_BATCH = 5000
+MAX_TEXT = 1000  # 셀 하나에서 색인하는 최대 글자 수
+# 일치하는 셀이 이보다 많으면 관련도(bm25) 정렬 없이 색인 순서로 반환 (모든 일치 항목의 점수 계산을 피함)
+MAX_RANKED = 5000
+
+
+def iter_text_cells(file_path: Union[str, Path],
+                    numbers: bool = False) -> Iterator[Tuple[str, str, str]]:
+    """워크북의 (시트, 셀 좌표, 텍스트) 순회 (numbers면 숫자 셀도 텍스트로 포함)"""
+    with XlsxReader(file_path) as reader:
+        for sheet in reader.sheet_names:
+            for row_number, values in reader.iter_rows(sheet):
+                for position, value in values.items():
+                    if isinstance(value, str):
+                        text = value.strip()
+                    elif numbers and isinstance(value, (int, float)) and not isinstance(value, bool):
+                        text = str(value)
+                    else:
+                        continue
+                    if text:
+                        yield sheet, f"{column_letters(position)}{row_number}", text[:MAX_TEXT]
+
+
+def match_query(query: str, prefix: bool = False) -> str:
+    """검색어를 FTS5 MATCH 식으로 (단어마다 따옴표로 감싸 AND 검색, prefix면 접두어 검색)"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    if not terms:
+        raise ValueError("검색어를 입력해주세요")
+    return " ".join(f'"{term}"' + ("*" if prefix else "") for term in terms)
+
+
+class SearchIndex:
+    """디렉터리 워크북의 셀 텍스트 역색인 (SQLite 파일 하나, 잠금으로 직렬화해 사용)"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self.lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER,
+                    cells INTEGER, indexed_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS cells (
+                    id INTEGER PRIMARY KEY, file_id INTEGER, sheet TEXT, cell TEXT, text TEXT
+                );
+                CREATE INDEX IF NOT EXISTS cells_file ON cells (file_id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS cells_fts USING fts5(
+                    text, content='cells', content_rowid='id', tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                );
+                CREATE TRIGGER IF NOT EXISTS cells_insert AFTER INSERT ON cells BEGIN
+                    INSERT INTO cells_fts (rowid, text) VALUES (new.id, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS cells_delete AFTER DELETE ON cells BEGIN
+                    INSERT INTO cells_fts (cells_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                END;
+            """)
+            self._db.commit()
+
+    def index_directory(self, directory: Union[str, Path], recursive: bool = True, numbers: bool = False,
+                        progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+        """디렉터리의 워크북을 색인 (새 파일과 수정 시각/크기가 바뀐 파일만 다시 읽고, 없어진 파일은 삭제)"""
+        directory = Path(directory).resolve()
+        if not directory.is_dir():
+            raise NotADirectoryError(f"디렉터리를 찾을 수 없습니다: {directory}")
+        started = time.perf_counter()
+        paths = sorted(workbook_files(directory, recursive))
+        with self.lock:
+            known = {row[0]: (row[1], row[2]) for row in self._db.execute(
+                "SELECT path, mtime_ns, size FROM files WHERE path >= ? AND path < ?", prefix_range(directory))}
+
+        indexed = unchanged = cells = 0
+        failed: List[Dict[str, str]] = []
+        for done, path in enumerate(paths, 1):
+            key = str(path)
+            previous = known.pop(key, None)
+            try:
+                stat = path.stat()
+                if previous == (stat.st_mtime_ns, stat.st_size):
+                    unchanged += 1
+                else:
+                    cells += self._index_file(key, stat.st_mtime_ns, stat.st_size, numbers)
+                    indexed += 1
+            except Exception as e:
+                # 목록을 만든 뒤 지워졌거나 읽을 수 없는 파일 (이전 색인은 유지하고 검색 결과에 stale로 표시)
+                failed.append({"file_path": key, "error": str(e)})
+            if progress is not None:
+                progress(done, len(paths), path.name)
+
+        # 남은 항목은 디렉터리에서 사라진 파일 (recursive가 아니면 하위 디렉터리 파일은 그대로 둠)
+        removed = [path for path in known if recursive or Path(path).parent == directory]
+        with self.lock:
+            for path in removed:
+                self._remove_file(path)
+            self._db.commit()
+        return {
+            "directory": str(directory),
+            "files": len(paths),
+            "indexed_files": indexed,
+            "unchanged_files": unchanged,
+            "removed_files": len(removed),
+            "indexed_cells": cells,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def search(self, query: str, directory: Optional[Union[str, Path]] = None, limit: int = 20,
+               offset: int = 0, prefix: bool = False) -> Tuple[List[Dict[str, Any]], bool, bool]:
+        """색인 검색, 반환값: (결과, 다음 결과가 더 있는지, 관련도 순인지)
+
+        일치하는 셀이 MAX_RANKED개 이하면 관련도 순, 그보다 많으면 색인 순서로 반환합니다.
+        결과의 stale은 색인한 뒤 파일이 바뀌었거나 없어졌다는 뜻입니다 (파일은 stat만 확인).
+        """
+        match = match_query(query, prefix)
+        sql = """
+            SELECT files.path, files.mtime_ns, files.size, cells.sheet, cells.cell, cells.text
+            FROM cells_fts
+            JOIN cells ON cells.id = cells_fts.rowid
+            JOIN files ON files.id = cells.file_id
+            WHERE cells_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if directory is not None:
+            sql += " AND files.path >= ? AND files.path < ?"
+            params += prefix_range(Path(directory).resolve())
+        with self.lock:
+            try:
+                matches = self._db.execute(
+                    "SELECT COUNT(*) FROM (SELECT rowid FROM cells_fts WHERE cells_fts MATCH ? LIMIT ?)",
+                    (match, MAX_RANKED + 1)).fetchone()[0]
+                ranked = matches <= MAX_RANKED
+                # FTS5는 일치 항목을 rowid(색인한 순서) 순으로 돌려주므로 정렬하지 않아도 순서가 일정함
+                sql += (" ORDER BY bm25(cells_fts)" if ranked else "") + " LIMIT ? OFFSET ?"
+                rows = self._db.execute(sql, params + [limit + 1, offset]).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"검색어를 해석할 수 없습니다: {e}")
+
+        versions: Dict[str, Optional[Tuple[int, int]]] = {}
+        hits = []
+        for path, mtime_ns, size, sheet, cell, text in rows[:limit]:
+            if path not in versions:
+                try:
+                    stat = os.stat(path)
+                    versions[path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    versions[path] = None
+            hits.append({
+                "file_path": path,
+                "sheet": sheet,
+                "cell": cell,
+                "text": text,
+                "stale": versions[path] != (mtime_ns, size)
+            })
+        return hits, len(rows) > limit, ranked
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            files, cells = self._db.execute("SELECT COUNT(*), COALESCE(SUM(cells), 0) FROM files").fetchone()
+        return {"files": files, "cells": cells, "db_path": str(self.db_path)}
+
+    def close(self):
+        with self.lock:
+            self._db.close()
+
+    def _index_file(self, path: str, mtime_ns: int, size: int, numbers: bool) -> int:
+        """파일 하나를 다시 색인 (읽기가 끝난 뒤 한 트랜잭션으로 교체하므로 실패하면 이전 색인 유지)"""
+        rows = list(iter_text_cells(path, numbers))
+        with self.lock:
+            try:
+                self._remove_file(path)
+                cursor = self._db.execute(
+                    "INSERT INTO files (path, mtime_ns, size, cells, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, len(rows), time.time()))
+                file_id = cursor.lastrowid
+                for start in range(0, len(rows), INSERT_BATCH):
+                    self._db.executemany("INSERT INTO cells (file_id, sheet, cell, text) VALUES (?, ?, ?, ?)",
+                                         [(file_id, *row) for row in rows[start:start + INSERT_BATCH]])
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+        return len(rows)
+
+    def _remove_file(self, path: str):
+        row = self._db.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM cells WHERE file_id = ?", row)
+            self._db.execute("DELETE FROM files WHERE id = ?", row)
+
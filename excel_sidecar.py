@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+컬럼 단위 사이드카 캐시
+시트를 처음 파싱할 때 캐시 폴더에 컬럼 형식(Feather 또는 컬럼별 .npy)으로 저장해 두고,
+다음부터는 XLSX XML을 다시 파싱하지 않고 메모리 매핑으로 읽습니다.
+
+사이드카는 원본 파일의 수정 시각/크기로 먼저 확인하고,
+시각만 바뀐 경우에는 내용 해시(SHA-256)가 같으면 그대로 사용합니다.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from excel_metrics import phase
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow가 없으면 .npy 컬럼 디렉터리 사용
+    pa = None
+    feather = None
+
+MANIFEST = "manifest.json"
+SIDECAR_VERSION = 1
+
+
+def file_sha256(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SidecarStore:
+    """시트별 컬럼 사이드카 저장소
+
+    폴더 구조: <root>/<원본 경로와 시트의 해시>-<mtime_ns>-<size>/
+        manifest.json, data.feather 또는 <i>.npy, <i>.dict.json
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def load(self, file_path: Union[str, Path], sheet: Union[str, int],
+             columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+        """유효한 사이드카가 있으면 DataFrame으로 읽기 (없으면 None)
+
+        columns가 주어지면 해당 컬럼 파일만 읽습니다.
+        """
+        source = Path(file_path).resolve()
+        stat = source.stat()
+        prefix = self._prefix(source, sheet)
+
+        folder = self.root / f"{prefix}-{stat.st_mtime_ns}-{stat.st_size}"
+        manifest = self._manifest(folder)
+        if manifest is None:
+            folder, manifest = self._revalidate(source, prefix, stat)
+            if manifest is None:
+                return None
+
+        names = [column["name"] for column in manifest["columns"]]
+        if columns is not None and any(name not in names for name in columns):
+            return None
+        try:
+            with phase("parse"):
+                if manifest["format"] == "feather":
+                    return self._load_feather(folder, manifest, columns)
+                return self._load_npy(folder, manifest, columns)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, file_path: Union[str, Path], sheet: Union[str, int], df: pd.DataFrame) -> Optional[Path]:
+        """시트 DataFrame을 사이드카로 저장 (같은 원본의 이전 버전은 삭제)"""
+        source = Path(file_path).resolve()
+        stat = source.stat()
+        prefix = self._prefix(source, sheet)
+        folder = self.root / f"{prefix}-{stat.st_mtime_ns}-{stat.st_size}"
+        if self._manifest(folder) is not None:
+            return folder
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            manifest = {
+                "version": SIDECAR_VERSION,
+                "source": str(source),
+                "sheet": sheet,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": file_sha256(source),
+            }
+            if feather is not None and self._save_feather(tmp, df, manifest):
+                pass
+            else:
+                self._save_npy(tmp, df, manifest)
+            with open(tmp / MANIFEST, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, default=str)
+
+            with self._lock:
+                try:
+                    os.rename(tmp, folder)
+                except OSError:
+                    # 다른 요청이 먼저 같은 버전을 저장함
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    return folder
+                self._remove_other_versions(prefix, keep=folder)
+            return folder
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _prefix(self, source: Path, sheet: Union[str, int]) -> str:
+        return hashlib.sha1(f"{source}\0{sheet}".encode("utf-8")).hexdigest()[:20]
+
+    def _manifest(self, folder: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(folder / MANIFEST, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("version") == SIDECAR_VERSION else None
+
+    def _revalidate(self, source: Path, prefix: str, stat: os.stat_result):
+        """수정 시각만 바뀐 경우 내용 해시로 이전 사이드카 재사용"""
+        candidates = [p for p in self.root.glob(f"{prefix}-*") if p.is_dir()]
+        candidates = [p for p in candidates if p.name.endswith(f"-{stat.st_size}")]
+        if not candidates:
+            return None, None
+
+        digest = file_sha256(source)
+        for folder in candidates:
+            manifest = self._manifest(folder)
+            if manifest is None or manifest.get("sha256") != digest:
+                continue
+            renamed = self.root / f"{prefix}-{stat.st_mtime_ns}-{stat.st_size}"
+            manifest["mtime_ns"] = stat.st_mtime_ns
+            try:
+                with open(folder / MANIFEST, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, ensure_ascii=False, default=str)
+                os.rename(folder, renamed)
+            except OSError:
+                return folder, manifest
+            return renamed, manifest
+        return None, None
+
+    def _remove_other_versions(self, prefix: str, keep: Path):
+        for folder in self.root.glob(f"{prefix}-*"):
+            if folder != keep:
+                shutil.rmtree(folder, ignore_errors=True)
+
+    # Feather (pyarrow)
+    def _save_feather(self, folder: Path, df: pd.DataFrame, manifest: Dict[str, Any]) -> bool:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # 타입이 섞인 컬럼은 .npy 형식으로 저장
+            return False
+        # 메모리 매핑으로 바로 읽을 수 있도록 압축하지 않음
+        feather.write_feather(table, folder / "data.feather", compression="uncompressed")
+        manifest["format"] = "feather"
+        manifest["columns"] = [{"name": name, "dtype": str(dtype)} for name, dtype in df.dtypes.items()]
+        return True
+
+    def _load_feather(self, folder: Path, manifest: Dict[str, Any],
+                      columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        table = feather.read_table(folder / "data.feather", columns=list(columns) if columns else None,
+                                   memory_map=True)
+        # 컬럼 블록을 합치지 않아야 메모리 매핑된 버퍼를 그대로 씀
+        return table.to_pandas(split_blocks=True)
+
+    # 컬럼별 .npy
+    def _save_npy(self, folder: Path, df: pd.DataFrame, manifest: Dict[str, Any]):
+        entries: List[Dict[str, Any]] = []
+        for i, (name, series) in enumerate(df.items()):
+            entry = {"name": name, "dtype": str(series.dtype)}
+            values = series.to_numpy()
+            if values.dtype.kind in "biufcmM":
+                np.save(folder / f"{i}.npy", values)
+                entry["kind"] = "array"
+            elif series.map(lambda v: isinstance(v, str) or v is None or v != v).all():
+                # 문자열 컬럼은 사전 인코딩 (코드 배열 + 고유값 목록)
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                np.save(folder / f"{i}.npy", codes.astype(np.int32 if len(uniques) < 2 ** 31 else np.int64))
+                with open(folder / f"{i}.dict.json", "w", encoding="utf-8") as f:
+                    json.dump([str(u) for u in uniques], f, ensure_ascii=False)
+                entry["kind"] = "dictionary"
+            else:
+                # 숫자와 문자열이 섞인 컬럼은 피클로 저장 (메모리 매핑 불가)
+                np.save(folder / f"{i}.npy", values.astype(object), allow_pickle=True)
+                entry["kind"] = "object"
+            entries.append(entry)
+        manifest["format"] = "npy"
+        manifest["columns"] = entries
+
+    def _load_npy(self, folder: Path, manifest: Dict[str, Any],
+                  columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        entries = {entry["name"]: (i, entry) for i, entry in enumerate(manifest["columns"])}
+        names = list(columns) if columns else [entry["name"] for entry in manifest["columns"]]
+
+        data = {}
+        for position, name in enumerate(names):
+            i, entry = entries[name]
+            if entry["kind"] == "array":
+                # 메모리 매핑 (복사 없이 읽기 전용으로 사용)
+                data[position] = pd.Series(np.load(folder / f"{i}.npy", mmap_mode="r"), copy=False)
+            elif entry["kind"] == "dictionary":
+                codes = np.load(folder / f"{i}.npy", mmap_mode="r")
+                with open(folder / f"{i}.dict.json", encoding="utf-8") as f:
+                    uniques = np.array(json.load(f) + [None], dtype=object)
+                values = uniques[codes]  # -1(결측)은 마지막 None을 가리킴
+                data[position] = pd.Series(values, dtype=entry["dtype"]) if entry["dtype"] in ("str", "string") else values
+            else:
+                data[position] = np.load(folder / f"{i}.npy", allow_pickle=True)
+
+        # 컬럼마다 Series로 넘겨 같은 dtype 컬럼이 한 블록으로 합쳐지며 복사되지 않게 함
+        df = pd.DataFrame(data, copy=False)
+        df.columns = names
+        return df
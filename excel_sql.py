@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+SQL 질의 저장소
+SQL에서 참조한 시트만 SQLite 테이블(컬럼 타입 포함)로 적재해 두고, 파일이 바뀌기 전까지 여러 호출에서 다시 사용합니다.
+WHERE/ON/USING 절에 쓰인 컬럼에는 인덱스를 자동으로 만들고, 질의는 읽기 전용으로만 실행합니다.
+
+기본은 메모리 DB이며 db_path를 주면 파일 DB에 적재해 서버를 다시 시작해도 사용합니다.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+
+FileVersion = Tuple[str, int, int]
+
+MAX_TABLES = 32  # 적재해 두는 최대 시트 수 (넘으면 가장 오래 쓰지 않은 시트부터 삭제)
+INSERT_CHUNK = 10000
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+# "따옴표", [대괄호], `백틱`으로 감싼 식별자 또는 일반 단어
+_TOKEN_RE = re.compile(r'"((?:[^"]|"")+)"|\[([^\]]+)\]|`([^`]+)`|([^\W\d]\w*)')
+# 조건 절(WHERE/ON/USING)이 끝나는 키워드
+_CLAUSE_END = frozenset({"group", "order", "limit", "window", "union", "except", "intersect", "join", "left",
+                         "right", "inner", "outer", "cross", "natural", "full", "select", "from", "having",
+                         "returning"})
+_PREDICATE_START = frozenset({"where", "on", "using"})
+# 질의 중 허용하는 SQLite 동작 (그 외 쓰기, PRAGMA, ATTACH 등은 거부)
+_READ_ACTIONS = frozenset({sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                           getattr(sqlite3, "SQLITE_RECURSIVE", 33)})
+
+
+def _tokens(sql: str) -> Iterable[Tuple[str, bool]]:
+    """SQL의 식별자/단어를 (소문자 이름, 따옴표로 감싼 식별자인지)로 (문자열 상수와 주석 제외)"""
+    text = _STRING_RE.sub(" ", _COMMENT_RE.sub(" ", sql))
+    for match in _TOKEN_RE.finditer(text):
+        quoted = match.group(1) or match.group(2) or match.group(3)
+        if quoted is not None:
+            yield quoted.replace('""', '"').lower(), True
+        else:
+            yield match.group(4).lower(), False
+
+
+def referenced_names(sql: str) -> Set[str]:
+    """SQL에 나오는 모든 식별자 (소문자, SQLite처럼 대소문자 구분 없이 비교)"""
+    return {name for name, _ in _tokens(sql)}
+
+
+def predicate_columns(sql: str) -> Set[str]:
+    """WHERE/ON/USING 절에 나오는 식별자 (인덱스 후보, 소문자)
+
+    SQL을 완전히 해석하지 않는 근사이므로 조건 절 밖의 이름이 섞일 수 있지만,
+    실제 테이블 컬럼과 일치하는 이름에만 인덱스를 만듭니다.
+    """
+    names: Set[str] = set()
+    inside = False
+    for name, quoted in _tokens(sql):
+        if not quoted and name in _PREDICATE_START:
+            inside = True
+        elif not quoted and name in _CLAUSE_END:
+            inside = False
+        elif inside:
+            names.add(name)
+    return names
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _authorize(action: int, *args: Any) -> int:
+    return sqlite3.SQLITE_OK if action in _READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+class SqlStore:
+    """시트를 적재한 SQLite DB (여러 작업자 스레드에서 잠금으로 직렬화해 사용)"""
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None, max_tables: int = MAX_TABLES):
+        self.max_tables = max_tables
+        self.persistent = db_path is not None
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path) if db_path is not None else ":memory:", check_same_thread=False)
+        # 적재와 질의를 한 번에 묶을 수 있도록 공개 (재진입 가능)
+        self.lock = threading.RLock()
+        self.loads = 0
+        self.reuses = 0
+        with self.lock:
+            if self.persistent:
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS _sheets (
+                    name TEXT PRIMARY KEY, path TEXT, sheet TEXT, mtime_ns INTEGER, size INTEGER,
+                    rows INTEGER, used REAL
+                )
+            """)
+            self._db.commit()
+
+    def table(self, version: FileVersion, sheet: Union[str, int],
+              load: Callable[[], pd.DataFrame]) -> Tuple[str, bool]:
+        """시트의 테이블 이름과 재사용 여부 (없거나 파일이 바뀌었으면 load()로 읽어 적재)"""
+        path, mtime_ns, size = version
+        name = "sheet_" + hashlib.sha1(f"{path}\0{sheet}".encode("utf-8")).hexdigest()[:16]
+        with self.lock:
+            row = self._db.execute("SELECT mtime_ns, size FROM _sheets WHERE name = ?", (name,)).fetchone()
+            if row is not None and tuple(row) == (mtime_ns, size):
+                self._db.execute("UPDATE _sheets SET used = ? WHERE name = ?", (time.time(), name))
+                self._db.commit()
+                self.reuses += 1
+                return name, True
+
+            df = _sql_columns(load())
+            self._db.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            df.to_sql(name, self._db, index=False, chunksize=INSERT_CHUNK)
+            self._db.execute("INSERT OR REPLACE INTO _sheets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (name, path, str(sheet), mtime_ns, size, len(df), time.time()))
+            self._evict(keep=name)
+            self._db.commit()
+            self.loads += 1
+            return name, False
+
+    def columns(self, table: str) -> List[str]:
+        with self.lock:
+            return [row[1] for row in self._db.execute(f"PRAGMA table_info({_quote(table)})")]
+
+    def ensure_indexes(self, table: str, columns: Iterable[str]) -> List[str]:
+        """컬럼마다 인덱스가 없으면 만들고 새로 만든 컬럼 목록 반환"""
+        created = []
+        with self.lock:
+            for column in columns:
+                index = f"{table}_ix_" + hashlib.sha1(column.encode("utf-8")).hexdigest()[:8]
+                exists = self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                          (index,)).fetchone()
+                if exists:
+                    continue
+                self._db.execute(f"CREATE INDEX {_quote(index)} ON {_quote(table)} ({_quote(column)})")
+                created.append(column)
+            self._db.commit()
+        return created
+
+    def query(self, sql: str, views: Dict[str, str], offset: int = 0,
+              limit: int = 1000) -> Tuple[List[str], List[Tuple[Any, ...]], bool]:
+        """읽기 전용 질의를 실행해 offset부터 limit행 반환 (views: SQL에서 쓰는 이름 → 테이블)
+
+        결과 전체를 만들지 않고 커서에서 필요한 행까지만 읽습니다.
+        반환값: (컬럼 이름, 행 목록, 다음 행이 더 있는지)
+        """
+        with self.lock:
+            for alias, table in views.items():
+                self._db.execute(f"CREATE TEMP VIEW {_quote(alias)} AS SELECT * FROM main.{_quote(table)}")
+            cursor = None
+            try:
+                self._db.set_authorizer(_authorize)
+                try:
+                    cursor = self._db.execute(sql)
+                except sqlite3.DatabaseError as e:
+                    if "not authorized" in str(e):
+                        raise ValueError("query_excel은 읽기 전용 SELECT 질의만 실행할 수 있습니다")
+                    raise ValueError(f"SQL 오류: {e}")
+                columns = [column[0] for column in cursor.description or []]
+                while offset > 0:
+                    skipped = cursor.fetchmany(min(offset, INSERT_CHUNK))
+                    if not skipped:
+                        break
+                    offset -= len(skipped)
+                rows = cursor.fetchmany(limit + 1)
+                return columns, rows[:limit], len(rows) > limit
+            finally:
+                if cursor is not None:
+                    cursor.close()
+                self._db.set_authorizer(None)
+                for alias in views:
+                    self._db.execute(f"DROP VIEW IF EXISTS temp.{_quote(alias)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            tables, rows = self._db.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM _sheets").fetchone()
+        return {"tables": tables, "rows": rows, "loads": self.loads, "reuses": self.reuses,
+                "persistent": self.persistent}
+
+    def close(self):
+        with self.lock:
+            self._db.close()
+
+    def _evict(self, keep: str):
+        """같은 경로/시트의 이전 테이블은 이름이 같아 교체되고, 개수가 넘으면 오래된 테이블부터 삭제"""
+        names = [row[0] for row in self._db.execute("SELECT name FROM _sheets ORDER BY used DESC")]
+        for name in names[self.max_tables:]:
+            if name == keep:
+                continue
+            self._db.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            self._db.execute("DELETE FROM _sheets WHERE name = ?", (name,))
+
+
+def _sql_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """SQLite는 컬럼 이름의 대소문자를 구분하지 않으므로 겹치는 이름에 _2, _3... 붙이기"""
+    seen: Set[str] = set()
+    names = []
+    for column in map(str, df.columns):
+        name, suffix = column, 2
+        while name.lower() in seen:
+            name = f"{column}_{suffix}"
+            suffix += 1
+        seen.add(name.lower())
+        names.append(name)
+    if names == list(df.columns):
+        return df
+    df = df.copy(deep=False)
+    df.columns = names
+    return df
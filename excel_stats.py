@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+스트리밍 통계
+시트를 한 번만 읽으면서 청크 단위로 컬럼 통계를 누적합니다.
+메모리는 시트 크기와 무관하게 컬럼 수에 비례하므로 메모리에 올릴 수 없는 시트도 분석할 수 있습니다.
+
+- 평균/분산: Welford (청크끼리는 Chan의 병합 공식)
+- 사분위수: 병합형 t-digest (값이 EXACT_LIMIT개 이하이면 정확한 값)
+- 고유값 수: HyperLogLog (고유값이 EXACT_LIMIT개 이하이면 정확한 값)
+- 최빈값: Space-Saving (추적 중인 값보다 고유값이 적으면 정확한 값)
+"""
+
+import math
+import zipfile
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from excel_xml import XlsxReader
+
+EXACT_LIMIT = 10000
+CHUNK_ROWS = 10000
+QUANTILES = (0.25, 0.5, 0.75)
+# pandas.read_excel이 기본으로 결측으로 읽는 문자열 (pandas 내부 상수와 같은 값)
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+})
+
+# 설치된 pandas가 날짜/문자열 컬럼에 붙이는 타입 이름
+DATETIME_DTYPE = str(pd.Series([datetime(2000, 1, 1)]).dtype)
+STRING_DTYPE = str(pd.Series(["a"]).dtype)
+
+
+class TDigest:
+    """병합형 t-digest (k1 척도 함수, 청크 단위 벡터 압축)"""
+
+    def __init__(self, compression: int = 1000):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self._raw: Optional[List[np.ndarray]] = []
+
+    @property
+    def exact(self) -> bool:
+        return self._raw is not None
+
+    def add(self, values: np.ndarray):
+        if not len(values):
+            return
+        self.count += len(values)
+        if self._raw is not None:
+            self._raw.append(values)
+            if self.count <= EXACT_LIMIT:
+                return
+            # 값이 많아지면 원본을 버리고 중심점으로 압축
+            values = np.concatenate(self._raw)
+            self._raw = None
+        self._merge(values, np.ones(len(values)))
+
+    def _merge(self, values: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q - 1)
+        _, cluster = np.unique(np.floor(k), return_inverse=True)
+        self.weights = np.bincount(cluster, weights)
+        self.means = np.bincount(cluster, weights * means) / self.weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self._raw is not None:
+            # pandas describe()와 같은 선형 보간
+            return float(np.quantile(np.concatenate(self._raw), q))
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.count, centers, self.means))
+
+    def rank_error(self) -> float:
+        """사분위수 위치 오차 상한 (가장 큰 중심점 무게의 절반 / 전체 개수)"""
+        if self._raw is not None or self.count == 0:
+            return 0.0
+        return float(self.weights.max() / (2 * self.count))
+
+
+class HyperLogLog:
+    """HyperLogLog 고유값 수 추정 (레지스터 2^precision개)"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # 나머지 상위 32비트에서 처음 1이 나오는 위치 (float64로 정확히 표현됨)
+        rest = ((hashes << p) >> np.uint64(32)).astype(np.float64)
+        _, exponent = np.frexp(rest)
+        rank = np.where(rest == 0, 33, 33 - exponent).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # 작은 범위는 선형 계수로 보정
+            raw = m * math.log(m / zeros)
+        return int(round(raw))
+
+
+class SpaceSaving:
+    """Space-Saving 최빈값 추적 (청크별 빈도를 병합, 최대 capacity개 값)
+
+    추정 빈도는 실제 빈도보다 작지 않고, 많아야 error만큼 큽니다.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+        # 추적하지 않는 값의 빈도 상한
+        self.floor = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.floor == 0
+
+    def add(self, counter: Counter):
+        top = counter.most_common(self.capacity + 1)
+        dropped = top[self.capacity][1] if len(top) > self.capacity else 0
+        # 이미 추적 중인 값은 청크의 정확한 빈도를 더함
+        for value in self.counts:
+            self.counts[value] += counter.get(value, 0)
+        for value, count in top[:self.capacity]:
+            if value not in self.counts:
+                self.counts[value] = count + self.floor
+                self.errors[value] = self.floor
+        # 청크에서 버린 값은 많아야 dropped번씩 나왔으므로 상한에 더함
+        self.floor += dropped
+
+        if len(self.counts) > self.capacity:
+            ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+            for value, _ in ranked[self.capacity:]:
+                del self.counts[value]
+                del self.errors[value]
+            self.floor = max(self.floor, ranked[self.capacity][1])
+
+    def top(self, k: int) -> List[Tuple[Any, int, int]]:
+        """(값, 추정 빈도, 최대 과대 추정) 목록"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(value, count, self.errors[value]) for value, count in ranked]
+
+
+def _hash_values(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return pd.util.hash_array(array, categorize=False)
+
+
+def _is_missing(value: Any) -> bool:
+    """pandas.read_excel이 결측으로 읽는 값 (빈 칸, NaN, "NA" 같은 기본 결측 문자열)"""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    return isinstance(value, str) and value in NA_STRINGS
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, (datetime, date)):
+        return "datetime"
+    if isinstance(value, (timedelta, time)):
+        return "timedelta"
+    return "str"
+
+
+class ColumnProfile:
+    """컬럼 하나의 누적 통계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.missing = 0
+        self.kinds: Counter = Counter()
+        # Welford 평균/분산
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.digest = TDigest()
+        self.distinct: Optional[set] = set()
+        self.hll = HyperLogLog()
+        self.top = SpaceSaving()
+
+    def update(self, values: List[Any]):
+        self.rows += len(values)
+        present = [v for v in values if not _is_missing(v)]
+        self.missing += len(values) - len(present)
+        if not present:
+            return
+
+        kinds = Counter(map(_kind, present))
+        self.kinds.update(kinds)
+
+        numeric = [v for v in present if type(v) in (int, float)]
+        if numeric:
+            self._update_numeric(np.asarray(numeric, dtype=np.float64))
+        if kinds.get("datetime") or kinds.get("timedelta"):
+            for kind in ("datetime", "timedelta"):
+                ordered = [v for v in present if _kind(v) == kind]
+                if ordered:
+                    self._update_range(min(ordered), max(ordered))
+
+        if self.distinct is not None:
+            self.distinct.update(present)
+            if len(self.distinct) > EXACT_LIMIT:
+                self.distinct = None
+        self.hll.add(_hash_values(present))
+        self.top.add(Counter(present))
+
+    def _update_numeric(self, values: np.ndarray):
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.n + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.n * count / total
+        self.n = total
+        self._update_range(float(values.min()), float(values.max()))
+        self.digest.add(values)
+
+    def _update_range(self, low: Any, high: Any):
+        try:
+            self.minimum = low if self.minimum is None or low < self.minimum else self.minimum
+            self.maximum = high if self.maximum is None or high > self.maximum else self.maximum
+        except TypeError:
+            # 날짜와 숫자가 섞인 컬럼은 처음 나온 종류의 범위만 유지
+            pass
+
+    @property
+    def is_numeric(self) -> bool:
+        return bool(self.kinds) and set(self.kinds) <= {"int", "float"}
+
+    @property
+    def is_text(self) -> bool:
+        return "str" in self.kinds
+
+    @property
+    def dtype(self) -> str:
+        """pandas가 추론했을 타입 이름"""
+        kinds = set(self.kinds)
+        if not kinds:
+            return "float64"
+        if kinds == {"int"}:
+            return "float64" if self.missing else "int64"
+        if kinds <= {"int", "float"}:
+            return "float64"
+        if kinds == {"bool"} and not self.missing:
+            return "bool"
+        if kinds == {"datetime"}:
+            return DATETIME_DTYPE
+        if kinds == {"str"}:
+            return STRING_DTYPE
+        return "object"
+
+    def unique_values(self) -> int:
+        return len(self.distinct) if self.distinct is not None else self.hll.estimate()
+
+    def numeric_statistics(self) -> Dict[str, Any]:
+        """describe()와 같은 항목"""
+        stats = {
+            "count": float(self.n),
+            "mean": self.mean if self.n else None,
+            "std": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else None,
+            "min": self.minimum,
+        }
+        for q in QUANTILES:
+            stats[f"{int(q * 100)}%"] = self.digest.quantile(q)
+        stats["max"] = self.maximum
+        return stats
+
+    def approximations(self) -> Dict[str, Any]:
+        """근사값인 통계와 오차 범위"""
+        result: Dict[str, Any] = {}
+        if self.is_numeric and not self.digest.exact:
+            result["quantiles"] = {"method": "t-digest", "rank_error": round(self.digest.rank_error(), 6)}
+        if self.distinct is None:
+            result["unique_values"] = {"method": "HyperLogLog", "relative_error": round(self.hll.relative_error, 6)}
+        if self.is_text and not self.top.exact:
+            result["most_common"] = {"method": "Space-Saving", "max_overcount": self.top.floor}
+        return result
+
+
+def _xml_rows(file_path: Union[str, Path], sheet: Union[str, int], positions: Sequence[int]
+              ) -> Iterator[Tuple[int, Dict[int, Any]]]:
+    with XlsxReader(file_path) as reader:
+        for row_number, values in reader.iter_rows(sheet, set(positions)):
+            if row_number != 1:
+                yield row_number, values
+
+
+def _openpyxl_rows(file_path: Union[str, Path], sheet: Union[str, int], positions: Sequence[int]
+                   ) -> Iterator[Tuple[int, Dict[int, Any]]]:
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet or 0]
+        for row_number, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
+            if any(value is not None for value in row):
+                yield row_number, {i: row[i] for i in positions if i < len(row)}
+    finally:
+        workbook.close()
+
+
+def analyze_stream(file_path: Union[str, Path], sheet: Union[str, int], header: Sequence[str],
+                   columns: Optional[Sequence[str]] = None, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """시트를 한 번 읽으며 analyze_excel과 같은 항목의 통계 계산
+
+    1행을 헤더로 보고, 중간의 빈 행은 모든 컬럼이 결측인 행으로 셉니다 (pandas와 같음).
+    """
+    names = list(columns) if columns else list(header)
+    positions = [list(header).index(name) for name in names]
+    profiles = [ColumnProfile(name) for name in names]
+
+    try:
+        rows = _xml_rows(file_path, sheet, positions)
+        first = next(rows, None)
+    except (zipfile.BadZipFile, NotImplementedError):
+        # XML을 직접 읽을 수 없는 파일은 openpyxl 스트리밍으로 읽음
+        rows = _openpyxl_rows(file_path, sheet, positions)
+        first = next(rows, None)
+    stream = chain([first], rows) if first is not None else iter(())
+
+    total_rows = 0
+    last_row = 1
+    while True:
+        chunk = list(islice(stream, chunk_rows))
+        if not chunk:
+            break
+        columns_values: List[List[Any]] = [[] for _ in positions]
+        for row_number, values in chunk:
+            # XML에서 생략된 빈 행은 결측으로 채움
+            gap = max(0, row_number - last_row - 1)
+            for column_values in columns_values:
+                column_values.extend([None] * gap)
+            for column_values, i in zip(columns_values, positions):
+                column_values.append(values.get(i))
+            last_row = row_number
+            total_rows += gap + 1
+        for profile, column_values in zip(profiles, columns_values):
+            profile.update(column_values)
+
+    analysis: Dict[str, Any] = {
+        "shape": (total_rows, len(names)),
+        "columns": names,
+        "data_types": {p.name: p.dtype for p in profiles},
+        "missing_values": {p.name: p.missing for p in profiles},
+    }
+
+    numeric = [p for p in profiles if p.is_numeric]
+    if numeric:
+        analysis["numeric_statistics"] = {p.name: p.numeric_statistics() for p in numeric}
+
+    text = [p for p in profiles if p.is_text]
+    if text:
+        analysis["text_statistics"] = {
+            p.name: {
+                "unique_values": p.unique_values(),
+                "most_common": {value: count for value, count, _ in p.top.top(5)}
+            }
+            for p in text
+        }
+    analysis["unique_values"] = {p.name: p.unique_values() for p in profiles}
+
+    approximations = {p.name: p.approximations() for p in profiles}
+    analysis["approximations"] = {name: info for name, info in approximations.items() if info}
+    analysis["approximate"] = bool(analysis["approximations"])
+    return analysis
+
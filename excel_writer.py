@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+스트리밍 Excel 쓰기
+xlsxwriter의 constant_memory 모드로 행을 받는 대로 디스크에 기록하고,
+완료하면 임시 파일을 대상 경로로 옮겨(rename) 한 번에 교체합니다.
+
+큰 데이터는 쓰기 세션(begin → append × N → commit)으로 나눠 보낼 수 있습니다.
+기존 파일에 행을 추가할 때는 바뀌는 시트 XML만 새로 씁니다 (append_workbook).
+"""
+
+import copy
+import math
+import os
+import posixpath
+import re
+import struct
+import threading
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+import openpyxl
+import xlsxwriter
+
+from excel_xml import MAIN_NS, REL_NS, XlsxReader, column_index, column_letters
+
+MAX_ROWS = 1048576  # Excel 시트의 최대 행 수 (헤더 포함)
+SESSION_TTL = 3600  # 이 시간(초) 동안 행이 추가되지 않은 세션은 취소
+
+COPY_CHUNK = 1024 * 1024
+ZIP64_GUESS = 1 << 30  # 원본 시트 XML이 이보다 크면 다시 쓸 때 zip64 사용
+ZIP64_EXTRA_ID = 0x0001
+CONTENT_TYPES = "[Content_Types].xml"
+WORKSHEET_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+WORKSHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+_DIMENSION_TAG_RE = re.compile(rb'<dimension\b[^>]*?\bref="[^"]*"')
+_REF_END_RE = re.compile(r"\$?([A-Z]+)\$?(\d+)$")
+_ROW_NUMBER_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_EMPTY_SHEET_DATA_RE = re.compile(rb"<sheetData\s*/>")
+_ILLEGAL_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# 문자열을 수식/링크로 해석하지 않고 그대로 기록
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    "strings_to_formulas": False,
+    "strings_to_urls": False,
+    "nan_inf_to_errors": True,
+}
+
+
+def _tmp_path(file_path: Path) -> Path:
+    """대상과 같은 폴더의 숨김 임시 파일 경로 (같은 파일 시스템이라 rename이 원자적)"""
+    return file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.part")
+
+
+def record_columns(records: Iterable[Dict[str, Any]]) -> List[str]:
+    """딕셔너리 목록에 나오는 키를 처음 나온 순서대로 (DataFrame 생성과 같은 순서)"""
+    columns: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def _cell(value: Any) -> Any:
+    """JSON 값을 셀 값으로 (빈 값은 None, 배열/객체는 문자열)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+def _row_values(row: Union[Dict[str, Any], Sequence[Any]], columns: List[str],
+                positions: Dict[str, int]) -> List[Any]:
+    """딕셔너리(헤더 이름으로) 또는 배열(헤더 순서로) 행을 헤더 순서의 값 목록으로"""
+    if isinstance(row, dict):
+        unknown = [key for key in row if key not in positions]
+        if unknown:
+            raise ValueError(f"헤더에 없는 컬럼입니다: {unknown}")
+        return [row.get(name) for name in columns]
+    if len(row) > len(columns):
+        raise ValueError(f"행의 값 개수({len(row)})가 컬럼 수({len(columns)})보다 많습니다")
+    return list(row)
+
+
+class StreamingWriter:
+    """시트를 행 순서대로 기록하는 쓰기 도구
+
+    첫 append에서 헤더를 정하고(columns가 없으면 첫 딕셔너리의 키, 첫 행이 배열이면
+    pandas.DataFrame처럼 0부터 매긴 번호), 행은 딕셔너리(헤더 이름으로) 또는 배열(헤더 순서로)로 받습니다.
+    """
+
+    def __init__(self, file_path: Union[str, Path], sheet_name: str = "Sheet1",
+                 columns: Optional[Sequence[str]] = None):
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        # 같은 폴더의 임시 파일에 쓰고 commit에서 rename
+        self.tmp_path = _tmp_path(self.file_path)
+        self._workbook = xlsxwriter.Workbook(str(self.tmp_path), WORKBOOK_OPTIONS)
+        self._header = self._workbook.add_format({"bold": True})
+        self.add_sheet(sheet_name, columns)
+
+    def add_sheet(self, sheet_name: str, columns: Optional[Sequence[str]] = None):
+        """새 시트를 추가하고 이후 행은 그 시트에 기록 (이전 시트에는 더 쓸 수 없음)"""
+        self.sheet_name = sheet_name
+        self.columns: Optional[List[str]] = list(columns) if columns else None
+        self.rows_written = 0
+        self._sheet = self._workbook.add_worksheet(sheet_name)
+        if self.columns:
+            self._write_header()
+
+    def _write_header(self):
+        self._sheet.write_row(0, 0, self.columns, self._header)
+
+    def append(self, rows: Sequence[Union[Dict[str, Any], Sequence[Any]]]) -> int:
+        """행 추가 (바로 디스크에 기록). 반환값: 추가한 행 수"""
+        if not rows:
+            return 0
+        if self.columns is None:
+            if isinstance(rows[0], dict):
+                self.columns = list(rows[0])
+            else:
+                width = max(len(row) for row in rows if not isinstance(row, dict))
+                self.columns = list(range(width))
+            self._write_header()
+        if self.rows_written + len(rows) + 1 > MAX_ROWS:
+            raise ValueError(f"시트의 최대 행 수({MAX_ROWS - 1})를 넘습니다")
+
+        positions = {name: i for i, name in enumerate(self.columns)}
+        for row in rows:
+            values = _row_values(row, self.columns, positions)
+            self.rows_written += 1
+            for col, value in enumerate(values):
+                value = _cell(value)
+                if value is not None:
+                    self._sheet.write(self.rows_written, col, value)
+        return len(rows)
+
+    def commit(self) -> Path:
+        """파일을 마무리하고 대상 경로로 교체"""
+        try:
+            self._workbook.close()
+            os.replace(self.tmp_path, self.file_path)
+        except Exception:
+            self._remove_tmp()
+            raise
+        return self.file_path
+
+    def abort(self):
+        """쓰던 내용을 버림 (대상 파일은 바뀌지 않음)"""
+        try:
+            self._workbook.close()
+        except Exception:
+            pass
+        self._remove_tmp()
+
+    def _remove_tmp(self):
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# 기존 워크북에 행/시트 추가 (바뀌지 않은 zip 항목은 압축된 그대로 복사)
+def _escape(text: str) -> str:
+    """XML 텍스트/속성 값으로 (XML에 쓸 수 없는 제어 문자는 제거)"""
+    return escape(_ILLEGAL_XML_RE.sub("", text), {'"': "&quot;"})
+
+
+def _cell_xml(ref: str, value: Any) -> str:
+    value = _cell(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isinf(value):
+            return f'<c r="{ref}" t="e"><v>#NUM!</v></c>'
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    # 공유 문자열 표를 바꾸지 않도록 인라인 문자열로 기록
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{_escape(str(value))}</t></is></c>'
+
+
+def _rows_xml(rows: Sequence[Union[Dict[str, Any], Sequence[Any]]], columns: List[str], first_row: int) -> bytes:
+    """행 목록을 <row> XML로 (행 번호는 first_row부터)"""
+    positions = {name: i for i, name in enumerate(columns)}
+    letters = [column_letters(i) for i in range(len(columns))]
+    parts = []
+    for number, row in enumerate(rows, start=first_row):
+        values = _row_values(row, columns, positions)
+        cells = "".join(_cell_xml(f"{letters[i]}{number}", value) for i, value in enumerate(values))
+        parts.append(f'<row r="{number}">{cells}</row>')
+    return "".join(parts).encode("utf-8")
+
+
+def _sheet_xml(rows: Sequence[Union[Dict[str, Any], Sequence[Any]]], columns: List[str]) -> bytes:
+    """헤더와 행으로 새 시트 XML 만들기"""
+    last = f"{column_letters(max(len(columns), 1) - 1)}{len(rows) + 1}"
+    header = _rows_xml([columns], columns, 1) if columns else b""
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><dimension ref="A1:{last}"/>'
+            f'<sheetData>').encode("utf-8") + header + _rows_xml(rows, columns, 2) + b"</sheetData></worksheet>"
+
+
+def _check_sheet_name(name: str, existing: Sequence[str]):
+    if not name or len(name) > 31 or any(ch in name for ch in "[]:*?/\\"):
+        raise ValueError(f"사용할 수 없는 시트 이름입니다: {name}")
+    if name.lower() in (other.lower() for other in existing):
+        raise ValueError(f"이미 있는 시트 이름입니다: {name}")
+
+
+def _without_zip64(extra: bytes) -> bytes:
+    """zip 확장 필드에서 zip64 필드(0x0001)만 제거 (나머지 필드는 유지)"""
+    kept = []
+    position = 0
+    while position + 4 <= len(extra):
+        field_id, size = struct.unpack("<HH", extra[position:position + 4])
+        if field_id != ZIP64_EXTRA_ID:
+            kept.append(extra[position:position + 4 + size])
+        position += 4 + size
+    return b"".join(kept)
+
+
+def _copy_raw(source: zipfile.ZipFile, info: zipfile.ZipInfo, target: zipfile.ZipFile):
+    """zip 항목을 압축을 풀지 않고 바이트 그대로 복사
+
+    zip64 필드는 원본의 크기/위치 기준이므로 빼고, 로컬 헤더와 중앙 디렉터리를 쓸 때
+    새 파일의 크기/위치에 맞춰 다시 붙입니다 (다른 확장 필드는 그대로 유지).
+    """
+    fp = source.fp
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+
+    copied = copy.copy(info)
+    copied.extra = _without_zip64(info.extra)
+    copied.flag_bits &= ~0x08  # 크기를 로컬 헤더에 기록하므로 데이터 디스크립터 없음
+    copied.header_offset = target.fp.tell()
+    target.fp.write(copied.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = fp.read(min(remaining, COPY_CHUNK))
+        if not chunk:
+            raise zipfile.BadZipFile(f"zip 항목이 잘려 있습니다: {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+    # ZipFile.write와 같이 항목을 등록해 닫을 때 중앙 디렉터리에 기록되도록 함
+    target.filelist.append(copied)
+    target.NameToInfo[copied.filename] = copied
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+def _append_sheet_part(source: zipfile.ZipFile, info: zipfile.ZipInfo, target: zipfile.ZipFile,
+                       dimension: str, rows: bytes, expected: Optional[int]):
+    """시트 XML을 풀면서 복사하고 dimension을 고친 뒤 </sheetData> 앞에 행 추가
+
+    expected가 주어지면 기존 마지막 행 번호가 그 값인지 확인합니다 (다르면 _StaleDimension).
+    """
+    entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    entry.compress_type = zipfile.ZIP_DEFLATED
+    with source.open(info) as stream, target.open(entry, "w", force_zip64=info.file_size > ZIP64_GUESS) as out:
+        head = stream.read(COPY_CHUNK)
+        if re.search(rb"<\w+:worksheet\b", head):
+            raise NotImplementedError("네임스페이스 접두사가 붙은 시트 XML은 지원하지 않습니다")
+        while b"<sheetData" not in head:
+            chunk = stream.read(COPY_CHUNK)
+            if not chunk:
+                raise NotImplementedError(f"시트 XML에 sheetData가 없습니다: {info.filename}")
+            head += chunk
+        start = head.index(b"<sheetData")
+        head = _DIMENSION_TAG_RE.sub(b'<dimension ref="' + dimension.encode("ascii") + b'"', head[:start], 1) + head[start:]
+        empty = _EMPTY_SHEET_DATA_RE.search(head)
+        if empty:
+            if expected:
+                raise _StaleDimension(info.filename)
+            out.write(head[:empty.start()] + b"<sheetData>" + rows + b"</sheetData>" + head[empty.end():])
+            for chunk in iter(lambda: stream.read(COPY_CHUNK), b""):
+                out.write(chunk)
+            return
+
+        pending = head
+        closing = b"</sheetData>"
+        while True:
+            index = pending.find(closing)
+            if index >= 0:
+                if expected is not None and _last_row_number(pending[:index]) != expected:
+                    raise _StaleDimension(info.filename)
+                out.write(pending[:index] + rows + pending[index:])
+                break
+            # 닫는 태그가 조각 경계에 걸릴 수 있으므로 끝부분은 남겨 둠
+            keep = len(closing) - 1
+            out.write(pending[:-keep])
+            chunk = stream.read(COPY_CHUNK)
+            if not chunk:
+                raise NotImplementedError(f"시트 XML에 </sheetData>가 없습니다: {info.filename}")
+            pending = pending[-keep:] + chunk
+        for chunk in iter(lambda: stream.read(COPY_CHUNK), b""):
+            out.write(chunk)
+
+
+def _last_row_number(xml: bytes) -> Optional[int]:
+    """XML 조각의 마지막 <row>의 r 값 (찾을 수 없으면 None)"""
+    start = xml.rfind(b"<row")
+    if start < 0:
+        return None
+    match = _ROW_NUMBER_RE.match(xml, start)
+    return int(match.group(1)) if match else None
+
+
+def append_workbook(file_path: Union[str, Path], sheets: Dict[str, Sequence[Any]]) -> Dict[str, int]:
+    """기존 워크북의 시트 끝에 행을 추가하고 없는 시트는 새로 만듦
+
+    바뀐 시트 XML과 workbook.xml/관계/콘텐츠 형식 파일만 새로 쓰고, 나머지 항목
+    (다른 시트, 스타일, 공유 문자열 등)은 압축된 바이트 그대로 복사합니다.
+    행은 기존 시트의 첫 행(헤더) 순서로 기록합니다.
+    반환값: {시트 이름: 추가한 행 수}
+    """
+    file_path = Path(file_path)
+    try:
+        _append_workbook(file_path, sheets, exact=False)
+    except _StaleDimension:
+        # 선언된 범위가 실제 마지막 행과 다름: 행 태그를 훑어 다시 계산
+        _append_workbook(file_path, sheets, exact=True)
+    return {name: len(rows) for name, rows in sheets.items()}
+
+
+class _StaleDimension(Exception):
+    """시트의 <dimension>이 실제 마지막 행과 다름"""
+
+
+def _append_workbook(file_path: Path, sheets: Dict[str, Sequence[Any]], exact: bool):
+    tmp = _tmp_path(file_path)
+    try:
+        with XlsxReader(file_path) as reader:
+            names = reader.sheet_names
+            appended: Dict[str, Tuple[str, bytes, Optional[int]]] = {}
+            created: List[Tuple[str, str, bytes]] = []
+            for name, rows in sheets.items():
+                if name in names:
+                    appended[reader.sheet_part(name)] = _appended_rows(reader, name, rows, exact)
+                else:
+                    _check_sheet_name(name, names + [sheet for sheet, _, _ in created])
+                    created.append((name, _new_part(reader, len(created)), _sheet_xml(rows, _new_columns(rows))))
+
+            rewritten = _register_sheets(reader, created) if created else {}
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as target:
+                for info in reader.zip.infolist():
+                    if info.filename in appended:
+                        _append_sheet_part(reader.zip, info, target, *appended[info.filename])
+                    elif info.filename in rewritten:
+                        entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                        target.writestr(entry, rewritten[info.filename], zipfile.ZIP_DEFLATED)
+                    else:
+                        _copy_raw(reader.zip, info, target)
+                for _, part, xml in created:
+                    target.writestr(part, xml, zipfile.ZIP_DEFLATED)
+        os.replace(tmp, file_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _new_columns(rows: Sequence[Any]) -> List[str]:
+    if any(not isinstance(row, dict) for row in rows):
+        raise ValueError("헤더가 없는 시트에는 딕셔너리 행만 추가할 수 있습니다")
+    return record_columns(rows)
+
+
+def _appended_rows(reader: XlsxReader, sheet: str, rows: Sequence[Any],
+                   exact: bool) -> Tuple[str, bytes, Optional[int]]:
+    """기존 시트에 붙일 (새 dimension, <row> XML, 확인할 마지막 행 번호)
+
+    exact가 아니면 시트 XML을 미리 훑지 않고 선언된 dimension을 믿고,
+    복사하면서 실제 마지막 행 번호가 같은지 확인합니다 (확인할 필요가 없으면 None).
+    """
+    first = next(reader.iter_rows(sheet), None)
+    declared = None if exact else reader.sheet_dimension(sheet)
+    match = _REF_END_RE.search(declared) if declared else None
+    if match:
+        max_row, max_column, expected = int(match.group(2)), column_index(match.group(1)) + 1, int(match.group(2))
+    else:
+        scan = reader.scan_rows(sheet)
+        max_row, max_column, expected = scan["max_row"], scan["max_column"], None
+
+    if first is None:
+        # 빈 시트: 헤더부터 기록
+        columns = _new_columns(rows)
+        xml = _rows_xml([columns], columns, max_row + 1) + _rows_xml(rows, columns, max_row + 2)
+        last_row = max_row + len(rows) + 1
+    else:
+        values = first[1]
+        columns = [str(values[i]) if values.get(i) is not None else "" for i in range(max(values) + 1)]
+        xml = _rows_xml(rows, columns, max_row + 1)
+        last_row = max_row + len(rows)
+    last_column = max(max_column, len(columns), 1)
+    return f"A1:{column_letters(last_column - 1)}{last_row}", xml, expected
+
+
+def _new_part(reader: XlsxReader, offset: int) -> str:
+    """새 시트의 zip 안 경로 (기존 항목과 겹치지 않게)"""
+    folder = posixpath.join(posixpath.dirname(reader.workbook_part), "worksheets")
+    existing = set(reader.zip.namelist())
+    number = len(reader.sheets) + offset + 1
+    while posixpath.join(folder, f"sheet{number}.xml") in existing:
+        number += 1
+    return posixpath.join(folder, f"sheet{number}.xml")
+
+
+def _register_sheets(reader: XlsxReader, created: List[Tuple[str, str, bytes]]) -> Dict[str, bytes]:
+    """새 시트를 workbook.xml, 워크북 관계 파일, [Content_Types].xml에 추가한 내용"""
+    workbook_part = reader.workbook_part
+    folder, name = posixpath.split(workbook_part)
+    rels_part = posixpath.join(folder, "_rels", name + ".rels")
+    workbook = reader.zip.read(workbook_part)
+    rels = reader.zip.read(rels_part)
+    types = reader.zip.read(CONTENT_TYPES)
+    if re.search(rb"<\w+:sheets\b", workbook) or b"</sheets>" not in workbook:
+        raise NotImplementedError("네임스페이스 접두사가 붙은 workbook.xml은 지원하지 않습니다")
+
+    prefix = re.search(rb'xmlns:(\w+)="' + REL_NS.encode("ascii") + rb'"', workbook)
+    rel_attr = prefix.group(1).decode("ascii") + ":id" if prefix else f'xmlns:r="{REL_NS}" r:id'
+    sheet_id = max((int(n) for n in re.findall(rb'\bsheetId="(\d+)"', workbook)), default=0)
+    rel_id = max((int(n) for n in re.findall(rb'\bId="rId(\d+)"', rels)), default=0)
+
+    sheet_xml, rel_xml, type_xml = [], [], []
+    for sheet, part, _ in created:
+        sheet_id += 1
+        rel_id += 1
+        sheet_xml.append(f'<sheet name="{_escape(sheet)}" sheetId="{sheet_id}" {rel_attr}="rId{rel_id}"/>')
+        rel_xml.append(f'<Relationship Id="rId{rel_id}" Type="{WORKSHEET_REL}" '
+                       f'Target="{posixpath.relpath(part, folder)}"/>')
+        type_xml.append(f'<Override PartName="/{part}" ContentType="{WORKSHEET_TYPE}"/>')
+
+    def insert(xml: bytes, closing: bytes, added: List[str]) -> bytes:
+        index = xml.rindex(closing)
+        return xml[:index] + "".join(added).encode("utf-8") + xml[index:]
+
+    return {
+        workbook_part: insert(workbook, b"</sheets>", sheet_xml),
+        rels_part: insert(rels, b"</Relationships>", rel_xml),
+        CONTENT_TYPES: insert(types, b"</Types>", type_xml),
+    }
+
+
+def append_openpyxl(file_path: Union[str, Path], sheets: Dict[str, Sequence[Any]]) -> Dict[str, int]:
+    """append_workbook을 쓸 수 없는 파일용: openpyxl로 전체를 읽고 다시 저장"""
+    file_path = Path(file_path)
+    workbook = openpyxl.load_workbook(file_path)
+    for name, rows in sheets.items():
+        if name in workbook.sheetnames:
+            worksheet = workbook[name]
+            header = [cell.value for cell in worksheet[1]]
+        else:
+            _check_sheet_name(name, workbook.sheetnames)
+            worksheet = workbook.create_sheet(name)
+            header = []
+        if not any(value is not None for value in header):
+            header = _new_columns(rows)
+            worksheet.append(header)
+        columns = ["" if value is None else str(value) for value in header]
+        positions = {column: i for i, column in enumerate(columns)}
+        for row in rows:
+            worksheet.append([_cell(value) for value in _row_values(row, columns, positions)])
+
+    tmp = _tmp_path(file_path)
+    try:
+        workbook.save(tmp)
+        os.replace(tmp, file_path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+    return {name: len(rows) for name, rows in sheets.items()}
+
+
+class WriteSession:
+    """쓰기 세션 하나 (요청이 동시에 와도 행 순서가 섞이지 않도록 잠금 사용)"""
+
+    def __init__(self, session_id: str, writer: StreamingWriter):
+        self.session_id = session_id
+        self.writer = writer
+        self.lock = threading.Lock()
+        self.touched = time.monotonic()
+
+
+class WriteSessions:
+    """진행 중인 쓰기 세션 목록"""
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._sessions: Dict[str, WriteSession] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, file_path: Union[str, Path], sheet_name: str = "Sheet1",
+              columns: Optional[Sequence[str]] = None) -> WriteSession:
+        """새 세션 시작 (오래된 세션은 먼저 정리)"""
+        self.expire()
+        session = WriteSession(uuid.uuid4().hex, StreamingWriter(file_path, sheet_name, columns))
+        with self._lock:
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> WriteSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"쓰기 세션을 찾을 수 없습니다: {session_id}")
+        session.touched = time.monotonic()
+        return session
+
+    def pop(self, session_id: str) -> WriteSession:
+        """세션을 목록에서 꺼냄 (commit/abort용)"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            raise ValueError(f"쓰기 세션을 찾을 수 없습니다: {session_id}")
+        return session
+
+    def expire(self):
+        """ttl 동안 사용하지 않은 세션 취소"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [s for s in self._sessions.values() if now - s.touched > self.ttl]
+            for session in expired:
+                del self._sessions[session.session_id]
+        for session in expired:
+            with session.lock:
+                session.writer.abort()
+
+    def close(self):
+        """모든 세션 취소 (서버 종료 시)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.writer.abort()
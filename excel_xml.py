@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+XLSX 저수준 리더
+openpyxl을 거치지 않고 zip 안의 워크북/시트 XML을 직접 읽습니다.
+필요한 컬럼의 셀만 값으로 변환하므로 넓은 시트에서 일부 컬럼만 읽을 때 빠릅니다
+"""
+
+import html
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel
+
+from excel_metrics import phase
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+CHUNK_SIZE = 1024 * 1024
+
+_ROW_RE = re.compile(rb"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_CELL_RE = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_ATTR_RE = re.compile(rb'([\w:]+)="([^"]*)"')
+_REF_RE = re.compile(rb'\br="([A-Z]+)(\d+)"')
+_ROW_NUM_RE = re.compile(rb'\br="(\d+)"')
+_VALUE_RE = re.compile(rb"<v>(.*?)</v>", re.S)
+_TEXT_RE = re.compile(rb"<t(?:\s[^>]*)?>(.*?)</t>", re.S)
+_PHONETIC_RE = re.compile(rb"<rPh\b.*?</rPh>", re.S)
+_SHARED_RE = re.compile(rb"<si>(.*?)</si>|<si/>", re.S)
+_DIMENSION_RE = re.compile(rb'<dimension\b[^>]*?\bref="([^"]*)"')
+_ROW_OPEN_RE = re.compile(rb"<row\b([^>]*)>")
+_SPANS_RE = re.compile(rb'\bspans="\d+:(\d+)"')
+_CELL_COLUMN_RE = re.compile(rb'<c r="([A-Z]+)')
+_CELL_SPLIT_RE = re.compile(rb"([A-Z]+)(\d+)")
+
+HEAD_SIZE = 64 * 1024
+
+_SKIP = object()
+
+
+def column_index(letters: Union[str, bytes]) -> int:
+    """컬럼 문자(A, B, ..., AA)를 0부터 시작하는 위치로 변환"""
+    if isinstance(letters, bytes):
+        letters = letters.decode("ascii")
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+@lru_cache(maxsize=64)
+def _projection_re(columns: FrozenSet[int]) -> "re.Pattern[bytes]":
+    """선택한 컬럼 위치의 셀만 찾는 정규식"""
+    letters = b"|".join(column_letters(i).encode("ascii") for i in sorted(columns))
+    return re.compile(rb'<c r="(' + letters + rb')\d+"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+
+
+def column_letters(index: int) -> str:
+    """0부터 시작하는 컬럼 위치를 컬럼 문자로 변환"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _text(raw: bytes) -> str:
+    text = raw.decode("utf-8")
+    return html.unescape(text) if "&" in text else text
+
+
+def _rich_text(raw: bytes) -> str:
+    """<si>/<is> 안의 텍스트 (서식 run은 이어 붙이고 윗주는 제외)"""
+    raw = _PHONETIC_RE.sub(b"", raw)
+    return "".join(_text(part) for part in _TEXT_RE.findall(raw))
+
+
+class XlsxReader:
+    """XLSX zip을 한 번 열어 시트 목록, 공유 문자열, 날짜 서식을 필요할 때 읽는 리더"""
+
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        with phase("parse"):
+            self.zip = zipfile.ZipFile(self.file_path)
+            self.sheets: List[Tuple[str, str]] = []
+            self.defined_names: List[Dict[str, Any]] = []
+            self.epoch = CALENDAR_WINDOWS_1900
+            self._shared_strings: Optional[List[str]] = None
+            self._date_styles: Optional[Dict[int, str]] = None
+            self._read_workbook()
+
+    def __enter__(self) -> "XlsxReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [name for name, _ in self.sheets]
+
+    @property
+    def workbook_part(self) -> str:
+        """zip 안의 workbook.xml 경로"""
+        return self._main_part()
+
+    def sheet_part(self, sheet: Union[str, int, None]) -> str:
+        """시트 이름 또는 순번에 해당하는 zip 안의 XML 경로"""
+        if isinstance(sheet, str):
+            for name, part in self.sheets:
+                if name == sheet:
+                    return part
+            raise KeyError(f"Worksheet named '{sheet}' not found")
+        return self.sheets[sheet or 0][1]
+
+    @property
+    def shared_strings(self) -> List[str]:
+        """공유 문자열 표 (처음 필요할 때 읽음)"""
+        if self._shared_strings is None:
+            self._shared_strings = self._read_shared_strings()
+        return self._shared_strings
+
+    def iter_rows(self, sheet: Union[str, int, None] = None,
+                  columns: Optional[Set[int]] = None) -> Iterator[Tuple[int, Dict[int, Any]]]:
+        """시트의 행을 (행 번호, {컬럼 위치: 값}) 형태로 순회
+
+        columns가 주어지면 그 위치의 셀만 값으로 변환하고 나머지 셀은 건너뜁니다.
+        값이 하나도 없는 행은 생략합니다 (선택한 컬럼이 비어 있어도 다른 컬럼에 값이 있으면 포함).
+        """
+        part = self.sheet_part(sheet)
+        with self.zip.open(part) as stream:
+            buffer = b""
+            checked = False
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                buffer += chunk
+                if not checked and (b"<sheetData" in buffer or not chunk):
+                    if re.search(rb"<\w+:sheetData\b", buffer):
+                        raise NotImplementedError("네임스페이스 접두사가 붙은 시트 XML은 지원하지 않습니다")
+                    checked = True
+
+                end = buffer.rfind(b"</row>") if chunk else len(buffer)
+                if end < 0:
+                    continue
+                if chunk:
+                    end += len(b"</row>")
+
+                for match in _ROW_RE.finditer(buffer, 0, end):
+                    body = match.group(2)
+                    if not body or (b"<v" not in body and b"<is" not in body):
+                        continue
+                    row_match = _ROW_NUM_RE.search(match.group(1))
+                    row_number = int(row_match.group(1)) if row_match else 0
+                    yield row_number, self._row_values(body, columns)
+
+                buffer = buffer[end:]
+                if not chunk:
+                    break
+
+    def part_size(self, part: str) -> Tuple[int, int]:
+        """zip 중앙 디렉터리에 기록된 (압축 해제 크기, 압축 크기)"""
+        info = self.zip.getinfo(part)
+        return info.file_size, info.compress_size
+
+    def sheet_dimension(self, sheet: Union[str, int, None] = None) -> Optional[str]:
+        """시트 XML 앞부분의 <dimension ref="A1:D6"> 값 (없으면 None)
+
+        dimension은 sheetData 앞에 오므로 시트 전체를 풀지 않고 앞부분만 읽습니다.
+        """
+        with self.zip.open(self.sheet_part(sheet)) as stream:
+            head = b""
+            while b"<sheetData" not in head and len(head) < HEAD_SIZE:
+                chunk = stream.read(4096)
+                if not chunk:
+                    break
+                head += chunk
+        if re.search(rb"<\w+:worksheet\b", head):
+            raise NotImplementedError("네임스페이스 접두사가 붙은 시트 XML은 지원하지 않습니다")
+        match = _DIMENSION_RE.search(head)
+        return match.group(1).decode("ascii") if match else None
+
+    def scan_rows(self, sheet: Union[str, int, None] = None) -> Dict[str, int]:
+        """셀 값을 변환하지 않고 <row 태그만 훑어 행 수와 실제 범위 계산
+
+        반환값: {"rows": <row> 요소 수, "max_row": 마지막 행 번호, "max_column": 마지막 컬럼 번호}
+        """
+        rows = max_row = max_column = 0
+        with self.zip.open(self.sheet_part(sheet)) as stream:
+            buffer = b""
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                buffer += chunk
+                # 마지막 <row 태그는 잘려 있을 수 있으므로 다음 조각과 이어서 처리
+                end = buffer.rfind(b"<row") if chunk else len(buffer)
+                if end <= 0:
+                    if not chunk:
+                        break
+                    continue
+
+                part = buffer[:end]
+                if not rows and re.search(rb"<\w+:sheetData\b", part):
+                    raise NotImplementedError("네임스페이스 접두사가 붙은 시트 XML은 지원하지 않습니다")
+                for match in _ROW_OPEN_RE.finditer(part):
+                    rows += 1
+                    number = _ROW_NUM_RE.search(match.group(1))
+                    max_row = int(number.group(1)) if number else max_row + 1
+                    spans = _SPANS_RE.search(match.group(1))
+                    if spans:
+                        max_column = max(max_column, int(spans.group(1)))
+                if b"spans=" not in part:
+                    # spans 속성이 없으면 셀 참조에서 마지막 컬럼을 찾음
+                    letters = set(_CELL_COLUMN_RE.findall(part))
+                    if letters:
+                        max_column = max(max_column, max(column_index(c) + 1 for c in letters))
+
+                buffer = buffer[end:]
+                if not chunk:
+                    break
+        return {"rows": rows, "max_row": max_row, "max_column": max_column}
+
+    def _row_values(self, body: bytes, columns: Optional[Set[int]]) -> Dict[int, Any]:
+        values: Dict[int, Any] = {}
+        if columns is not None and body.startswith(b'<c r="'):
+            # 모든 셀에 r 속성이 있으면 정규식이 선택한 컬럼의 셀만 찾도록 함
+            for cell in _projection_re(frozenset(columns)).finditer(body):
+                value = self._cell_value(cell.group(2), cell.group(3))
+                if value is not _SKIP:
+                    values[column_index(cell.group(1))] = value
+            return values
+
+        position = -1
+        for cell in _CELL_RE.finditer(body):
+            attrs = cell.group(1)
+            ref = _REF_RE.search(attrs)
+            position = column_index(ref.group(1)) if ref else position + 1
+            if columns is not None and position not in columns:
+                continue
+            value = self._cell_value(attrs, cell.group(2))
+            if value is not _SKIP:
+                values[position] = value
+        return values
+
+    def _cell_value(self, attrs: bytes, inner: Optional[bytes]) -> Any:
+        """셀 XML을 파이썬 값으로 변환 (openpyxl/pandas와 같은 규칙)"""
+        if not inner:
+            return _SKIP
+        attributes = dict(_ATTR_RE.findall(attrs))
+        cell_type = attributes.get(b"t", b"n")
+
+        if cell_type == b"inlineStr":
+            start = inner.find(b"<is>")
+            return _rich_text(inner[start:]) if start >= 0 else _SKIP
+
+        value_match = _VALUE_RE.search(inner)
+        if value_match is None:
+            return _SKIP
+        raw = value_match.group(1)
+
+        if cell_type == b"s":
+            return self.shared_strings[int(raw)]
+        if cell_type == b"str":
+            return _text(raw)
+        if cell_type == b"b":
+            return raw.strip() in (b"1", b"true")
+        if cell_type == b"e":
+            return float("nan")
+        if cell_type == b"d":
+            return datetime.fromisoformat(_text(raw).rstrip("Z"))
+
+        if b"." in raw or b"E" in raw or b"e" in raw:
+            number = float(raw)
+            # pandas는 정수 값인 실수를 정수로 변환
+            number = int(number) if number.is_integer() else number
+        else:
+            number = int(raw)
+        style = attributes.get(b"s")
+        if style is not None:
+            kind = self._date_style_kinds().get(int(style))
+            if kind is not None:
+                return from_excel(number, self.epoch, timedelta=(kind == "timedelta"))
+        return number
+
+    def _date_style_kinds(self) -> Dict[int, str]:
+        """날짜/시간 표시 형식을 쓰는 cellXfs 위치 ("datetime" 또는 "timedelta")"""
+        if self._date_styles is None:
+            self._date_styles = {}
+            try:
+                root = ET.fromstring(self.zip.read(self._workbook_part("styles")))
+            except KeyError:
+                return self._date_styles
+
+            formats = dict(BUILTIN_FORMATS)
+            for fmt in root.iter(f"{{{MAIN_NS}}}numFmt"):
+                formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode", "")
+
+            cell_xfs = root.find(f"{{{MAIN_NS}}}cellXfs")
+            for i, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+                code = formats.get(int(xf.get("numFmtId", 0)))
+                if code and is_date_format(code):
+                    self._date_styles[i] = "timedelta" if is_timedelta_format(code) else "datetime"
+        return self._date_styles
+
+    def _read_workbook(self):
+        """workbook.xml과 관계 파일에서 시트 목록, 정의된 이름, 날짜 기준 읽기"""
+        workbook_part = self._main_part()
+        root = ET.fromstring(self.zip.read(workbook_part))
+        targets = self._relationships(workbook_part)
+
+        pr = root.find(f"{{{MAIN_NS}}}workbookPr")
+        if pr is not None and pr.get("date1904") in ("1", "true"):
+            self.epoch = CALENDAR_MAC_1904
+
+        for sheet in root.iter(f"{{{MAIN_NS}}}sheet"):
+            rel_id = sheet.get(f"{{{REL_NS}}}id")
+            if rel_id in targets:
+                self.sheets.append((sheet.get("name"), targets[rel_id][0]))
+
+        for defined in root.iter(f"{{{MAIN_NS}}}definedName"):
+            entry = {"name": defined.get("name"), "value": defined.text or ""}
+            if defined.get("localSheetId") is not None:
+                entry["local_sheet"] = int(defined.get("localSheetId"))
+            self.defined_names.append(entry)
+
+        self._workbook_targets = targets
+
+    def _main_part(self) -> str:
+        for target, rel_type in self._relationships("").values():
+            if rel_type.endswith("/officeDocument"):
+                return target
+        return "xl/workbook.xml"
+
+    def _workbook_part(self, kind: str) -> str:
+        for target, rel_type in self._workbook_targets.values():
+            if rel_type.endswith("/" + kind):
+                return target
+        raise KeyError(kind)
+
+    def _relationships(self, part: str) -> Dict[str, Tuple[str, str]]:
+        """part의 관계 파일 읽기 ({rId: (zip 안 경로, 관계 유형)})"""
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", name + ".rels")
+        try:
+            root = ET.fromstring(self.zip.read(rels_path))
+        except KeyError:
+            return {}
+
+        relationships = {}
+        for rel in root.iter(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                path = target.lstrip("/")
+            else:
+                path = posixpath.normpath(posixpath.join(folder, target))
+            relationships[rel.get("Id")] = (path, rel.get("Type", ""))
+        return relationships
+
+    def _read_shared_strings(self) -> List[str]:
+        try:
+            part = self._workbook_part("sharedStrings")
+        except KeyError:
+            return []
+        data = self.zip.read(part)
+        return [_rich_text(body) if body else "" for body in _SHARED_RE.findall(data)]
+
+
+def _dimension_bounds(ref: str) -> Tuple[int, int]:
+    """"A1:D6" 형식 범위의 (마지막 행, 마지막 컬럼 번호)"""
+    last = ref.split(":")[-1].replace("$", "")
+    match = _CELL_SPLIT_RE.fullmatch(last.encode("ascii"))
+    if match is None:
+        raise ValueError(f"잘못된 범위입니다: {ref}")
+    return int(match.group(2)), column_index(match.group(1)) + 1
+
+
+def workbook_info(file_path: Union[str, Path], exact_rows: bool = False) -> Dict[str, Any]:
+    """zip 중앙 디렉터리와 workbook.xml, 각 시트 XML 앞부분만 읽어 워크북 메타데이터 반환
+
+    시트에 dimension이 없거나 exact_rows=True이면 <row 태그를 훑어 실제 범위를 계산합니다.
+    """
+    with XlsxReader(file_path) as reader:
+        sheets = []
+        for name, part in reader.sheets:
+            size, compressed = reader.part_size(part)
+            declared = reader.sheet_dimension(name)
+            info: Dict[str, Any] = {"name": name, "declared_dimension": declared}
+
+            if exact_rows or declared is None:
+                scanned = reader.scan_rows(name)
+                info.update(max_row=scanned["max_row"], max_column=scanned["max_column"],
+                            row_count=scanned["rows"], exact=True)
+            else:
+                max_row, max_column = _dimension_bounds(declared)
+                info.update(max_row=max_row, max_column=max_column, exact=False)
+            info["dimensions"] = f"{info['max_column']}x{info['max_row']}"
+            info.update(part=part, part_size=size, compressed_size=compressed)
+            sheets.append(info)
+
+        return {
+            "sheets": sheets,
+            "defined_names": reader.defined_names,
+            "date1904": reader.epoch == CALENDAR_MAC_1904,
+        }
+
+
+def read_columns(file_path: Union[str, Path], sheet: Union[str, int, None], positions: Sequence[int],
+                 nrows: Optional[int] = None) -> List[List[Any]]:
+    """지정한 위치의 컬럼만 행 목록으로 읽기
+
+    pandas의 openpyxl 리더(get_sheet_data)와 같은 형태를 반환합니다:
+    1행부터 시작하고 중간의 빈 행은 유지하며 빈 셀은 "" 입니다.
+    nrows가 주어지면 헤더 행 + nrows개 행까지만 읽습니다.
+    """
+    wanted = set(positions)
+    blank = [""] * len(positions)
+    data: List[List[Any]] = []
+    with XlsxReader(file_path) as reader:
+        for row_number, values in reader.iter_rows(sheet, wanted):
+            # 값이 없는 행은 XML에서 생략되므로 빈 행으로 채움
+            while row_number and len(data) < row_number - 1:
+                data.append(blank)
+            data.append([values.get(i, "") for i in positions])
+            if nrows is not None and len(data) > nrows:
+                break
+    return data[:nrows + 1] if nrows is not None else data
+
+
+def iter_records(file_path: Union[str, Path], sheet: Union[str, int, None],
+                 names: Sequence[str], header: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    """1행을 헤더로 보고 지정한 컬럼만 {컬럼명: 값} 형태로 한 행씩 순회 (빈 행 제외)"""
+    positions = {name: i for i, name in enumerate(header)}
+    wanted = [(name, positions[name]) for name in names]
+    try:
+        reader = XlsxReader(file_path)
+    except zipfile.BadZipFile:
+        reader = None
+
+    if reader is not None:
+        with reader:
+            try:
+                for row_number, values in reader.iter_rows(sheet, {i for _, i in wanted}):
+                    if row_number != 1:
+                        yield {name: values.get(i) for name, i in wanted}
+                return
+            except NotImplementedError:
+                pass
+
+    # XML을 직접 읽을 수 없는 파일은 openpyxl 스트리밍으로 읽음
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet or 0]
+        for row in worksheet.iter_rows(min_row=2, values_only=True):
+            if any(value is not None for value in row):
+                yield {name: (row[i] if i < len(row) else None) for name, i in wanted}
+    finally:
+        workbook.close()
@@ -6,7 +6,9 @@ Excel MCP Server 테스트 스크립트
 import json
 import asyncio
 import subprocess
+import sys
 import tempfile
+import time
 import pandas as pd
 from pathlib import Path
 import os
@@ -177,6 +179,1113 @@ def test_direct_functions():
     
     return asyncio.run(run_direct_test())
 
+def test_frame_cache():
+    """파싱 결과 캐시 적중/무효화 테스트"""
+    from excel_mcp_server import MCPServer
+    
+    async def run_cache_test(tmp_dir):
+        server = MCPServer()
+        file_path = Path(tmp_dir) / 'cache.xlsx'
+        pd.DataFrame({'a': [1, 2, 3]}).to_excel(file_path, index=False)
+        
+        first = await server.read_excel(str(file_path))
+        second = await server.analyze_excel(str(file_path))
+        third = await server.filter_excel_data(str(file_path), {'a': 2})
+        assert not first["cache_hit"]
+        assert second["cache_hit"] and third["cache_hit"]
+        assert server.frame_cache.stats()["hits"] == 2
+        
+        # 디스크의 파일이 바뀌면 다시 파싱
+        pd.DataFrame({'a': [1, 2, 3, 4]}).to_excel(file_path, index=False)
+        os.utime(file_path, ns=(0, 10 ** 9))
+        changed = await server.read_excel(str(file_path))
+        assert not changed["cache_hit"]
+        assert changed["shape"] == (4, 1)
+        assert server.frame_cache.stats()["entries"] == 1
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_cache_test(tmp_dir))
+
+def test_stdio_dispatcher():
+    """stdio 디스패처의 id 짝 맞추기, 도구별 동시 실행 제한, 배치, 알림 테스트"""
+    import threading
+    import time
+    from excel_mcp_server import MCPServer, StdioDispatcher
+    from excel_config import ServerConfig
+    
+    server = MCPServer(ServerConfig(max_workers=4, tool_concurrency={'analyze_excel': 1}, prewarm=False))
+    dispatcher = StdioDispatcher(server)
+    written = []
+    dispatcher.write = written.append
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+    calls = []
+    release = threading.Event()
+    
+    async def fake_tool(tag, wait=False):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+            calls.append(tag)
+        try:
+            if wait:
+                release.wait(5)
+            else:
+                time.sleep(0.05)
+        finally:
+            with lock:
+                running['now'] -= 1
+        return {'success': True, 'tag': tag}
+    
+    server.read_excel = fake_tool
+    server.analyze_excel = fake_tool
+    
+    def call(msg_id, tool_name, **arguments):
+        message = {'jsonrpc': '2.0', 'method': 'tools/call', 'params': {'name': tool_name, 'arguments': arguments}}
+        if msg_id is not None:
+            message['id'] = msg_id
+        return message
+    
+    def tag(response):
+        return json.loads(response['result']['content'][0]['text'])['tag']
+    
+    async def run_dispatch_test():
+        # 먼저 받은 요청이 늦게 끝나면 응답 순서가 바뀌고, 클라이언트는 id로 짝을 맞춤
+        slow = asyncio.create_task(dispatcher.dispatch(call(1, 'read_excel', tag='slow', wait=True)))
+        await dispatcher.dispatch(call(2, 'read_excel', tag='fast'))
+        release.set()
+        await slow
+        assert [(response['id'], tag(response)) for response in written] == [(2, 'fast'), (1, 'slow')]
+        
+        # 도구별 동시 실행 제한
+        written.clear()
+        running['peak'] = 0
+        await asyncio.gather(*(dispatcher.dispatch(call(10 + i, 'analyze_excel', tag=f'a{i}')) for i in range(4)))
+        assert running['peak'] == 1
+        assert sorted(response['id'] for response in written) == [10, 11, 12, 13]
+        
+        # 배치는 응답 배열 하나 (알림은 응답 없음)
+        written.clear()
+        await dispatcher.dispatch([call(20, 'read_excel', tag='b1'),
+                                   {'jsonrpc': '2.0', 'method': 'notifications/initialized'},
+                                   call(21, 'read_excel', tag='b2')])
+        assert len(written) == 1 and isinstance(written[0], list)
+        assert sorted((response['id'], tag(response)) for response in written[0]) == [(20, 'b1'), (21, 'b2')]
+        
+        # id가 없는 요청은 실행하지만 응답하지 않음
+        written.clear()
+        await dispatcher.dispatch({'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+        await dispatcher.dispatch(call(None, 'read_excel', tag='silent'))
+        assert written == [] and calls[-1] == 'silent'
+    
+    try:
+        asyncio.run(run_dispatch_test())
+    finally:
+        dispatcher.executor.shutdown(wait=True)
+        dispatcher._reader.shutdown(wait=True)
+
+def test_read_excel_paging():
+    """offset/limit 페이지 읽기와 커서 이어 읽기 테스트"""
+    from excel_mcp_server import MCPServer
+    
+    async def run_paging_test(tmp_dir):
+        server = MCPServer()
+        file_path = Path(tmp_dir) / 'paging.xlsx'
+        pd.DataFrame({'번호': range(25)}).to_excel(file_path, index=False)
+        
+        page = await server.read_excel(str(file_path), limit=10)
+        numbers = [row['번호'] for row in page['data']]
+        while page['next_cursor']:
+            page = await server.read_excel(str(file_path), cursor=page['next_cursor'])
+            numbers += [row['번호'] for row in page['data']]
+        assert numbers == list(range(25))
+        assert not page['has_more']
+        
+        middle = await server.read_excel(str(file_path), offset=20, limit=3)
+        assert [row['번호'] for row in middle['data']] == [20, 21, 22]
+        
+        # 파일을 교체하기 전과 서버 종료 시 열어 둔 행 스트림을 닫음
+        assert server.row_streams._streams
+        await server.write_excel(str(file_path), [{'번호': n} for n in range(5)])
+        assert not server.row_streams._streams
+        await server.read_excel(str(file_path), offset=1, limit=2)
+        assert server.row_streams._streams
+        server.close()
+        assert not server.row_streams._streams
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_paging_test(tmp_dir))
+
+def test_column_projection():
+    """columns 인자로 일부 컬럼만 읽기 테스트 (pandas 결과와 동일해야 함)"""
+    from excel_mcp_server import MCPServer
+    
+    async def run_projection_test(tmp_dir):
+        server = MCPServer()
+        file_path = Path(tmp_dir) / 'wide.xlsx'
+        df = pd.DataFrame({
+            '이름': ['김철수', None, '박민수'],
+            '나이': [28, 32, None],
+            '입사일': pd.to_datetime(['2020-03-15', '2019-07-01', '2021-11-20']),
+            '재직': [True, False, True]
+        })
+        df.to_excel(file_path, index=False)
+        
+        result = await server.read_excel(str(file_path), columns=['입사일', '이름'])
+        expected = pd.read_excel(file_path)[['입사일', '이름']]
+        assert result['columns'] == ['입사일', '이름']
+        assert result['data'] == expected.to_dict('records')
+        
+        filtered = await server.filter_excel_data(str(file_path), {'나이': 28}, columns=['이름'])
+        assert filtered['data'] == [{'이름': '김철수'}]
+        
+        missing = await server.analyze_excel(str(file_path), columns=['없는컬럼'])
+        assert not missing['success']
+        
+        # 숫자 헤더는 컬럼만 읽을 때와 캐시된 전체 시트에서 고를 때 모두 원래 값(5)으로
+        numeric_path = Path(tmp_dir) / 'numeric.xlsx'
+        pd.DataFrame({5: [1, 2], '이름': ['a', 'b'], 2024: [3, 4]}).to_excel(numeric_path, index=False)
+        projected, cache_hit = server.load_frame(numeric_path, columns=[5, 2024])
+        assert not cache_hit and projected.columns.tolist() == [5, 2024]
+        server.load_frame(numeric_path)
+        cached, cache_hit = server.load_frame(numeric_path, columns=[5, 2024])
+        assert cache_hit
+        pd.testing.assert_frame_equal(projected, cached)
+        pd.testing.assert_frame_equal(cached, pd.read_excel(numeric_path)[[5, 2024]])
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_projection_test(tmp_dir))
+
+def test_filter_predicates():
+    """연산자 필터와 스트리밍 필터 테스트"""
+    from excel_mcp_server import MCPServer
+    
+    async def run_filter_test(tmp_dir):
+        server = MCPServer()
+        file_path = Path(tmp_dir) / 'filter.xlsx'
+        pd.DataFrame({
+            '이름': ['김철수', '이영희', '박민수', '최지영', '정우진'],
+            '나이': [28, 32, 24, 29, 35],
+            '부서': ['개발팀', '마케팅팀', '개발팀', '인사팀', '마케팅팀']
+        }).to_excel(file_path, index=False)
+        
+        cases = [
+            ({'부서': '개발팀'}, ['김철수', '박민수']),
+            ({'나이': {'>=': 29, '<': 35}}, ['이영희', '최지영']),
+            ({'or': [{'부서': {'in': ['인사팀']}}, {'나이': {'between': [33, 40]}}]}, ['최지영', '정우진']),
+            ({'not': {'이름': {'regex': '^[김이]'}}}, ['박민수', '최지영', '정우진'])
+        ]
+        for filters, expected in cases:
+            for stream in (False, True):
+                result = await server.filter_excel_data(str(file_path), filters, columns=['이름'], stream=stream)
+                assert [row['이름'] for row in result['data']] == expected, (filters, stream)
+        
+        # 스트리밍 페이지: limit에서 멈추면 전체 수 대신 지금까지 찾은 수와 has_more
+        first = await server.filter_excel_data(str(file_path), {'나이': {'>': 25}}, stream=True, limit=2)
+        assert [row['이름'] for row in first['data']] == ['김철수', '이영희']
+        assert first['matched_so_far'] == 2 and first['has_more'] and 'filtered_rows' not in first
+        last = await server.filter_excel_data(str(file_path), {'나이': {'>': 25}}, stream=True, offset=2, limit=5)
+        assert [row['이름'] for row in last['data']] == ['최지영', '정우진']
+        assert not last['has_more'] and last['filtered_rows'] == 4
+        
+        import inspect
+        import excel_filter
+        assert inspect.isabstract(excel_filter.Predicate)
+        
+        unknown = await server.filter_excel_data(str(file_path), {'없는컬럼': {'==': 1}})
+        assert not unknown['success']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_filter_test(tmp_dir))
+
+def test_sidecar_cache():
+    """컬럼 사이드카 저장 후 재시작한 서버가 사이드카에서 읽는지 테스트"""
+    import numpy as np
+    import excel_sidecar
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_sidecar_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'sidecar.xlsx'
+        df = pd.DataFrame({
+            '번호': range(5),
+            '수량': [3, 1, 4, 1, 5],
+            '이름': ['a', None, 'c', 'd', 'e'],
+            '혼합': [1, 'x', 2.5, None, 'y'],
+            '날짜': pd.date_range('2024-01-01', periods=5)
+        })
+        df.to_excel(file_path, index=False)
+        config = ServerConfig(cache_dir=Path(tmp_dir) / 'cache', sidecar=True)
+        
+        first = await MCPServer(config).read_excel(str(file_path))
+        restarted = MCPServer(config)
+        loaded = restarted.sidecars.load(file_path, 0)
+        assert loaded is not None
+        assert loaded.equals(pd.read_excel(file_path))
+        if excel_sidecar.feather is None:
+            # 같은 dtype 컬럼도 각각 메모리 매핑된 배열을 그대로 사용
+            for column in ['번호', '수량']:
+                values = loaded[column].to_numpy()
+                while not isinstance(values, np.memmap) and values.base is not None:
+                    values = values.base
+                assert isinstance(values, np.memmap)
+        second = await restarted.read_excel(str(file_path))
+        assert pd.DataFrame(second['data']).equals(pd.DataFrame(first['data']))
+        
+        # 내용이 바뀌면 사이드카를 쓰지 않음
+        pd.DataFrame({'번호': [9]}).to_excel(file_path, index=False)
+        assert restarted.sidecars.load(file_path, 0) is None
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_sidecar_test(tmp_dir))
+
+def test_workbook_info():
+    """zip 메타데이터 기반 get_excel_info 테스트 (dimension이 없는 시트 포함)"""
+    import re
+    import zipfile
+    from excel_mcp_server import MCPServer
+    
+    async def run_info_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'info.xlsx'
+        with pd.ExcelWriter(file_path) as writer:
+            pd.DataFrame({'a': range(10), 'b': range(10), 'c': range(10)}).to_excel(writer, sheet_name='데이터', index=False)
+            pd.DataFrame({'x': [1]}).to_excel(writer, sheet_name='요약', index=False)
+        
+        server = MCPServer()
+        result = await server.get_excel_info(str(file_path))
+        assert result['success']
+        assert [s['name'] for s in result['sheets']] == ['데이터', '요약']
+        assert (result['sheets'][0]['max_row'], result['sheets'][0]['max_column']) == (11, 3)
+        assert result['sheets'][0]['part_size'] > 0
+        
+        # dimension 태그를 지운 파일은 행 태그를 훑어 범위를 계산
+        stripped = Path(tmp_dir) / 'stripped.xlsx'
+        with zipfile.ZipFile(file_path) as src, zipfile.ZipFile(stripped, 'w') as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename.startswith('xl/worksheets/'):
+                    data = re.sub(rb'<dimension[^>]*/>', b'', data)
+                dst.writestr(item, data)
+        result = await server.get_excel_info(str(stripped))
+        assert result['sheets'][0]['declared_dimension'] is None
+        assert result['sheets'][0]['exact']
+        assert (result['sheets'][0]['max_row'], result['sheets'][0]['row_count']) == (11, 11)
+        assert result['sheets'][0]['max_column'] == 3
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_info_test(tmp_dir))
+
+def test_result_formats():
+    """결과 형식(records, columns, rows+header)과 한 번 인코딩된 응답 테스트"""
+    from excel_mcp_server import MCPServer
+    
+    async def run_format_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'format.xlsx'
+        pd.DataFrame({'이름': ['김철수', '이영희'], '나이': [30, 25]}).to_excel(file_path, index=False)
+        server = MCPServer()
+        
+        records = await server.read_excel(str(file_path))
+        assert records['data'] == [{'이름': '김철수', '나이': 30}, {'이름': '이영희', '나이': 25}]
+        columns = await server.read_excel(str(file_path), format='columns')
+        assert columns['data'] == {'이름': ['김철수', '이영희'], '나이': [30, 25]}
+        rows = await server.read_excel(str(file_path), format='rows+header', limit=1)
+        assert rows['columns'] == ['이름', '나이'] and rows['data'] == [['김철수', 30]]
+        assert rows['next_cursor']
+        invalid = await server.read_excel(str(file_path), format='xml')
+        assert not invalid['success']
+        
+        response = await server.handle_message({
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "filter_excel_data",
+                       "arguments": {"file_path": str(file_path), "filters": {"나이": {">": 26}}, "format": "columns"}}
+        })
+        text = response['result']['content'][0]['text']
+        assert '\n' not in text and '김철수' in text
+        result = json.loads(text)
+        assert result['data'] == {'이름': ['김철수'], '나이': [30]}
+        assert result['_meta']['payload_bytes'] > 0
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_format_test(tmp_dir))
+
+def test_response_budget():
+    """응답 예산 초과 시 잘린 결과, 요약, 이어 받기 커서 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    from excel_encoding import encode_result, encode_rows
+    
+    async def run_budget_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'budget.xlsx'
+        df = pd.DataFrame({'번호': range(100), '메모': ['가나다라마바사' * 5] * 100})
+        df.to_excel(file_path, index=False)
+        server = MCPServer(ServerConfig(max_response_bytes=2000))
+        
+        result = await server.read_excel(str(file_path))
+        assert result['truncated'] and 0 < result['returned_rows'] < 100
+        assert result['summary']['total_rows'] == 100
+        encoded = json.loads(encode_result(result)[0])
+        assert encoded['data'] == result['data']
+        # 여러 인코딩 블록(중첩 포함)도 각 자리에 그대로 들어감
+        empty = encode_rows(0, lambda start, stop: [])[0]
+        sheets = {'data': result['data'], 'sheets': [{'data': result['data']}, {'data': empty}]}
+        encoded = json.loads(encode_result(sheets)[0])
+        assert encoded['data'] == encoded['sheets'][0]['data'] == result['data']
+        assert encoded['sheets'][1]['data'] == []
+        
+        numbers = [row['번호'] for row in result['data']]
+        cursor = result['next_cursor']
+        while cursor:
+            page = await server.read_excel(str(file_path), cursor=cursor)
+            numbers.extend(row['번호'] for row in page['data'])
+            cursor = page['next_cursor']
+        assert numbers == list(range(100))
+        
+        # rows로 제한한 읽기는 이어 받아도 rows 행에서 멈춤
+        capped = await server.read_excel(str(file_path), rows=30)
+        assert capped['truncated'] and capped['returned_rows'] < 30
+        numbers = [row['번호'] for row in capped['data']]
+        cursor = capped['next_cursor']
+        while cursor:
+            page = await server.read_excel(str(file_path), cursor=cursor)
+            numbers.extend(row['번호'] for row in page['data'])
+            cursor = page['next_cursor']
+        assert numbers == list(range(30))
+        
+        # 호출별 행 수 제한과 필터 결과 이어 받기
+        filtered = await server.filter_excel_data(str(file_path), {'번호': {'>=': 50}}, max_rows=3, format='columns')
+        assert filtered['truncated'] and filtered['data']['번호'] == [50, 51, 52]
+        rest = await server.filter_excel_data(str(file_path), {}, cursor=filtered['next_cursor'], max_rows=3)
+        assert [row['번호'] for row in rest['data']] == [53, 54, 55]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_budget_test(tmp_dir))
+
+def test_stream_analysis():
+    """스트리밍 분석이 전체 로드 분석과 같은 결과를 내는지 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_stats import HyperLogLog, TDigest
+    import numpy as np
+    
+    async def run_stream_analysis_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'stats.xlsx'
+        df = pd.DataFrame({
+            '점수': [1.5, None, 3.0, 4.5, 10.0, 2.0],
+            '개수': [1, 2, 3, 4, 5, 6],
+            '부서': ['개발팀', '인사팀', '개발팀', None, '개발팀', '인사팀']
+        })
+        df.to_excel(file_path, index=False)
+        server = MCPServer()
+        
+        exact = await server.analyze_excel(str(file_path))
+        streamed = await server.analyze_excel(str(file_path), stream=True)
+        assert streamed['success'] and streamed['mode'] == 'stream'
+        assert list(streamed['shape']) == list(exact['shape'])
+        assert streamed['missing_values'] == exact['missing_values']
+        for col in ('점수', '개수'):
+            for stat, value in exact['numeric_statistics'][col].items():
+                assert abs(streamed['numeric_statistics'][col][stat] - value) < 1e-9
+        assert streamed['text_statistics']['부서']['most_common'] == {'개발팀': 3, '인사팀': 2}
+        assert not streamed['approximate']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_stream_analysis_test(tmp_dir))
+    
+    # 근사 모드로 넘어간 뒤에도 오차 범위 안에 있는지 확인
+    values = np.random.default_rng(0).normal(size=50000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 5):
+        digest.add(chunk)
+    assert not digest.exact
+    rank = (values < digest.quantile(0.5)).mean()
+    assert abs(rank - 0.5) <= digest.rank_error() + 1e-3
+    
+    hll = HyperLogLog()
+    hll.add(pd.util.hash_array(np.arange(50000)))
+    assert abs(hll.estimate() - 50000) / 50000 < 4 * hll.relative_error
+
+def test_result_cache():
+    """같은 파일/옵션의 분석 결과 재사용과 파일 변경 시 무효화 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_result_cache_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'result.xlsx'
+        pd.DataFrame({'값': [1, 2, 3]}).to_excel(file_path, index=False)
+        config = ServerConfig(cache_dir=Path(tmp_dir) / 'cache', persist_results=True)
+        server = MCPServer(config)
+        
+        first = await server.analyze_excel(str(file_path))
+        second = await server.analyze_excel(str(file_path))
+        assert not first['result_cached'] and second['result_cached']
+        other = await server.analyze_excel(str(file_path), stream=True)
+        assert not other['result_cached']
+        
+        # 다시 시작한 서버는 SQLite 파일에서 결과를 읽음
+        restarted = MCPServer(config)
+        persisted = await restarted.analyze_excel(str(file_path))
+        assert persisted['result_cached']
+        assert persisted['numeric_statistics']['값']['mean'] == 2.0
+        
+        # 파일이 바뀌면 다시 계산
+        pd.DataFrame({'값': [10, 20]}).to_excel(file_path, index=False)
+        changed = await restarted.analyze_excel(str(file_path))
+        assert not changed['result_cached']
+        assert changed['numeric_statistics']['값']['mean'] == 15.0
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_result_cache_test(tmp_dir))
+
+def test_workbook_analysis():
+    """여러 시트 분석/읽기와 진행 상황 알림 테스트"""
+    from excel_mcp_server import MCPServer, _progress_token
+    from excel_config import ServerConfig
+    
+    async def run_workbook_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'workbook.xlsx'
+        with pd.ExcelWriter(file_path) as writer:
+            pd.DataFrame({'값': [1, 2, 3]}).to_excel(writer, sheet_name='가', index=False)
+            pd.DataFrame({'값': [10, None], '이름': ['a', 'b']}).to_excel(writer, sheet_name='나', index=False)
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        notifications = []
+        server.notifier = notifications.append
+        
+        token = _progress_token.set('p1')
+        try:
+            result = await server.analyze_excel(str(file_path), sheet_name='*')
+        finally:
+            _progress_token.reset(token)
+        assert list(result['sheets']) == ['가', '나']
+        assert result['workbook']['total_rows'] == 5
+        assert result['workbook']['total_missing_values'] == 1
+        single = await server.analyze_excel(str(file_path), sheet_name='나')
+        assert single['numeric_statistics'] == result['sheets']['나']['numeric_statistics']
+        assert [n['params']['progress'] for n in notifications] == [1, 2]
+        
+        read = await server.read_excel(str(file_path), sheet_name=['나'])
+        alone = await server.read_excel(str(file_path), sheet_name='나')
+        assert read['sheets']['나']['data'].json == alone['data'].json
+        missing = await server.read_excel(str(file_path), sheet_name=['없음'])
+        assert not missing['success']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_workbook_test(tmp_dir))
+
+def test_write_session():
+    """쓰기 세션(begin/append/commit/abort) 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_write_session_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'export.xlsx'
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        
+        session = await server.begin_write(str(file_path), sheet_name='결과')
+        first = await server.append_rows(session['session_id'], [{'이름': '=A1', '값': 1}, {'이름': 'b'}])
+        second = await server.append_rows(session['session_id'], [['c', 3.5]])
+        assert first['rows_appended'] == 2 and second['rows_written'] == 3
+        assert not file_path.exists()
+        committed = await server.commit_write(session['session_id'])
+        assert committed['success'] and committed['rows_written'] == 3
+        
+        df = pd.read_excel(file_path, sheet_name='결과')
+        assert df.columns.tolist() == ['이름', '값']
+        assert df['이름'].tolist() == ['=A1', 'b', 'c']
+        assert df['값'].isna().tolist() == [False, True, False]
+        
+        # 취소하면 기존 파일과 임시 파일 모두 그대로/정리됨
+        aborted = await server.begin_write(str(file_path), columns=['x'])
+        await server.append_rows(aborted['session_id'], [[1]])
+        await server.abort_write(aborted['session_id'])
+        assert pd.read_excel(file_path).shape == (3, 2)
+        assert [p.name for p in Path(tmp_dir).iterdir() if p.name.endswith('.part')] == []
+        assert not (await server.commit_write(aborted['session_id']))['success']
+        
+        written = await server.write_excel(str(file_path), [{'a': 1}, {'b': 2}])
+        assert written['success'] and pd.read_excel(file_path).columns.tolist() == ['a', 'b']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_write_session_test(tmp_dir))
+
+def test_append_write():
+    """append 모드와 여러 시트 쓰기 테스트 (바뀌지 않은 zip 항목은 그대로 복사)"""
+    import struct
+    import zipfile
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_append_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'log.xlsx'
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        created = await server.write_excel(str(file_path), sheets={
+            '로그': [{'시각': '09:00', '내용': '시작'}],
+            '설정': [{'키': 'a', '값': 1}]
+        })
+        assert created['sheets'] == {'로그': 1, '설정': 1}
+        with zipfile.ZipFile(file_path) as z:
+            before = {info.filename: (info.CRC, info.compress_size) for info in z.infolist()}
+        
+        result = await server.write_excel(str(file_path), mode='append', sheets={
+            '로그': [{'내용': '<끝>', '시각': '18:00'}, ['19:00', '추가']],
+            '요약': [{'건수': 3}]
+        })
+        assert result['success'] and result['rows_written'] == 3
+        
+        with zipfile.ZipFile(file_path) as z:
+            after = {info.filename: (info.CRC, info.compress_size) for info in z.infolist()}
+        changed = {name for name in before if before[name] != after[name]}
+        assert 'xl/worksheets/sheet2.xml' not in changed and 'xl/styles.xml' not in changed
+        assert 'xl/worksheets/sheet1.xml' in changed
+        
+        frames = pd.read_excel(file_path, sheet_name=None)
+        assert list(frames) == ['로그', '설정', '요약']
+        
+        # 배열의 배열은 pandas.DataFrame처럼 번호 헤더로 저장
+        rows_path = Path(tmp_dir) / 'rows.xlsx'
+        plain = await server.write_excel(str(rows_path), [['a', 1], ['b', 2, True]])
+        assert plain['success'] and plain['rows_written'] == 2
+        pandas_path = Path(tmp_dir) / 'rows_pandas.xlsx'
+        pd.DataFrame([['a', 1], ['b', 2, True]]).to_excel(pandas_path, index=False)
+        pd.testing.assert_frame_equal(pd.read_excel(rows_path), pd.read_excel(pandas_path))
+        assert frames['로그']['내용'].tolist() == ['시작', '<끝>', '추가']
+        assert frames['설정'].to_dict('records') == [{'키': 'a', '값': 1}]
+        
+        bad = await server.write_excel(str(file_path), mode='append', sheets={'로그': [{'없는컬럼': 1}]})
+        assert not bad['success']
+        assert len(pd.read_excel(file_path, sheet_name='로그')) == 3
+        
+        # zip64 항목(큰 공유 문자열)을 그대로 복사해도 새 파일의 zip64 필드가 맞고 다른 확장 필드는 유지
+        import shutil
+        from unittest import mock
+        big_path = Path(tmp_dir) / 'big.xlsx'
+        pd.DataFrame({'내용': [f'항목 {i}' for i in range(3000)]}).to_excel(file_path, sheet_name='로그', index=False)
+        timestamp = struct.pack('<HHBI', 0x5455, 5, 1, 1700000000)
+        with mock.patch('zipfile.ZIP64_LIMIT', 4096), mock.patch('excel_writer.ZIP64_GUESS', 1024):
+            with zipfile.ZipFile(file_path) as source, zipfile.ZipFile(big_path, 'w', zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    entry = zipfile.ZipInfo(info.filename, info.date_time)
+                    entry.compress_type = zipfile.ZIP_DEFLATED
+                    entry.extra = timestamp
+                    with source.open(info) as src, target.open(entry, 'w', force_zip64=True) as out:
+                        shutil.copyfileobj(src, out)
+            with zipfile.ZipFile(big_path) as z:
+                shared = z.getinfo('xl/sharedStrings.xml')
+                before = (shared.CRC, shared.compress_size, z.read(shared))
+            assert shared.file_size > 4096
+            appended = await server.write_excel(str(big_path), mode='append', sheets={'로그': [{'내용': '끝'}]})
+        assert appended['success']
+        with zipfile.ZipFile(big_path) as z:
+            assert z.testzip() is None
+            shared = z.getinfo('xl/sharedStrings.xml')
+            assert (shared.CRC, shared.compress_size, z.read(shared)) == before
+            assert timestamp in shared.extra
+        assert pd.read_excel(big_path, sheet_name='로그')['내용'].tolist()[-2:] == ['항목 2999', '끝']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_append_test(tmp_dir))
+
+def test_batch():
+    """JSON-RPC 배치 배열과 batch 도구 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_batch_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'batch.xlsx'
+        pd.DataFrame({'부서': ['개발', '인사', '개발'], '연봉': [10, 20, 30]}).to_excel(file_path, index=False)
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        
+        responses = await server.handle_message([
+            {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 2, "method": "없는메서드"},
+            7
+        ])
+        assert [r.get("id") for r in responses] == [1, 2, None]
+        assert responses[2]["error"]["code"] == -32600
+        assert (await server.handle_message([]))["error"]["code"] == -32600
+        
+        result = await server.batch(file_path=str(file_path), calls=[
+            {"tool": "analyze_excel"},
+            {"tool": "filter_excel_data", "arguments": {"filters": {"부서": "개발"}}},
+            {"tool": "read_excel", "arguments": {"rows": 1}},
+            {"tool": "write_excel", "arguments": {"mode": "append", "data": [{"부서": "재무", "연봉": 40}]}},
+            {"tool": "read_excel"},
+            {"tool": "batch"}
+        ])
+        results = result['results']
+        assert result['total_calls'] == 6 and result['failed_calls'] == 1
+        assert tuple(results[0]['shape']) == (3, 2)
+        assert results[1]['filtered_rows'] == 2
+        # 같은 시트는 한 번만 파싱하고 나머지 호출은 캐시 사용
+        assert results[2]['cache_hit'] and results[1]['cache_hit']
+        assert len(results[4]['data']) == 4
+        assert not results[5]['success']
+        # 하위 호출도 도구별 지표에 기록 (잘못된 항목은 실행하지 않으므로 제외)
+        tools = server.metrics_snapshot()['tools']
+        assert tools['read_excel']['calls'] == 2 and tools['read_excel']['cache_hits'] == 1
+        assert tools['write_excel']['calls'] == 1 and tools['filter_excel_data']['phase_ms']['compute'] >= 0
+        assert 'batch' not in tools
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_batch_test(tmp_dir))
+
+def test_metrics():
+    """도구 호출 지표와 server/metrics 메서드 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_metrics_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'metrics.xlsx'
+        pd.DataFrame({'부서': ['개발', '인사'], '연봉': [10, 20]}).to_excel(file_path, index=False)
+        metrics_file = Path(tmp_dir) / 'metrics.json'
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache', trace_memory=True,
+                                        metrics_file=metrics_file, metrics_interval=3600))
+        
+        for msg_id in (1, 2):
+            await server.handle_message({"jsonrpc": "2.0", "id": msg_id, "method": "tools/call",
+                                         "params": {"name": "read_excel", "arguments": {"file_path": str(file_path)}}})
+        await server.handle_message({"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+                                     "params": {"name": "get_excel_info", "arguments": {"file_path": "없는파일.xlsx"}}})
+        
+        response = await server.handle_message({"jsonrpc": "2.0", "id": 4, "method": "server/metrics"})
+        snapshot = response["result"]
+        read = snapshot["tools"]["read_excel"]
+        assert read["calls"] == 2 and read["errors"] == 0
+        assert read["cache_hits"] == 1 and read["cache_hit_ratio"] == 0.5
+        assert read["phase_ms"]["parse"] > 0 and read["phase_ms"]["serialize"] > 0
+        assert read["bytes_out"] > 0 and read["peak_memory_bytes"] > 0
+        assert read["latency"]["p50_ms"] is not None
+        assert snapshot["tools"]["get_excel_info"]["errors"] == 1
+        assert snapshot["caches"]["frames"]["hits"] == 1
+        assert len(snapshot["recent_calls"]) == 3
+        
+        # 종료할 때 마지막 지표를 파일에 저장
+        server.metrics.stop()
+        saved = json.loads(metrics_file.read_text(encoding='utf-8'))
+        assert saved["tools"]["read_excel"]["calls"] == 2
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_metrics_test(tmp_dir))
+
+def test_lazy_startup():
+    """pandas/openpyxl을 불러오기 전에 initialize/tools/list 응답, 핸드셰이크 후 미리 불러오기 테스트"""
+    script = """
+import asyncio, json, sys
+from excel_mcp_server import MCPServer
+from excel_config import ServerConfig
+
+server = MCPServer(ServerConfig(cache_dir=sys.argv[1]))
+loaded = lambda: sorted(name for name in ("pandas", "openpyxl") if name in sys.modules)
+asyncio.run(server.handle_message({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}))
+tools = asyncio.run(server.handle_message({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}))
+before = loaded()
+asyncio.run(server.handle_message({"jsonrpc": "2.0", "method": "notifications/initialized"}))
+server._prewarm_thread.join(60)
+print(json.dumps({"tools": len(tools["result"]["tools"]), "before": before, "after": loaded(),
+                  "components": sorted(server._components)}))
+"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = subprocess.run([sys.executable, '-c', script, tmp_dir], capture_output=True, text=True,
+                                cwd=tmp_dir, env={**os.environ, 'PYTHONPATH': str(Path(__file__).resolve().parent)},
+                                timeout=120)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    assert result['tools'] > 0
+    assert result['before'] == []
+    assert result['after'] == ['openpyxl', 'pandas']
+    assert result['components'] == ['engine', 'sidecars', 'write_sessions']
+
+def test_tool_call_during_prewarm():
+    """핸드셰이크 직후의 도구 호출이 백그라운드 prewarm과 겹쳐도 모듈을 정상적으로 불러오는지 테스트"""
+    server_script = str(Path(__file__).resolve().parent / 'excel_mcp_server.py')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / 'prewarm.xlsx'
+        pd.DataFrame({'번호': [1, 2, 3]}).to_excel(file_path, index=False)
+        messages = [
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+             "params": {"name": "read_excel", "arguments": {"file_path": str(file_path)}}}
+        ]
+        stdin = "".join(json.dumps(message) + "\n" for message in messages)
+        for _ in range(3):
+            output = subprocess.run([sys.executable, server_script], input=stdin, capture_output=True, text=True,
+                                    cwd=tmp_dir, env={**os.environ, 'EXCEL_MCP_CACHE_DIR': str(Path(tmp_dir) / 'cache'),
+                                                      'EXCEL_MCP_PREWARM': '1'},
+                                    timeout=120)
+            responses = {r.get('id'): r for r in map(json.loads, output.stdout.splitlines())}
+            result = json.loads(responses[2]['result']['content'][0]['text'])
+            assert result['success'], result['error']
+            assert [row['번호'] for row in result['data']] == [1, 2, 3]
+
+def test_dtype_compaction():
+    """캐시 프레임 타입 압축과 범주형 컬럼 필터 테스트"""
+    import excel_compact
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_compaction_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'compact.xlsx'
+        n = 2000
+        pd.DataFrame({
+            '부서': [['개발', '인사', '재무'][i % 3] if i % 7 else None for i in range(n)],
+            '이름': [f'직원{i}' for i in range(n)],
+            '나이': [20 + i % 40 for i in range(n)],
+            '점수': [i % 10 + 0.5 for i in range(n)],
+            '비율': [i / 3 for i in range(n)],
+            # float32로 바꿔도 값은 같지만 float32로 더하면 평균/표준편차가 달라지는 컬럼
+            '금액': [10000 + (i * 7919) % 5000 + 0.25 for i in range(n)]
+        }).to_excel(file_path, index=False)
+        compact = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        plain = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache', compact=False))
+        
+        assert n >= excel_compact.MIN_ROWS
+        analysis = await compact.analyze_excel(str(file_path))
+        frame, _ = compact.load_frame(file_path)
+        assert frame['부서'].dtype == 'category' and frame['나이'].dtype == 'int8' and frame['금액'].dtype == 'float32'
+        assert analysis['memory']['after_bytes'] < analysis['memory']['before_bytes']
+        assert analysis['text_statistics']['부서']['unique_values'] == 3
+        plain_analysis = await plain.analyze_excel(str(file_path))
+        assert plain_analysis['memory']['before_bytes'] == plain_analysis['memory']['after_bytes']
+        # 통계와 타입은 압축하지 않은 시트 기준
+        assert analysis['data_types'] == plain_analysis['data_types']
+        assert analysis['data_types']['나이'] == 'int64' and analysis['data_types']['금액'] == 'float64'
+        expected_stats = pd.read_excel(file_path).select_dtypes(include=['number']).describe().to_dict()
+        assert analysis['numeric_statistics'] == plain_analysis['numeric_statistics'] == expected_stats
+        assert analysis['text_statistics'] == plain_analysis['text_statistics']
+        
+        # 압축 여부와 관계없이 같은 결과
+        for filters in [{'부서': '개발'}, {'부서': {'!=': '인사'}}, {'부서': {'>': '인사'}},
+                        {'부서': {'not_in': ['개발']}}, {'부서': {'regex': '^재'}},
+                        {'부서': {'is_null': True}}, {'나이': {'between': [30, 35]}}]:
+            expected = await plain.filter_excel_data(str(file_path), filters)
+            result = await compact.filter_excel_data(str(file_path), filters)
+            assert result['filtered_rows'] == expected['filtered_rows'], filters
+            assert result['data'].json == expected['data'].json, filters
+        
+        read = await compact.read_excel(str(file_path), rows=5)
+        assert read['data'].json == (await plain.read_excel(str(file_path), rows=5))['data'].json
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_compaction_test(tmp_dir))
+
+def test_aggregate():
+    """그룹별 집계 도구 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_aggregate_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'aggregate.xlsx'
+        n = 1500
+        source = pd.DataFrame({
+            '부서': [['개발', '인사', '재무'][i % 3] if i % 11 else None for i in range(n)],
+            '직급': [['사원', '대리'][i % 2] for i in range(n)],
+            '연봉': [3000 + (i * 37) % 2000 for i in range(n)],
+            '평가': [i % 5 + 0.5 for i in range(n)]
+        })
+        source.to_excel(file_path, index=False)
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        
+        result = await server.aggregate_excel(str(file_path), group_by=['부서'], aggregations=[
+            {'function': 'count'},
+            {'column': '연봉', 'function': 'sum'},
+            {'column': '평가', 'function': 'mean'},
+            {'column': '연봉', 'function': 'quantile', 'q': 0.9, 'as': '상위10'},
+            {'column': '직급', 'function': 'distinct'},
+            {'column': '직급', 'function': 'max'}
+        ], format='columns')
+        assert result['success'] and result['groups'] == 4
+        assert result['columns'] == ['부서', 'count', '연봉_sum', '평가_mean', '상위10', '직급_distinct', '직급_max']
+        data = result['data']
+        expected = source.groupby('부서', dropna=False)
+        assert data['부서'][:3] == ['개발', '인사', '재무'] and pd.isna(data['부서'][3])
+        assert data['연봉_sum'][:3] == expected['연봉'].sum().loc[['개발', '인사', '재무']].tolist()
+        assert data['count'][:3] == expected.size().loc[['개발', '인사', '재무']].tolist()
+        assert data['상위10'][0] == source[source['부서'] == '개발']['연봉'].quantile(0.9)
+        assert data['직급_distinct'][0] == 2 and data['직급_max'][0] == '사원'
+        
+        # 필터 후 전체 집계, 정렬과 개수 제한
+        total = await server.aggregate_excel(str(file_path), [{'column': '연봉', 'function': 'mean'}],
+                                             filters={'직급': '대리'})
+        assert total['aggregated_rows'] == n // 2
+        assert total['data'][0]['연봉_mean'] == source[source['직급'] == '대리']['연봉'].mean()
+        top = await server.aggregate_excel(str(file_path), [{'column': '연봉', 'function': 'sum'}],
+                                           group_by=['부서', '직급'], sort_by='연봉_sum', descending=True, limit=2)
+        assert top['groups'] == 8 and len(top['data']) == 2
+        assert top['data'][0]['연봉_sum'] >= top['data'][1]['연봉_sum']
+        again = await server.aggregate_excel(str(file_path), [{'column': '연봉', 'function': 'sum'}],
+                                             group_by=['부서', '직급'], sort_by='연봉_sum', descending=True, limit=2)
+        assert again['cache_hit'] and again['data'].json == top['data'].json
+        
+        assert not (await server.aggregate_excel(str(file_path), [{'column': '직급', 'function': 'sum'}]))['success']
+        assert not (await server.aggregate_excel(str(file_path), [{'column': '연봉', 'function': 'median'}]))['success']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_aggregate_test(tmp_dir))
+
+def test_query_excel():
+    """SQL 질의 도구 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_query_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'sales.xlsx'
+        orders = pd.DataFrame({
+            '주문ID': list(range(1, 51)),
+            '고객ID': [i % 5 + 1 for i in range(50)],
+            '금액': [100 * (i % 7 + 1) for i in range(50)]
+        })
+        customers = pd.DataFrame({'ID': [1, 2, 3, 4, 5], '지역': ['서울', '부산', '서울', '대구', '부산']})
+        with pd.ExcelWriter(file_path) as writer:
+            orders.to_excel(writer, sheet_name='주문', index=False)
+            customers.to_excel(writer, sheet_name='고객', index=False)
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        
+        sql = ('SELECT c.지역, SUM(o.금액) AS 매출 FROM 주문 o JOIN 고객 c ON o.고객ID = c.ID '
+               'GROUP BY c.지역 ORDER BY 매출 DESC')
+        result = await server.query_excel(sql, file_path=str(file_path))
+        assert result['success'] and result['columns'] == ['지역', '매출']
+        expected = orders.merge(customers, left_on='고객ID', right_on='ID').groupby('지역')['금액'].sum()
+        assert {row['지역']: row['매출'] for row in result['data']} == expected.to_dict()
+        assert result['tables']['주문'] == {'loaded': True, 'indexed_columns': ['고객ID']}
+        assert result['tables']['고객'] == {'loaded': True, 'indexed_columns': ['ID']}
+        
+        # 두 번째 질의는 적재한 테이블 재사용, 별칭으로 다른 파일의 시트 참조
+        again = await server.query_excel('SELECT COUNT(*) AS n FROM 주문 WHERE 금액 >= 500', file_path=str(file_path),
+                                         tables={'고객표': {'file_path': str(file_path), 'sheet_name': '고객'}})
+        assert again['data'] == [{'n': int((orders['금액'] >= 500).sum())}]
+        assert again['tables'] == {'주문': {'loaded': False, 'indexed_columns': ['금액']}}
+        
+        # 페이지 나누기
+        first = await server.query_excel('SELECT 주문ID FROM 주문 ORDER BY 주문ID', file_path=str(file_path), limit=20)
+        assert first['has_more'] and [row['주문ID'] for row in first['data']] == list(range(1, 21))
+        second = await server.query_excel(cursor=first['next_cursor'])
+        assert [row['주문ID'] for row in second['data']] == list(range(21, 41))
+        assert not (await server.read_excel(str(file_path), cursor=first['next_cursor']))['success']
+        
+        # 읽기 전용
+        for statement in ('DROP TABLE 주문', "ATTACH 'x.db' AS x", 'PRAGMA table_info(주문)'):
+            assert not (await server.query_excel(statement, file_path=str(file_path)))['success']
+        
+        # 파일이 바뀌면 다시 적재하고 이전 커서는 거부
+        time.sleep(0.01)
+        orders.head(10).to_excel(file_path, sheet_name='주문', index=False)
+        changed = await server.query_excel('SELECT COUNT(*) AS n FROM 주문', file_path=str(file_path))
+        assert changed['data'] == [{'n': 10}] and changed['tables']['주문']['loaded']
+        assert not (await server.query_excel(cursor=first['next_cursor']))['success']
+        server.close()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_query_test(tmp_dir))
+
+def test_filter_index():
+    """반복 필터링 컬럼의 보조 인덱스 테스트"""
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_index_test(tmp_dir):
+        file_path = Path(tmp_dir) / 'orders.xlsx'
+        n = 3000
+        source = pd.DataFrame({
+            '고객ID': [f'C{i % 400}' for i in range(n)],
+            '수량': [(i * 7) % 100 for i in range(n)],
+            '금액': [(i % 50) * 1.5 if i % 13 else None for i in range(n)]
+        })
+        source.to_excel(file_path, index=False)
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache', index_after=3))
+        
+        # 같은 컬럼을 다른 값으로 세 번째 조회할 때 인덱스를 만들고, 결과는 스캔과 같음
+        used = []
+        for customer in ('C1', 'C2', 'C3', 'C4'):
+            result = await server.filter_excel_data(str(file_path), {'고객ID': {'==': customer}})
+            assert result['filtered_rows'] == (source['고객ID'] == customer).sum()
+            used.append(result['indexed_columns'])
+        assert used == [[], [], ['고객ID'], ['고객ID']]
+        
+        # 명시적으로 요청하면 바로 만들고 범위 조건은 정렬 인덱스 사용
+        for filters in ({'수량': {'between': [10, 20]}}, {'금액': {'>': 30}},
+                        {'or': [{'고객ID': {'in': ['C5', 'C6', '없음']}}, {'수량': {'<': 3}}]},
+                        {'not': {'금액': {'<=': 12}}}):
+            plain = await server.filter_excel_data(str(file_path), filters, format='columns')
+            indexed = await server.filter_excel_data(str(file_path), filters, format='columns', index=True)
+            assert indexed['indexed_columns'] and indexed['data'].json == plain['data'].json
+        stats = server.metrics_snapshot()['caches']['indexes']
+        assert stats['entries'] == 3 and stats['builds'] >= 3
+        
+        # 파일이 바뀌면 이전 인덱스는 쓰지 않음
+        time.sleep(0.01)
+        source.head(100).to_excel(file_path, index=False)
+        changed = await server.filter_excel_data(str(file_path), {'고객ID': {'==': 'C1'}})
+        assert changed['indexed_columns'] == [] and changed['filtered_rows'] == 1
+        assert server.metrics_snapshot()['caches']['indexes']['entries'] == 0
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_index_test(tmp_dir))
+
+def test_search_index():
+    """디렉터리 전문 검색 색인 테스트"""
+    import xlsxwriter
+    from excel_mcp_server import MCPServer
+    from excel_config import ServerConfig
+    
+    async def run_search_test(tmp_dir):
+        root = Path(tmp_dir) / 'share'
+        (root / '2024').mkdir(parents=True)
+        with pd.ExcelWriter(root / 'invoices.xlsx') as writer:
+            pd.DataFrame({'내용': ['Invoice 88213 결제', '송장번호 확인'], '금액': [88213, 5]}).to_excel(writer, sheet_name='청구', index=False)
+        # constant_memory 모드의 xlsxwriter는 공유 문자열 대신 인라인 문자열로 저장
+        workbook = xlsxwriter.Workbook(str(root / '2024' / 'orders.xlsx'), {'constant_memory': True})
+        sheet = workbook.add_worksheet('주문')
+        sheet.write_row(0, 0, ['번호', '메모'])
+        sheet.write_row(1, 0, [1, 'invoice 77001 미결'])
+        workbook.close()
+        (root / '~$invoices.xlsx').write_bytes(b'lock')
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        
+        first = await server.index_directory(str(root))
+        assert first['success'] and first['files'] == 2 and first['indexed_files'] == 2 and not first['failed']
+        found = await server.search_excel('invoice 88213')
+        assert [(h['sheet'], h['cell'], h['text'], h['stale']) for h in found['hits']] == [('청구', 'A2', 'Invoice 88213 결제', False)]
+        assert len((await server.search_excel('invoice'))['hits']) == 2
+        assert (await server.search_excel('invoice', directory=str(root / '2024')))['hits'][0]['cell'] == 'B2'
+        assert (await server.search_excel('송장', prefix=True))['hits'][0]['text'] == '송장번호 확인'
+        assert (await server.search_excel('88213'))['returned_hits'] == 1  # 숫자 셀은 기본적으로 제외
+        
+        # 다시 색인하면 바뀐 파일만 읽고, 바뀌었지만 아직 색인하지 않은 파일은 stale
+        assert (await server.index_directory(str(root)))['unchanged_files'] == 2
+        time.sleep(0.01)
+        pd.DataFrame({'내용': ['Invoice 90001']}).to_excel(root / 'invoices.xlsx', sheet_name='청구', index=False)
+        assert (await server.search_excel('88213'))['hits'][0]['stale']
+        second = await server.index_directory(str(root), include_numbers=True)
+        assert second['indexed_files'] == 1 and second['unchanged_files'] == 1
+        assert (await server.search_excel('88213'))['hits'] == []
+        assert (await server.search_excel('90001'))['hits'][0]['file_path'] == str((root / 'invoices.xlsx').resolve())
+        
+        (root / '2024' / 'orders.xlsx').unlink()
+        assert (await server.index_directory(str(root)))['removed_files'] == 1
+        assert (await server.search_excel('77001'))['hits'] == []
+        assert not (await server.search_excel('   '))['success']
+        
+        # 목록을 만든 뒤 사라진 파일은 실패로 기록하고 나머지 파일은 계속 색인
+        from unittest import mock
+        gone = root / 'gone.xlsx'
+        with mock.patch('excel_search.workbook_files', lambda directory, recursive: [gone, root / 'invoices.xlsx']):
+            third = await server.index_directory(str(root))
+        assert third['success'] and third['unchanged_files'] == 1
+        assert [f['file_path'] for f in third['failed']] == [str(gone)]
+        server.close()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_search_test(tmp_dir))
+
+def test_scan_excel_files():
+    """디렉터리/glob 메타데이터 병렬 스캔과 매니페스트 테스트"""
+    from excel_mcp_server import MCPServer, _progress_token
+    from excel_config import ServerConfig
+    
+    async def run_scan_test(tmp_dir):
+        root = Path(tmp_dir) / 'reports'
+        (root / '2024').mkdir(parents=True)
+        for i in range(6):
+            folder = root / '2024' if i % 2 else root
+            pd.DataFrame({'번호': range(i + 1)}).to_excel(folder / f'r{i}.xlsx', index=False)
+        (root / 'broken.xlsx').write_bytes(b'not a workbook')
+        (root / 'notes.txt').write_text('x')
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        notifications = []
+        server.notifier = notifications.append
+        
+        token = _progress_token.set('scan')
+        try:
+            first = await server.scan_excel_files(str(root), concurrency=3)
+        finally:
+            _progress_token.reset(token)
+        assert first['success'] and first['total_files'] == 7 and first['scanned_files'] == 7
+        assert first['failed_files'] == 1 and first['concurrency'] == 3
+        assert sorted(n['params']['progress'] for n in notifications) == list(range(1, 8))
+        summaries = {Path(n['params']['data']['file_path']).name: n['params']['data'] for n in notifications}
+        assert summaries['r3.xlsx'] == {'file_path': str((root / '2024' / 'r3.xlsx').resolve()),
+                                        'success': True, 'cached': False, 'total_sheets': 1}
+        assert not summaries['broken.xlsx']['success'] and summaries['broken.xlsx']['error']
+        by_name = {Path(f['file_path']).name: f for f in first['files']}
+        single = await server.get_excel_info(str(root / '2024' / 'r3.xlsx'))
+        assert by_name['r3.xlsx']['sheets'] == single['sheets'] and not by_name['r3.xlsx']['cached']
+        
+        # 바뀌지 않은 파일은 매니페스트에서 (서버를 다시 시작해도)
+        server.close()
+        server = MCPServer(ServerConfig(cache_dir=Path(tmp_dir) / 'cache'))
+        time.sleep(0.01)
+        pd.DataFrame({'번호': range(20)}).to_excel(root / 'r0.xlsx', index=False)
+        (root / '2024' / 'r5.xlsx').unlink()
+        second = await server.scan_excel_files(str(root))
+        assert second['scanned_files'] == 2 and second['cached_files'] == 4 and second['removed_from_manifest'] == 1
+        assert {Path(f['file_path']).name: f for f in second['files']}['r0.xlsx']['sheets'][0]['max_row'] == 21
+        
+        pattern = await server.scan_excel_files(str(root / '**' / 'r*.xlsx'))
+        assert pattern['total_files'] == 5 and pattern['cached_files'] == 5
+        assert not (await server.scan_excel_files(str(root / 'r1.xlsx')))['success']
+        server.close()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run_scan_test(tmp_dir))
+
+def test_parse_engine():
+    """process 엔진이 inline 엔진과 같은 결과를 내고 풀을 재사용하는지 테스트"""
+    from excel_engine import ParseEngine
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / 'engine.xlsx'
+        with pd.ExcelWriter(file_path) as writer:
+            pd.DataFrame({'번호': range(50), '이름': [f'n{i}' for i in range(50)],
+                          '값': [i / 4 for i in range(50)]}).to_excel(writer, sheet_name='a', index=False)
+            pd.DataFrame({'x': [1, None, 3]}).to_excel(writer, sheet_name='b', index=False)
+        inline = ParseEngine('inline')
+        engine = ParseEngine('process', workers=2)
+        try:
+            pd.testing.assert_frame_equal(engine.parse(file_path, 'a'), inline.parse(file_path, 'a'))
+            pool = engine._pool
+            pd.testing.assert_frame_equal(engine.parse(file_path, 'a', usecols=[0, 2], nrows=10),
+                                          inline.parse(file_path, 'a', usecols=[0, 2], nrows=10))
+            frames = dict(engine.iter_workbook(file_path, ['a', 'b']))
+            for sheet, frame in inline.iter_workbook(file_path, ['a', 'b']):
+                pd.testing.assert_frame_equal(frames[sheet], frame)
+            # inline 모드도 시트를 하나씩 파싱해 끝나는 대로 반환
+            from unittest import mock
+            with mock.patch.object(pd.ExcelFile, 'parse', autospec=True, side_effect=pd.ExcelFile.parse) as parse:
+                sheets = inline.iter_workbook(file_path, ['a', 'b'])
+                assert next(sheets)[0] == 'a' and parse.call_count == 1
+                assert next(sheets)[0] == 'b' and parse.call_count == 2
+                sheets.close()
+            # 파싱마다 풀을 새로 만들지 않음
+            assert engine._pool is pool
+        finally:
+            engine.shutdown()
+        assert engine._pool is None
+        
+        # 컬럼 위치로 읽는 저수준 리더도 pandas.read_excel과 같은 타입으로 변환
+        pd.DataFrame({'숫자문자열': ['1', '2', '3'], '결측': ['NA', 'x', ''], '불리언': ['TRUE', 'false', 'True'],
+                      '혼합': [1, 'a', None], '빈칸': [None, None, None]}).to_excel(file_path, index=False)
+        expected = pd.read_excel(file_path, usecols=[0, 1, 2, 3, 4])
+        pd.testing.assert_frame_equal(inline.parse(file_path, 0, usecols=[0, 1, 2, 3, 4]), expected)
+
+def test_benchmark_tools():
+    """벤치마크 워크북 생성(같은 시드면 같은 내용)과 회귀 비교 테스트"""
+    from benchmarks.generate import generate_workbook, workload_columns
+    from benchmarks.compare import compare
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first = generate_workbook(Path(tmp_dir) / 'a.xlsx', 'multi-sheet', 50)
+        second = generate_workbook(Path(tmp_dir) / 'b.xlsx', 'multi-sheet', 50)
+        frames = pd.read_excel(first, sheet_name=None)
+        assert len(frames) == 4 and frames['Sheet1'].shape == (50, len(workload_columns('multi-sheet')))
+        again = pd.read_excel(second, sheet_name=None)
+        assert all(frames[name].equals(again[name]) for name in frames)
+    
+    entry = {"workload": "w", "rows": 10, "mode": "stdio", "scenario": "analyze", "success": True,
+             "cold_ms": 100.0, "peak_rss_mb": 80.0}
+    slower = dict(entry, cold_ms=150.0, peak_rss_mb=82.0)
+    regressions = compare({"results": [entry]}, {"results": [slower]}, threshold=0.2)
+    assert [r["metric"] for r in regressions] == ["cold_ms"]
+    assert compare({"results": [entry]}, {"results": [entry]}) == []
+
 def generate_claude_desktop_instructions():
     """클로드 데스크탑 설정 안내 생성"""
     current_path = os.path.abspath(".")